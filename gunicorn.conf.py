@@ -0,0 +1,22 @@
+"""
+Gunicorn settings, read automatically when gunicorn starts from the project root:
+    gunicorn myProject.wsgi:application [--preload]
+
+Command-line options and GUNICORN_CMD_ARGS still apply on top of this file.
+"""
+
+
+def post_worker_init(worker):
+    """Warm up each worker after the fork (see myApp/warmup.py), before it accepts requests"""
+    from django.conf import settings
+
+    if settings.WARMUP_ON_STARTUP:
+        from myApp.warmup import warm_up_worker
+        warm_up_worker()
+
+
+def child_exit(server, worker):
+    """Drop the dead worker's live gauges from the Prometheus multiprocess directory (see myApp/metrics.py)"""
+    from myApp.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     UserProfile, Service, Insight, Hero, Metadata,
-    MediaAsset, MediaAlbum, ProcessStep, Project, IntroSettings
+    MediaAsset, MediaAssetVariant, MediaAlbum, ProcessStep, Project, ProjectImage, IntroSettings
 )
 
 
@@ -49,12 +49,21 @@ class MediaAlbumAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
 
 
+class MediaAssetVariantInline(admin.TabularInline):
+    model = MediaAssetVariant
+    extra = 0
+    fields = ['format', 'width', 'height', 'bytes_size', 'secure_url']
+    readonly_fields = fields
+    can_delete = False
+
+
 @admin.register(MediaAsset)
 class MediaAssetAdmin(admin.ModelAdmin):
+    inlines = [MediaAssetVariantInline]
     list_display = ['title', 'album', 'format', 'width', 'height', 'bytes_size', 'created_at']
     list_filter = ['format', 'album', 'created_at']
     search_fields = ['title', 'public_id', 'tags_csv']
-    readonly_fields = ['public_id', 'secure_url', 'web_url', 'thumb_url', 'bytes_size', 'width', 'height', 'format', 'created_at', 'updated_at']
+    readonly_fields = ['public_id', 'secure_url', 'web_url', 'thumb_url', 'bytes_size', 'width', 'height', 'format', 'dominant_color', 'placeholder_data_uri', 'created_at', 'updated_at']
 
 
 @admin.register(ProcessStep)
@@ -64,13 +73,30 @@ class ProcessStepAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
 
 
+class ProjectImageInline(admin.TabularInline):
+    model = ProjectImage
+    extra = 0
+    raw_id_fields = ['asset']
+
+
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
+    inlines = [ProjectImageInline]
     list_display = ['title', 'location', 'category', 'featured', 'order', 'created_at']
     list_filter = ['featured', 'related_service', 'created_at']
     search_fields = ['title', 'location', 'category', 'short_description']
     prepopulated_fields = {'slug': ('title',)}
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        project = form.instance
+        if 'gallery_images' in form.changed_data:
+            project.sync_gallery_images()
+        elif any(formset.has_changed() for formset in formsets):
+            # Edited through the inline: keep the URL list the dashboard edits in step
+            project.gallery_images = ','.join(project.get_gallery_list())
+            project.save(update_fields=['gallery_images'])
+
 
 @admin.register(IntroSettings)
 class IntroSettingsAdmin(admin.ModelAdmin):
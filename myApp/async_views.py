@@ -0,0 +1,184 @@
+"""
+Async variants of the public views, built on Django's async ORM.
+
+Served instead of the synchronous views in myApp/views.py when
+settings.ASYNC_PUBLIC_VIEWS is enabled (ASGI deployments, e.g.
+`daphne myProject.asgi:application`). Independent queries are issued
+concurrently with asyncio.gather; the template render (which also runs
+the context processors) happens in the sync thread via sync_to_async.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import render
+
+from .models import (
+    Service, Insight, Hero, MediaAsset, ProcessStep, Project, ProjectImage, IntroSettings
+)
+from .preload_hints import preload_image
+
+
+async def _aget_or_404(queryset, **kwargs):
+    """Async counterpart of get_object_or_404"""
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _featured_services(limit=None):
+    """Featured services, falling back to all services when none are featured"""
+    featured = Service.objects.filter(featured=True).order_by('order', 'title')
+    services = await _alist(featured)
+    if not services:
+        fallback = Service.objects.all().order_by('order', 'title')
+        services = await _alist(fallback[:limit] if limit else fallback)
+    return services
+
+
+_arender = sync_to_async(render)
+_alookup_media = sync_to_async(MediaAsset.lookup_by_urls)
+_aprefetch_related_services = sync_to_async(Service.prefetch_related_services)
+
+
+# ==================== PUBLIC VIEWS ====================
+
+async def home(request):
+    hero, services, projects, (intro_settings, _) = await asyncio.gather(
+        Hero.objects.filter(page='home', active=True).order_by('order').afirst(),
+        _featured_services(limit=6),
+        _alist(Project.objects.filter(featured=True).order_by('order', '-created_at')[:4]),
+        IntroSettings.objects.aget_or_create(pk=1),
+    )
+
+    return await _arender(request, 'new_templates/index.html', {
+        'hero': hero,
+        'services': services,
+        'projects': projects,
+        'intro_settings': intro_settings,
+    })
+
+
+async def home_ar(request):
+    return await _arender(request, 'new_templates/index_ar.html')
+
+
+async def services(request):
+    hero, services_list, process_steps = await asyncio.gather(
+        Hero.objects.filter(page='services', active=True).order_by('order').afirst(),
+        _featured_services(),
+        _alist(ProcessStep.objects.filter(active=True).order_by('order')),
+    )
+
+    return await _arender(request, 'services.html', {
+        'hero': hero,
+        'services': services_list,
+        'process_steps': process_steps,
+    })
+
+
+async def service_detail(request, slug):
+    service = await _aget_or_404(Service.objects.all(), slug=slug)
+    showcase_services, media_assets, _ = await asyncio.gather(
+        _alist(Service.objects.filter(featured=True).exclude(id=service.id).order_by('order', 'title')[:4]),
+        _alookup_media([service.hero_image_url]),
+        _aprefetch_related_services([service]),
+    )
+    preload_image(request, service.hero_image_url)
+
+    return await _arender(request, 'service_detail.html', {
+        'service': service,
+        'showcase_services': showcase_services,
+        'media_assets': media_assets,
+    })
+
+
+async def projects(request):
+    """Projects catalog page"""
+    projects_list, categories = await asyncio.gather(
+        _alist(
+            Project.objects.all().order_by('-featured', 'order', '-created_at').prefetch_related(
+                Prefetch('images', queryset=ProjectImage.objects.select_related('asset'))
+            )
+        ),
+        _alist(Project.objects.exclude(category='').values_list('category', flat=True).distinct()),
+    )
+    media_assets = await _alookup_media(p.hero_image_url for p in projects_list)
+
+    return await _arender(request, 'projects.html', {
+        'projects': projects_list,
+        'categories': categories,
+        'media_assets': media_assets,
+    })
+
+
+async def project_detail(request, slug):
+    project = await _aget_or_404(
+        Project.objects.prefetch_related(
+            Prefetch('images', queryset=ProjectImage.objects.select_related('asset').prefetch_related('asset__variants'))
+        ),
+        slug=slug
+    )
+
+    # Get related projects (featured first, then fill with any other projects)
+    related_projects = await _alist(
+        Project.objects.exclude(id=project.id).filter(featured=True).order_by('?')[:3]
+    )
+    if len(related_projects) < 3:
+        additional = await _alist(
+            Project.objects.exclude(id=project.id)
+            .exclude(id__in=[p.id for p in related_projects])
+            .order_by('?')[:3 - len(related_projects)]
+        )
+        related_projects += additional
+
+    media_assets = await _alookup_media(
+        [project.hero_image_url] + [p.hero_image_url for p in related_projects]
+    )
+    preload_image(request, project.hero_image_url)
+
+    return await _arender(request, 'project_detail.html', {
+        'project': project,
+        'related_projects': related_projects,
+        'media_assets': media_assets,
+    })
+
+
+async def blog_overview(request):
+    """Blog overview page - list of all published insights"""
+    insights = Insight.objects.filter(status='published').order_by('-published_at', '-created_at')
+
+    # Pagination (Paginator has no async API; count + slice run in the sync thread)
+    paginator = Paginator(insights, 12)
+    page_obj = await sync_to_async(paginator.get_page)(request.GET.get('page', 1))
+    page_obj.object_list = await _alist(page_obj.object_list)
+
+    return await _arender(request, 'blog_page/blog_overview.html', {
+        'insights': page_obj,
+        'page_obj': page_obj,
+    })
+
+
+async def blog_detail(request, slug):
+    """Blog detail page - single insight/article"""
+    insight, related_insights = await asyncio.gather(
+        _aget_or_404(Insight.objects.all(), slug=slug, status='published'),
+        # Fetch one extra so the current insight can be dropped without a second query
+        _alist(Insight.objects.filter(status='published').order_by('-published_at', '-created_at')[:4]),
+    )
+    related_insights = [i for i in related_insights if i.id != insight.id][:3]
+    media_assets = await _alookup_media([insight.featured_image_url])
+    preload_image(request, insight.featured_image_url)
+
+    return await _arender(request, 'blog_page/blog_detail.html', {
+        'insight': insight,
+        'related_insights': related_insights,
+        'media_assets': media_assets,
+    })
@@ -0,0 +1,149 @@
+"""
+Bulk operations for the dashboard lists (drag-and-drop reordering, feature
+toggles, multi-select delete).
+
+One request applies every change in one transaction: the affected rows are read
+once, only the ones that actually change are written with bulk_update (one
+UPDATE ... CASE statement per batch, only the submitted columns), and deletes
+are a single queryset delete. bulk_update and queryset deletes don't send the
+per-object signals, so each target refreshes what those would (caches, counters).
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .content_cache import invalidate_footer_services
+from .models import ContentCounter, MediaAsset, Project, Service
+from .signals import deferred_counters
+
+# Rows one request may touch
+MAX_ROWS = 500
+BATCH_SIZE = 100
+
+
+class BulkActionError(ValueError):
+    """Malformed bulk request (reported to the client as a 400)"""
+
+
+class BulkTarget:
+    """
+    A model the bulk endpoint may change.
+
+    Args:
+        model: Model class
+        fields: Columns an 'update' may set
+        after_change: Called after a successful update or delete
+        counted: Whether ContentCounter tracks the model (without buckets)
+    """
+
+    def __init__(self, model, fields, after_change=None, counted=False):
+        self.model = model
+        self.fields = fields
+        self.after_change = after_change
+        self.counted = counted
+
+    def changed(self):
+        if self.after_change:
+            self.after_change()
+
+
+BULK_TARGETS = {
+    'services': BulkTarget(Service, ['order', 'featured'], after_change=invalidate_footer_services, counted=True),
+    'projects': BulkTarget(Project, ['order', 'featured']),
+}
+
+# Gallery multi-select delete (blog authors too, so not one of the admin BULK_TARGETS);
+# each deleted asset queues its Cloudinary cleanup (see media_cleanup.py)
+GALLERY_TARGET = BulkTarget(MediaAsset, [], counted=True)
+
+
+def parse_ids(values):
+    if not isinstance(values, list) or not values:
+        raise BulkActionError('Expected a non-empty list of ids')
+    if len(values) > MAX_ROWS:
+        raise BulkActionError(f'At most {MAX_ROWS} rows per request')
+    try:
+        return [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise BulkActionError('Ids must be integers')
+
+
+def update_rows(target, rows):
+    """
+    Apply per-row column changes, e.g. [{'id': 4, 'order': 0}, {'id': 9, 'order': 1, 'featured': True}].
+
+    Returns:
+        dict: updated (rows written), missing (ids that no longer exist)
+    """
+    if not isinstance(rows, list):
+        raise BulkActionError("'rows' must be a list")
+    ids = parse_ids([row.get('id') if isinstance(row, dict) else None for row in rows])
+
+    changes = {}
+    columns = set()
+    for pk, row in zip(ids, rows):
+        unknown = set(row) - {'id', *target.fields}
+        if unknown:
+            raise BulkActionError(f"Can't bulk-edit {', '.join(sorted(unknown))}")
+        values = {}
+        for name in target.fields:
+            if name in row:
+                # clean() also rejects None for non-null columns and runs the field's validators
+                try:
+                    values[name] = target.model._meta.get_field(name).clean(row[name], None)
+                except ValidationError as e:
+                    raise BulkActionError(f"Invalid {name} for row {pk}: {' '.join(e.messages)}")
+        changes[pk] = values
+        columns.update(values)
+    if not columns:
+        raise BulkActionError('Nothing to update')
+
+    with transaction.atomic():
+        objects = target.model.objects.select_for_update().only(*columns).in_bulk(list(changes))
+        modified = []
+        for pk, values in changes.items():
+            obj = objects.get(pk)
+            if obj is None:
+                continue
+            if any(getattr(obj, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(obj, name, value)
+                modified.append(obj)
+        target.model.objects.bulk_update(modified, sorted(columns), batch_size=BATCH_SIZE)
+
+    target.changed()
+    return {
+        'updated': len(modified),
+        'missing': [pk for pk in changes if pk not in objects],
+    }
+
+
+def delete_rows(target, ids):
+    """
+    Delete the given rows with one queryset delete.
+
+    Returns:
+        dict: deleted (rows of target.model removed)
+    """
+    ids = parse_ids(ids)
+    # One counter adjustment for the whole delete instead of one per row
+    with transaction.atomic(), deferred_counters(rebuild=False):
+        _, deleted = target.model.objects.filter(pk__in=ids).delete()
+        count = deleted.get(target.model._meta.label, 0)
+        if count and target.counted:
+            ContentCounter.bump(target.model._meta.model_name, -count)
+    target.changed()
+    return {'deleted': count}
+
+
+def apply(target, payload):
+    """
+    Run one bulk request: {"action": "update", "rows": [...]} or {"action": "delete", "ids": [...]}.
+    """
+    if not isinstance(payload, dict):
+        raise BulkActionError('Expected a JSON object')
+    action = payload.get('action')
+    if action == 'update':
+        return update_rows(target, payload.get('rows'))
+    if action == 'delete':
+        return delete_rows(target, payload.get('ids'))
+    raise BulkActionError(f'Unknown action: {action!r}')
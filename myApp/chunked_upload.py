@@ -0,0 +1,207 @@
+"""
+Chunked, resumable gallery uploads for large files.
+
+Protocol (URLs under dashboard/gallery/uploads/, see views.py):
+
+1. POST uploads/ {"filename": ..., "size": ...}
+   -> {"upload_id": ..., "offset": 0, "chunk_size": CHUNK_SIZE}
+2. PUT uploads/<id>/ with the raw chunk bytes as body and the headers
+       Upload-Offset: position of the chunk (= bytes received so far)
+       Upload-Checksum: sha256 <base64 digest of the chunk>
+   -> {"offset": ...}. A chunk at the wrong offset gets a 409 with the current
+   offset, which GET uploads/<id>/ also reports, so a client resumes after a
+   dropped connection instead of starting over.
+3. POST uploads/<id>/finalize/ once every byte has arrived: the assembled file
+   is compressed and stored (media_pipeline.ingest_image). The session is
+   'finalizing' meanwhile, so a second finalize or a cancel gets a 409; when
+   storing fails it becomes 'failed' and finalize can be retried.
+
+Chunks are copied from the request stream to a temporary file READ_BLOCK bytes
+at a time, so a request holds at most one block in memory whatever the chunk or
+file size, and Django's multipart upload handlers are not involved.
+"""
+import base64
+import binascii
+import hashlib
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .media_pipeline import ingest_image
+from .models import UploadSession
+
+CHUNK_SIZE = 8 * 1024 * 1024
+READ_BLOCK = 64 * 1024
+MAX_OPEN_SESSIONS = 10
+# Sessions without a chunk for this long are removed by purge_stale()
+SESSION_MAX_AGE = timedelta(hours=24)
+
+
+class UploadError(ValueError):
+    """
+    Rejected upload request.
+
+    Args:
+        status: HTTP status for the response
+        offset: Bytes received so far, when the client should resume from there
+    """
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def upload_dir():
+    path = Path(settings.CHUNKED_UPLOAD_DIR or Path(tempfile.gettempdir()) / 'chunked-uploads')
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def part_path(session):
+    return upload_dir() / f'{session.pk}.part'
+
+
+def start(user, filename, size):
+    """Open an upload session for a file of `size` bytes"""
+    filename = Path(str(filename or '')).name[:255]
+    if not filename:
+        raise UploadError('Missing filename')
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError('Size must be an integer')
+    if size <= 0:
+        raise UploadError('Size must be positive')
+    if size > settings.CHUNKED_UPLOAD_MAX_BYTES:
+        raise UploadError(f'Files are limited to {settings.CHUNKED_UPLOAD_MAX_BYTES} bytes', status=413)
+    if UploadSession.objects.filter(user=user).count() >= MAX_OPEN_SESSIONS:
+        raise UploadError('Too many uploads in progress', status=429)
+
+    session = UploadSession.objects.create(user=user, filename=filename, size=size)
+    part_path(session).touch()
+    return session
+
+
+def parse_checksum(header):
+    """Digest from an `Upload-Checksum: sha256 <base64>` header"""
+    algorithm, _, value = (header or '').partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise UploadError('Upload-Checksum must be "sha256 <base64 digest>"')
+    try:
+        digest = base64.b64decode(value.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        digest = b''
+    if len(digest) != hashlib.sha256().digest_size:
+        raise UploadError('Malformed Upload-Checksum')
+    return digest
+
+
+def append(session_id, user, offset, length, stream, checksum):
+    """
+    Write one chunk read from `stream` at `offset`.
+
+    Args:
+        offset: Upload-Offset header value
+        length: Chunk length (the request's Content-Length)
+        stream: File-like request body
+        checksum: Upload-Checksum header value
+
+    Returns:
+        UploadSession: The session with the new `received` count
+    """
+    expected = parse_checksum(checksum)
+    try:
+        offset = int(offset)
+        length = int(length or 0)
+    except (TypeError, ValueError):
+        raise UploadError('Upload-Offset and Content-Length must be integers')
+    if length <= 0:
+        raise UploadError('Empty chunk')
+    if length > CHUNK_SIZE:
+        raise UploadError(f'Chunks are limited to {CHUNK_SIZE} bytes', status=413)
+
+    # The row lock serializes chunks of one session (e.g. a retry racing the original request)
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, user=user)
+        if session.status == UploadSession.FINALIZING:
+            raise UploadError('Upload is being finalized', status=409, offset=session.received)
+        if offset != session.received:
+            raise UploadError('Offset does not match the bytes received', status=409, offset=session.received)
+        if offset + length > session.size:
+            raise UploadError('Chunk extends past the declared size', offset=session.received)
+
+        digest = hashlib.sha256()
+        with open(part_path(session), 'r+b') as f:
+            f.seek(offset)
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_BLOCK, remaining))
+                if not block:
+                    break
+                f.write(block)
+                digest.update(block)
+                remaining -= len(block)
+            if remaining or digest.digest() != expected:
+                f.truncate(offset)
+                raise UploadError(
+                    'Chunk incomplete' if remaining else 'Checksum mismatch', offset=session.received
+                )
+
+        session.received = offset + length
+        session.save(update_fields=['received', 'updated_at'])
+    return session
+
+
+def finalize(session_id, user, album=None):
+    """
+    Compress and store a fully received file, then drop the session.
+
+    The row is only locked to claim the session ('finalizing'): compression and
+    the storage upload take seconds and run outside any transaction. When they
+    fail the session is marked 'failed' and kept, so finalize can be retried.
+
+    Returns:
+        MediaAsset
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, user=user)
+        if not session.complete:
+            raise UploadError('Upload incomplete', status=409, offset=session.received)
+        if session.status == UploadSession.FINALIZING:
+            raise UploadError('Upload is already being finalized', status=409)
+        session.status = UploadSession.FINALIZING
+        session.save(update_fields=['status', 'updated_at'])
+
+    try:
+        asset = ingest_image(str(part_path(session)), session.filename, album=album)
+    except Exception:
+        UploadSession.objects.filter(pk=session.pk).update(status=UploadSession.FAILED, updated_at=timezone.now())
+        raise
+    discard(session)
+    return asset
+
+
+def cancel(session_id, user):
+    """Discard an upload and its partial file, unless it is being finalized"""
+    session = UploadSession.objects.get(pk=session_id, user=user)
+    if session.status == UploadSession.FINALIZING:
+        raise UploadError('Upload is being finalized', status=409)
+    discard(session)
+
+
+def discard(session):
+    part_path(session).unlink(missing_ok=True)
+    session.delete()
+
+
+def purge_stale(max_age=SESSION_MAX_AGE):
+    """Remove sessions (and their partial files) idle for longer than `max_age`"""
+    stale = list(UploadSession.objects.filter(updated_at__lt=timezone.now() - max_age))
+    for session in stale:
+        discard(session)
+    return len(stale)
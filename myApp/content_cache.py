@@ -0,0 +1,41 @@
+"""
+Cached content shared by every public page.
+
+Entries are invalidated by signals (see signals.py) and also expire after
+CONTENT_CACHE_TIMEOUT, so per-process caches (LocMemCache) converge across workers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Service
+from . import metrics
+from .profiling import timed
+
+FOOTER_SERVICES_KEY = 'content:footer_services'
+
+
+def get_footer_services():
+    """Featured services for the footer/nav (falls back to the first six services)"""
+    def load():
+        services = list(Service.objects.filter(featured=True).order_by('order', 'title')[:6])
+        if not services:
+            services = list(Service.objects.all().order_by('order', 'title')[:6])
+        return services
+
+    with timed('cache'):
+        services = cache.get(FOOTER_SERVICES_KEY)
+    metrics.count_cache('footer_services', services is not None)
+    if services is None:
+        services = load()
+        with timed('cache'):
+            cache.set(FOOTER_SERVICES_KEY, services, settings.CONTENT_CACHE_TIMEOUT)
+    return services
+
+
+def invalidate_footer_services():
+    cache.delete(FOOTER_SERVICES_KEY)
+
+
+def prime():
+    """Load every content cache entry (used by the startup warm-up)"""
+    get_footer_services()
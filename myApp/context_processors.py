@@ -1,19 +1,16 @@
 """
 Context processors for global template variables
 """
-from .models import Service
+from django.utils.functional import SimpleLazyObject
+
+from .content_cache import get_footer_services
 
 
 def footer_services(request):
     """
     Make services available to all templates for footer navigation
+    (cached; only loaded when a template actually uses them)
     """
-    services = Service.objects.filter(featured=True).order_by('order', 'title')[:6]
-    if not services.exists():
-        # Fallback to all services if no featured services
-        services = Service.objects.all().order_by('order', 'title')[:6]
-    
     return {
-        'footer_services': services,
+        'footer_services': SimpleLazyObject(get_footer_services),
     }
-
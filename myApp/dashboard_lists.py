@@ -0,0 +1,168 @@
+"""
+Shared engine for the dashboard list pages (services, projects, heroes, metadata, users).
+
+Each list is a DashboardList: which columns to load, which sorts are allowed
+(every one backed by an index, see the models' Meta.indexes), what to search and
+which filters to offer. Pages are keyset-paginated (utils/pagination.py).
+
+The table and pager live in a fragment template included by the full page.
+Requests sent with `X-Requested-With: XMLHttpRequest` (the sort, page and search
+controls, see dashboard/base.html) get just the fragment, so the dashboard shell
+is not re-rendered.
+"""
+from django.db.models import Q
+from django.shortcuts import render
+
+from .utils.pagination import keyset_paginate
+
+PAGE_SIZE = 25
+
+# Query parameters that address a page; dropped when sort/search/filters change
+CURSOR_PARAMS = ('after', 'before')
+
+
+class ListFilter:
+    """
+    A dropdown filter, e.g. ListFilter('featured', 'Featured', [('yes', 'Featured', Q(featured=True))]).
+    """
+
+    def __init__(self, param, label, choices):
+        self.param = param
+        self.label = label
+        self.choices = choices
+
+    def condition(self, value):
+        """The Q for a submitted value, or None for unknown values"""
+        for choice, _, condition in self.choices:
+            if choice == value:
+                return condition
+        return None
+
+
+class DashboardList:
+    """
+    One dashboard list page.
+
+    Args:
+        queryset: Model or base queryset
+        template: Full page template (includes fragment_template)
+        fragment_template: Table + pager template
+        context_name: Name of the page of rows in the template context
+        sorts: Sort key -> ordering (ascending form, ending with a unique field)
+        default_sort: Sort key used when none (or an unknown one) is requested
+        fields: Columns to load (.only()); related columns as 'relation__field'
+        select_related: Relations joined in the same query
+        search: Fields matched case-insensitively by ?q=
+        filters: ListFilter instances
+    """
+
+    def __init__(self, queryset, template, fragment_template, context_name, sorts, default_sort,
+                 fields=(), select_related=(), search=(), filters=(), per_page=PAGE_SIZE):
+        self.queryset = queryset
+        self.template = template
+        self.fragment_template = fragment_template
+        self.context_name = context_name
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.fields = fields
+        self.select_related = select_related
+        self.search = search
+        self.filters = filters
+        self.per_page = per_page
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if not hasattr(queryset, 'all'):
+            queryset = queryset.objects
+        queryset = queryset.all()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.fields:
+            queryset = queryset.only(*self.fields)
+        return queryset
+
+    def ordering(self, sort, descending):
+        fields = self.sorts[sort]
+        if not descending:
+            return list(fields)
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in fields]
+
+    def render(self, request, extra_context=None):
+        params = request.GET
+        sort = params.get('sort', self.default_sort)
+        if sort not in self.sorts:
+            sort = self.default_sort
+        descending = params.get('dir') == 'desc'
+        query = params.get('q', '').strip()
+
+        queryset = self.get_queryset()
+        active_filters = {}
+        for list_filter in self.filters:
+            value = params.get(list_filter.param, '')
+            condition = list_filter.condition(value)
+            if condition is not None:
+                queryset = queryset.filter(condition)
+                active_filters[list_filter.param] = value
+        if query and self.search:
+            matches = Q()
+            for field in self.search:
+                matches |= Q(**{f'{field}__icontains': query})
+            queryset = queryset.filter(matches)
+
+        page = keyset_paginate(
+            queryset, self.ordering(sort, descending),
+            after=params.get('after'), before=params.get('before'),
+            per_page=self.per_page,
+        )
+        context = {
+            self.context_name: page,
+            'page': page,
+            'listing': ListingState(request, self, sort, descending, query, active_filters, page),
+            **(extra_context or {}),
+        }
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return render(request, self.fragment_template, context)
+        return render(request, self.template, context)
+
+
+class ListingState:
+    """Current sort/search/filters of a list page and the URLs of its controls"""
+
+    def __init__(self, request, dashboard_list, sort, descending, query, active_filters, page):
+        self.path = request.path
+        self.params = request.GET.copy()
+        for param in CURSOR_PARAMS:
+            self.params.pop(param, None)
+        self.sort = sort
+        self.descending = descending
+        self.query = query
+        self.filters = [
+            {
+                'param': list_filter.param,
+                'label': list_filter.label,
+                'choices': [(value, label) for value, label, _ in list_filter.choices],
+                'value': active_filters.get(list_filter.param, ''),
+            }
+            for list_filter in dashboard_list.filters
+        ]
+        self.searchable = bool(dashboard_list.search)
+        self.sort_links = {
+            key: {
+                'url': self.url(sort=key, dir='desc' if key == sort and not descending else ''),
+                'active': key == sort,
+                'descending': key == sort and descending,
+            }
+            for key in dashboard_list.sorts
+        }
+        self.next_url = self.url(after=page.next_cursor) if page.has_next else None
+        self.previous_url = self.url(before=page.previous_cursor) if page.has_previous else None
+
+    def url(self, **changes):
+        params = self.params.copy()
+        for key, value in changes.items():
+            if value:
+                params[key] = value
+            else:
+                params.pop(key, None)
+        query = params.urlencode()
+        return f'{self.path}?{query}' if query else self.path
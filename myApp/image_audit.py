@@ -0,0 +1,157 @@
+"""
+Audit of the images that content references.
+
+collect_image_urls() gathers every image URL from the content fields
+(AUDIT_FIELDS) and the Editor.js image blocks of insights, remembering where
+each one is used. audit() then requests their headers concurrently with
+asyncio and httpx: at most `concurrency` requests are in flight, over a
+connection pool of the same size. A HEAD request is enough when the server
+reports Content-Length; otherwise (or when HEAD is not allowed) the body is
+streamed and counted.
+
+Every result lists its problems: 'broken' (error or 4xx/5xx), 'not_image'
+(non-image Content-Type) and 'oversized' (more than `max_bytes`).
+`python manage.py audit_images` prints the report.
+"""
+import asyncio
+import time
+from urllib.parse import urljoin
+
+from .media_reoptimize import IMAGE_BLOCKS, content_blocks, field_urls, is_remote
+from .models import Hero, Insight, Metadata, Project, Service
+
+AUDIT_FIELDS = [
+    (Service, 'hero_image_url'),
+    (Project, 'hero_image_url'),
+    (Project, 'gallery_images'),
+    (Insight, 'featured_image_url'),
+    (Hero, 'background_image_url'),
+    (Metadata, 'og_image_url'),
+]
+DEFAULT_CONCURRENCY = 20
+DEFAULT_TIMEOUT = 10
+# Above this an image is heavy for a web page, whatever its format
+DEFAULT_MAX_BYTES = 500_000
+
+
+def collect_image_urls():
+    """
+    Image URLs used by content.
+
+    Returns:
+        dict: url -> list of references such as 'Service 3 hero_image_url'
+    """
+    urls = {}
+    for model, field in AUDIT_FIELDS:
+        for pk, value in model.objects.exclude(**{field: ''}).values_list('pk', field):
+            for url in field_urls(field, value):
+                urls.setdefault(url, []).append(f'{model.__name__} {pk} {field}')
+    for pk, content in Insight.objects.filter(content__contains='"image').values_list('pk', 'content'):
+        _, blocks = content_blocks(content)
+        for block in blocks:
+            url = block.get('data', {}).get('url', '')
+            if block.get('type') in IMAGE_BLOCKS and url:
+                urls.setdefault(url, []).append(f'Insight {pk} content')
+    return urls
+
+
+def new_result(url, error=''):
+    return {'url': url, 'status': None, 'bytes': None, 'content_type': '', 'latency_ms': None, 'error': error}
+
+
+def error_message(exc):
+    return f'{type(exc).__name__}: {exc}'
+
+
+def add_problems(result, max_bytes):
+    problems = []
+    if result['error'] or result['status'] >= 400:
+        problems.append('broken')
+        result['bytes'] = None  # Size of the error page, not of an image
+    else:
+        if not result['content_type'].startswith('image/'):
+            problems.append('not_image')
+        if result['bytes'] is not None and result['bytes'] > max_bytes:
+            problems.append('oversized')
+    result['problems'] = problems
+    return result
+
+
+async def check_url(client, url, max_bytes):
+    """Status, size, content type and time to headers of one image"""
+    import httpx
+
+    result = new_result(url)
+    try:
+        started = time.perf_counter()
+        response = await client.head(url)
+        if response.status_code in (405, 501) or (
+            response.status_code < 400 and 'content-length' not in response.headers
+        ):
+            # No HEAD support or no length: stream the body and count it
+            started = time.perf_counter()
+            async with client.stream('GET', url) as response:
+                result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+            result['bytes'] = size
+        else:
+            result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            if 'content-length' in response.headers:
+                result['bytes'] = int(response.headers['content-length'])
+        result['status'] = response.status_code
+        result['content_type'] = response.headers.get('content-type', '').split(';')[0].strip()
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError) as exc:
+        # InvalidURL (e.g. a malformed host in content) is not an HTTPError
+        result['error'] = error_message(exc)
+    return add_problems(result, max_bytes)
+
+
+async def audit(urls, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                max_bytes=DEFAULT_MAX_BYTES, base_url=None):
+    """
+    Check `urls` concurrently.
+
+    Args:
+        urls: Image URLs (dict url -> references, as from collect_image_urls, or a list)
+        concurrency: Requests in flight and pooled connections
+        timeout: Seconds per request
+        max_bytes: Size above which an image is reported as oversized
+        base_url: Resolves relative URLs (e.g. local media); they are skipped without it
+
+    Returns:
+        dict: results (one per checked URL, with its references) and skipped (relative URLs)
+    """
+    import httpx
+
+    references = urls if isinstance(urls, dict) else {url: [] for url in urls}
+    targets = {}
+    skipped = []
+    for url in references:
+        if is_remote(url):
+            targets[url] = url
+        elif base_url:
+            targets[url] = urljoin(base_url, url)
+        else:
+            skipped.append(url)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True) as client:
+        async def bounded(target):
+            async with semaphore:
+                return await check_url(client, target, max_bytes)
+
+        outcomes = await asyncio.gather(*(bounded(target) for target in targets.values()), return_exceptions=True)
+
+    results = []
+    for (url, target), result in zip(targets.items(), outcomes):
+        if isinstance(result, Exception):
+            # An error check_url does not expect breaks only its own URL, not the whole audit
+            result = add_problems(new_result(target, error_message(result)), max_bytes)
+        result['url'] = url
+        result['references'] = references[url]
+        results.append(result)
+    return {'results': results, 'skipped': skipped}
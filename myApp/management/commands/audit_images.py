@@ -0,0 +1,75 @@
+"""
+Management command to check every image that content references (see image_audit.py):
+size, latency, content type and broken links, fetched concurrently.
+Run with: python manage.py audit_images [--concurrency 20] [--timeout 10] [--max-bytes 500000] [--base-url https://example.com] [--output audit.json] [--check]
+"""
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.image_audit import DEFAULT_CONCURRENCY, DEFAULT_MAX_BYTES, DEFAULT_TIMEOUT, audit, collect_image_urls
+from myApp.utils.benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = 'Report size, latency and broken links of the images content references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                            help='Requests in flight / pooled connections')
+        parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds per request')
+        parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                            help='Report images larger than this as oversized')
+        parser.add_argument('--base-url', help='Site URL to resolve relative image URLs (e.g. /media/...) against')
+        parser.add_argument('--output', help='Write JSON results to this file')
+        parser.add_argument('--check', action='store_true', help='Fail if any image is broken')
+
+    def handle(self, *args, **options):
+        urls = collect_image_urls()
+        if not urls:
+            self.stdout.write('No image URLs in content')
+            return
+
+        report = asyncio.run(audit(
+            urls,
+            concurrency=options['concurrency'],
+            timeout=options['timeout'],
+            max_bytes=options['max_bytes'],
+            base_url=options['base_url'],
+        ))
+        results = sorted(report['results'], key=lambda r: ('broken' not in r['problems'], -(r['bytes'] or 0)))
+
+        self.stdout.write(f"{'status':>6} {'bytes':>11} {'ms':>7}  {'problems':<20} url")
+        for result in results:
+            size = f"{result['bytes']:,}" if result['bytes'] is not None else '-'
+            latency = f"{result['latency_ms']:.0f}" if result['latency_ms'] is not None else '-'
+            self.stdout.write(
+                f"{result['status'] or 'error':>6} {size:>11} {latency:>7}  "
+                f"{','.join(result['problems']) or 'ok':<20} {result['url']}"
+            )
+
+        broken = [r for r in results if 'broken' in r['problems']]
+        oversized = [r for r in results if 'oversized' in r['problems']]
+        not_image = [r for r in results if 'not_image' in r['problems']]
+        latencies = [r['latency_ms'] for r in results if r['latency_ms'] is not None]
+        self.stdout.write(
+            f"\n{len(results)} images checked ({len(report['skipped'])} relative URLs skipped, see --base-url): "
+            f"{sum(r['bytes'] or 0 for r in results):,} bytes, "
+            f"latency p50 {percentile(latencies, 50):.0f} ms / p95 {percentile(latencies, 95):.0f} ms"
+        )
+        style = self.style.WARNING if broken or oversized or not_image else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{len(broken)} broken, {len(oversized)} over {options['max_bytes']:,} bytes, {len(not_image)} not images"
+        ))
+        for result in broken:
+            self.stdout.write(f"  {result['url']} ({result['error'] or result['status']}): "
+                              f"{'; '.join(result['references'])}")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['check'] and broken:
+            raise CommandError(f'{len(broken)} broken image references')
@@ -0,0 +1,102 @@
+"""
+Management command to compare throughput of the sync (WSGI) and async (ASGI) public views.
+Run with: python manage.py bench_async_views --requests 500 --concurrency 16
+
+Both stacks are driven in-process against a seeded throwaway database:
+- WSGI: myApp.views through the WSGI handler, one thread per concurrent client
+- ASGI: myApp.async_views through the ASGI handler, concurrent asyncio tasks
+"""
+import asyncio
+import importlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+
+from myApp.utils.benchmark import benchmark_database, summarize
+from myApp.warmup import public_page_urls
+
+
+def use_async_views(enabled):
+    """Re-import the URLconf with ASYNC_PUBLIC_VIEWS toggled"""
+    settings.ASYNC_PUBLIC_VIEWS = enabled
+    clear_url_caches()
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync (WSGI) vs async (ASGI) public views in-process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help='Requests per stack')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def run_wsgi(self, urls, total, concurrency):
+        local = threading.local()
+
+        def fetch(i):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            client = local.client
+            start = time.perf_counter()
+            response = client.get(urls[i % len(urls)])
+            assert response.status_code == 200, (urls[i % len(urls)], response.status_code)
+            return time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(fetch, range(total)))
+        return summarize(latencies, time.perf_counter() - started)
+
+    def run_asgi(self, urls, total, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(urls[i % len(urls)])
+                    assert response.status_code == 200, (urls[i % len(urls)], response.status_code)
+                    return time.perf_counter() - start
+
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(fetch(i) for i in range(total)))
+            return summarize(list(latencies), time.perf_counter() - started)
+
+        return asyncio.run(main())
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        original = settings.ASYNC_PUBLIC_VIEWS
+
+        with override_settings(ALLOWED_HOSTS=['testserver']), benchmark_database():
+            urls = public_page_urls()
+            try:
+                use_async_views(False)
+                self.run_wsgi(urls, len(urls), 1)  # warm-up (template compilation)
+                results = {'wsgi': self.run_wsgi(urls, total, concurrency)}
+
+                use_async_views(True)
+                self.run_asgi(urls, len(urls), 1)
+                results['asgi'] = self.run_asgi(urls, total, concurrency)
+            finally:
+                use_async_views(original)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'urls': urls, 'concurrency': concurrency, 'results': results}, indent=2))
+            return
+
+        self.stdout.write(f'{len(urls)} public URLs, {total} requests per stack, concurrency {concurrency}\n')
+        self.stdout.write(f"{'stack':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stack, stats in results.items():
+            self.stdout.write(
+                f"{stack:<6} {stats['rps']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+            )
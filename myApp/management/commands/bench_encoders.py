@@ -0,0 +1,210 @@
+"""
+Management command to compare the upload encoders (AVIF, WebP) on a photo corpus.
+Run with: python manage.py bench_encoders [--corpus photos/] [--formats avif,webp] [--profile auto] [--grid] [--output encoders.json]
+
+Each image goes through the same preparation and candidate encoding as an
+upload (utils/image_encoding.py): per format it reports output bytes, the
+quality the size target settled on, encode time and PSNR against the source,
+and marks the candidate the negotiation would store. Without --corpus a set
+of synthetic landscape photos is generated.
+
+--grid instead encodes every image at each encoder effort (WebP method, AVIF
+speed) and quality, and compares the measured cost per megapixel with the
+one the encoder profiles assume, so the profiles can be recalibrated from data.
+"""
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.utils.benchmark import synthetic_landscape
+from myApp.utils.cloudinary_utils import TARGET_BYTES, prepare_image
+from myApp.utils.image_encoding import (
+    PROFILES, START_QUALITY, EncoderProfile, available_formats, choose_encoding, encode, psnr, select_profile,
+)
+
+CORPUS_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.tif', '.tiff'}
+
+# --grid: efforts (WebP method / AVIF speed, slowest last) and qualities measured per format;
+# covers every profile's setting at the starting quality
+GRID_EFFORTS = {'webp': [0, 2, 4, 5, 6], 'avif': [10, 9, 8, 6]}
+GRID_QUALITIES = {'webp': [75, 85, 95], 'avif': [50, 60, 70]}
+# Image sizes the selector table shows the 'auto' choice for
+SELECTOR_MEGAPIXELS = [0.5, 1, 2, 4, 8, 12, 24]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bytes, encode time and PSNR per upload format over a photo corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help='Directory of sample photos (default: synthetic landscapes)')
+        parser.add_argument('--synthetic', type=int, default=6, help='Synthetic photos to generate without --corpus')
+        parser.add_argument('--size', default='2400x1600', help='Synthetic photo size, WIDTHxHEIGHT')
+        parser.add_argument('--formats', default='', help='Comma-separated formats (default: MEDIA_ENCODE_FORMATS)')
+        parser.add_argument('--floor', type=float, default=None, help='Quality floor in dB (default: MEDIA_QUALITY_FLOOR_DB)')
+        parser.add_argument('--profile', choices=['auto', *PROFILES], default=None,
+                            help='Encoder profile (default: MEDIA_ENCODE_PROFILE)')
+        parser.add_argument('--grid', action='store_true',
+                            help='Measure every effort/quality combination instead of negotiating')
+        parser.add_argument('--output', help='Write JSON results to this file')
+
+    def corpus(self, options):
+        """Yield (name, prepared image)"""
+        from PIL import Image
+
+        if options['corpus']:
+            paths = sorted(
+                path for path in Path(options['corpus']).iterdir()
+                if path.suffix.lower() in CORPUS_EXTENSIONS
+            )
+            if not paths:
+                raise CommandError(f"No images in {options['corpus']}")
+            for path in paths:
+                with Image.open(path) as im:
+                    yield path.name, prepare_image(im)
+        else:
+            try:
+                width, height = (int(value) for value in options['size'].lower().split('x'))
+            except ValueError:
+                raise CommandError('--size must look like 2400x1600')
+            for seed in range(options['synthetic']):
+                yield f'landscape-{seed}', synthetic_landscape(width, height, seed=seed)
+
+    def handle(self, *args, **options):
+        formats = available_formats([fmt.strip() for fmt in options['formats'].split(',') if fmt.strip()] or None)
+        images = list(self.corpus(options))
+        if not images:
+            raise CommandError('No images to benchmark')
+
+        if options['grid']:
+            report = self.run_grid(images, formats)
+        else:
+            report = self.run_negotiation(images, formats, options)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run_negotiation(self, images, formats, options):
+        floor = options['floor'] if options['floor'] is not None else settings.MEDIA_QUALITY_FLOOR_DB
+        profile = options['profile'] or settings.MEDIA_ENCODE_PROFILE
+
+        results = []
+        header = (f"{'image':<28} {'profile':<8} {'format':<6} {'quality':>7} {'bytes':>11} "
+                  f"{'encode ms':>10} {'psnr dB':>8}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, im in images:
+            started = time.perf_counter()
+            encoding = choose_encoding(im, TARGET_BYTES, formats=formats, floor_db=floor, profile=profile)
+            total_ms = (time.perf_counter() - started) * 1000
+            label = f'{name} ({im.width}x{im.height})'
+            used = encoding['profile']
+            for fmt, candidate in encoding['candidates'].items():
+                marker = ' *' if fmt == encoding['format'] else ''
+                self.stdout.write(
+                    f"{label:<28} {used:<8} {fmt:<6} {candidate['quality']:>7} {candidate['bytes']:>11,} "
+                    f"{candidate['encode_ms']:>10.0f} {candidate['psnr']:>8.2f}{marker}"
+                )
+                label = used = ''
+            results.append({
+                'image': name,
+                'width': im.width,
+                'height': im.height,
+                'profile': encoding['profile'],
+                'chosen': encoding['format'],
+                'savings_bytes': encoding['savings_bytes'],
+                'total_ms': round(total_ms, 1),
+                'candidates': encoding['candidates'],
+            })
+
+        self.stdout.write('')
+        self.stdout.write(f"{'format':<6} {'total bytes':>13} {'vs webp':>8} {'mean encode ms':>15} {'mean psnr':>10} {'chosen':>7}")
+        webp_total = sum(r['candidates']['webp']['bytes'] for r in results) if 'webp' in formats else 0
+        summary = {}
+        for fmt in formats:
+            rows = [r['candidates'][fmt] for r in results]
+            total = sum(row['bytes'] for row in rows)
+            summary[fmt] = {
+                'total_bytes': total,
+                'mean_encode_ms': round(sum(row['encode_ms'] for row in rows) / len(rows), 1),
+                'mean_psnr': round(sum(row['psnr'] for row in rows) / len(rows), 2),
+                'chosen': sum(1 for r in results if r['chosen'] == fmt),
+            }
+            ratio = f'{(total / webp_total - 1) * 100:+.1f}%' if webp_total else '-'
+            self.stdout.write(
+                f"{fmt:<6} {total:>13,} {ratio:>8} {summary[fmt]['mean_encode_ms']:>15.0f} "
+                f"{summary[fmt]['mean_psnr']:>10.2f} {summary[fmt]['chosen']:>7}"
+            )
+        stored = sum(r['candidates'][r['chosen']]['bytes'] for r in results)
+        self.stdout.write(self.style.SUCCESS(
+            f"\nNegotiated total: {stored:,} bytes"
+            + (f" ({(stored / webp_total - 1) * 100:+.1f}% vs WebP only)" if webp_total else '')
+            + f", quality floor {floor} dB, profile {profile} (* = stored candidate)"
+        ))
+        return {'floor_db': floor, 'profile': profile, 'formats': formats, 'images': results, 'summary': summary}
+
+    def run_grid(self, images, formats):
+        megapixels = sum(im.width * im.height for _, im in images) / 1_000_000
+        rows = []
+        header = f"{'format':<6} {'effort':>6} {'quality':>7} {'ms/MP':>8} {'total bytes':>13} {'vs slowest':>10} {'psnr dB':>8}"
+        self.stdout.write(f'{len(images)} images, {megapixels:.1f} megapixels\n')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for fmt in formats:
+            measured = {}
+            for effort in GRID_EFFORTS[fmt]:
+                setting = EncoderProfile('grid', webp_method=effort, avif_speed=effort, ms_per_megapixel={})
+                for quality in GRID_QUALITIES[fmt]:
+                    elapsed = 0.0
+                    total = 0
+                    fidelity = 0.0
+                    for _, im in images:
+                        started = time.perf_counter()
+                        data = encode(im, fmt, quality, setting)
+                        elapsed += time.perf_counter() - started
+                        total += len(data)
+                        fidelity += psnr(im, data)
+                    measured[effort, quality] = {
+                        'format': fmt,
+                        'effort': effort,
+                        'quality': quality,
+                        'ms_per_megapixel': round(elapsed * 1000 / megapixels, 1),
+                        'total_bytes': total,
+                        'mean_psnr': round(fidelity / len(images), 2),
+                    }
+            slowest = GRID_EFFORTS[fmt][-1]
+            for (effort, quality), row in measured.items():
+                baseline = measured[slowest, quality]['total_bytes']
+                self.stdout.write(
+                    f"{fmt:<6} {effort:>6} {quality:>7} {row['ms_per_megapixel']:>8.0f} {row['total_bytes']:>13,} "
+                    f"{(row['total_bytes'] / baseline - 1) * 100:>+9.1f}% {row['mean_psnr']:>8.2f}"
+                )
+                rows.append(row)
+            self.stdout.write('')
+
+        # Profiles: measured cost at the starting quality vs the ms_per_megapixel they assume
+        self.stdout.write(f"{'profile':<9} {'format':<6} {'effort':>6} {'measured ms/MP':>15} {'assumed ms/MP':>14}")
+        calibration = {}
+        for profile in PROFILES.values():
+            for fmt in formats:
+                effort = profile.options(fmt)['method' if fmt == 'webp' else 'speed']
+                row = next(r for r in rows if r['format'] == fmt and r['effort'] == effort
+                           and r['quality'] == START_QUALITY[fmt])
+                calibration.setdefault(profile.name, {})[fmt] = row['ms_per_megapixel']
+                self.stdout.write(
+                    f"{profile.name:<9} {fmt:<6} {effort:>6} {row['ms_per_megapixel']:>15.0f} "
+                    f"{profile.ms_per_megapixel[fmt]:>14}"
+                )
+
+        budget = settings.MEDIA_ENCODE_BUDGET_MS
+        self.stdout.write(f"\n'auto' selection with MEDIA_ENCODE_BUDGET_MS={budget}:")
+        for size in SELECTOR_MEGAPIXELS:
+            profile = select_profile(int(size * 1_000_000), formats, name='auto', budget_ms=budget)
+            self.stdout.write(
+                f"  {size:>5} MP -> {profile.name:<9} (estimated {profile.estimate_ms(size * 1_000_000, formats):.0f} ms)"
+            )
+        return {'formats': formats, 'megapixels': round(megapixels, 2), 'grid': rows, 'calibration': calibration}
@@ -0,0 +1,46 @@
+"""
+Management command to measure process startup import time.
+Run with: python manage.py bench_imports [--runs 5] [--top 15] [--check]
+
+Uses `python -X importtime` on a fresh interpreter that loads the WSGI
+application and URLconf, like a gunicorn worker does on boot.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.utils.import_timing import LAZY_MODULES, best_of
+
+
+class Command(BaseCommand):
+    help = 'Measure startup import time and compare it with IMPORT_TIME_BUDGET_MS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Cold starts to run (fastest is reported)')
+        parser.add_argument('--top', type=int, default=15, help='Number of slowest packages to list')
+        parser.add_argument('--check', action='store_true', help='Fail if over budget or a lazy module is imported')
+
+    def handle(self, *args, **options):
+        result = best_of(options['runs'])
+        budget = settings.IMPORT_TIME_BUDGET_MS
+
+        # Only top-level packages, so cumulative times don't double count
+        packages = sorted(
+            ((stats['cumulative_ms'], name) for name, stats in result['modules'].items() if '.' not in name),
+            reverse=True
+        )[:options['top']]
+
+        self.stdout.write(f"{'package':<30} {'cumulative ms':>14}")
+        for cumulative_ms, name in packages:
+            self.stdout.write(f'{name:<30} {cumulative_ms:>14.1f}')
+
+        eager = [name for name in LAZY_MODULES if name in result['loaded']]
+        self.stdout.write(f"\nTotal import time: {result['total_ms']:.1f} ms (budget {budget} ms)")
+        if eager:
+            self.stdout.write(self.style.WARNING(f"Imported at startup but should be lazy: {', '.join(eager)}"))
+
+        if options['check']:
+            if result['total_ms'] > budget:
+                raise CommandError(f"Startup import time {result['total_ms']:.1f} ms exceeds budget of {budget} ms")
+            if eager:
+                raise CommandError(f"Lazy modules imported at startup: {', '.join(eager)}")
+            self.stdout.write(self.style.SUCCESS('✓ Within import-time budget'))
@@ -0,0 +1,429 @@
+"""
+Management command to benchmark every route in myProject/urls.py through the WSGI handler.
+Run with: python manage.py bench_routes --requests 50 --concurrency 4 --output bench.json
+
+Runs offline against a seeded throwaway database:
+- dashboard routes are driven as the admin or blog-author role they require
+- Cloudinary uploads and Resend emails are replaced with in-process fakes
+- per route: p50/p95/p99 latency, requests/sec, queries and response bytes per request
+
+Compare two releases with: python manage.py bench_routes --compare baseline.json
+"""
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import platform
+import queue
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+import django
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from myApp import chunked_upload
+from myApp.models import Hero, Insight, MediaAsset, Metadata, Project, Service, UploadSession
+from myApp.utils.benchmark import benchmark_database, offline_services, summarize
+
+PASSWORD = 'bench-password'
+
+# Routes deliberately left out: the Prometheus endpoint only exists with METRICS_ENABLED,
+# local media only with MEDIA_STORAGE_BACKEND='local' (benchmarks run against the Cloudinary fake)
+SKIPPED_ROUTES = {'metrics', 'local_media'}
+
+
+def route(name, method='GET', role=None, kwargs=None, data=None, fresh_session=False, json=False, headers=None):
+    """
+    Describe one benchmarked request.
+
+    Args:
+        name: URL name (reverse()-able)
+        method: 'GET', 'POST' or 'PUT'
+        role: None (anonymous), 'admin' or 'author'
+        kwargs: Callable(i) -> reverse() kwargs, called untimed before each request
+                (lets delete routes get a fresh object every time)
+        data: Callable(i) -> POST data
+        fresh_session: Use a new client per request (login/logout change the session)
+        json: POST the data as a JSON body instead of form fields
+        headers: Extra request headers (PUT sends `data` bytes as the raw body)
+    """
+    return {
+        'key': f'{method} {name}' + (f' ({role})' if role else ''),
+        'name': name,
+        'method': method,
+        'role': role,
+        'kwargs': kwargs or (lambda i: {}),
+        'data': data or (lambda i: {}),
+        'fresh_session': fresh_session,
+        'json': json,
+        'headers': headers or {},
+    }
+
+
+def tiny_png():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (184, 146, 42)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class Fixtures:
+    """Users and objects the routes need, created once after seeding"""
+
+    def __init__(self):
+        self.seq = count()
+        self.admin = User.objects.create_superuser('bench_admin', 'admin@example.com', PASSWORD)
+        self.author = User.objects.create_user('bench_author', 'author@example.com', PASSWORD)
+        # Through the cached profiles: saving the user (last_login) re-saves them
+        for user, role in ((self.admin, 'admin'), (self.author, 'blog_author')):
+            user.profile.role = role
+            user.profile.save()
+
+        self.service = Service.objects.order_by('order', 'title').first()
+        self.project = Project.objects.first()
+        self.insight = Insight.objects.filter(status='published').first()
+        self.hero = Hero.objects.first() or Hero.objects.create(title='Bench hero')
+        self.metadata = Metadata.objects.first() or Metadata.objects.create(title='Bench metadata')
+        self.own_insight = Insight.objects.create(
+            title='Bench author insight', slug='bench-author-insight', author=self.author, status='draft'
+        )
+        self.png = tiny_png()
+        self.png_checksum = 'sha256 ' + base64.b64encode(hashlib.sha256(self.png).digest()).decode()
+
+    def unique(self, prefix):
+        return f'{prefix} {next(self.seq)}'
+
+    def unique_slug(self):
+        return f'bench-{next(self.seq)}'
+
+    def new_pk(self, model, **fields):
+        return {'pk': model.objects.create(**fields).pk}
+
+    def upload_session(self, complete=False):
+        """Chunked upload of the fixture PNG, optionally with every byte received"""
+        session = UploadSession.objects.create(
+            user=self.author, filename=f'bench-{next(self.seq)}.png', size=len(self.png),
+            received=len(self.png) if complete else 0,
+        )
+        chunked_upload.part_path(session).write_bytes(self.png if complete else b'')
+        return {'upload_id': session.pk}
+
+    def upload_start(self, i):
+        # Keeps the author below chunked_upload.MAX_OPEN_SESSIONS
+        UploadSession.objects.filter(user=self.author).delete()
+        return {'filename': f'bench-{i}.png', 'size': len(self.png)}
+
+    def reorder_payload(self, model, rows=50):
+        """Drag-and-drop reorder of one page: reverse the current order of the first rows"""
+        ids = list(model.objects.order_by('order', 'id').values_list('id', flat=True)[:rows])
+        return {'action': 'update', 'rows': [{'id': pk, 'order': i} for i, pk in enumerate(reversed(ids))]}
+
+    def routes(self):
+        f = self
+        return [
+            # Public pages
+            route('home'),
+            route('home_ar'),
+            route('services'),
+            route('service_detail', kwargs=lambda i: {'slug': f.service.slug}),
+            route('projects'),
+            route('project_detail', kwargs=lambda i: {'slug': f.project.slug}),
+            route('blog_overview'),
+            route('blog_detail', kwargs=lambda i: {'slug': f.insight.slug}),
+            route('contact_form_submit', 'POST', data=lambda i: {
+                'name': 'Bench Visitor', 'email': 'visitor@example.com', 'phone': '+971500000000',
+                'message': 'Garden consultation please', 'terms_accepted': 'on', 'form_type': 'consultation',
+            }),
+
+            # Authentication
+            route('dashboard_login'),
+            route('dashboard_login', 'POST', fresh_session=True,
+                  data=lambda i: {'username': 'bench_admin', 'password': PASSWORD}),
+            route('dashboard_logout', role='admin', fresh_session=True),
+            route('dashboard_home', role='admin'),
+            route('dashboard_home', role='author'),
+            route('dashboard_performance', role='admin'),
+
+            # Services
+            route('dashboard_services_list', role='admin'),
+            route('dashboard_service_create', role='admin'),
+            route('dashboard_service_create', 'POST', role='admin',
+                  data=lambda i: {'title': f.unique('Bench service'), 'order': '99'}),
+            route('dashboard_service_edit', role='admin', kwargs=lambda i: {'pk': f.service.pk}),
+            route('dashboard_service_edit', 'POST', role='admin', kwargs=lambda i: {'pk': f.service.pk},
+                  data=lambda i: {'title': f.service.title, 'short_description': f.service.short_description,
+                                  'order': str(f.service.order), 'featured': 'on'}),
+            route('dashboard_service_delete', 'POST', role='admin',
+                  kwargs=lambda i: f.new_pk(Service, title=f.unique('Bench doomed service'))),
+            route('dashboard_services_bulk', 'POST', role='admin', json=True,
+                  data=lambda i: f.reorder_payload(Service)),
+
+            # Insights
+            route('dashboard_insights_list', role='admin'),
+            route('dashboard_insights_list', role='author'),
+            route('dashboard_insight_create', role='author'),
+            route('dashboard_insight_create', 'POST', role='author',
+                  data=lambda i: {'title': f.unique('Bench insight'), 'status': 'draft',
+                                  'content': '{"blocks": []}'}),
+            route('dashboard_insight_edit', role='author', kwargs=lambda i: {'pk': f.own_insight.pk}),
+            route('dashboard_insight_edit', 'POST', role='author', kwargs=lambda i: {'pk': f.own_insight.pk},
+                  data=lambda i: {'title': 'Bench author insight', 'status': 'draft', 'excerpt': 'Edited'}),
+            route('dashboard_insight_delete', 'POST', role='author',
+                  kwargs=lambda i: f.new_pk(Insight, title=f.unique('Bench doomed insight'), author=f.author)),
+
+            # Projects
+            route('dashboard_projects_list', role='admin'),
+            route('dashboard_project_create', role='admin'),
+            route('dashboard_project_create', 'POST', role='admin',
+                  data=lambda i: {'title': f.unique('Bench project'), 'location': 'Dubai', 'category': 'Villa',
+                                  'gallery_images': f.project.gallery_images, 'order': '99'}),
+            route('dashboard_project_edit', role='admin', kwargs=lambda i: {'pk': f.project.pk}),
+            route('dashboard_project_edit', 'POST', role='admin', kwargs=lambda i: {'pk': f.project.pk},
+                  data=lambda i: {'title': f.project.title, 'location': f.project.location,
+                                  'category': f.project.category, 'gallery_images': f.project.gallery_images,
+                                  'related_service': f.project.related_service_id or '',
+                                  'order': str(f.project.order)}),
+            route('dashboard_project_delete', 'POST', role='admin',
+                  kwargs=lambda i: f.new_pk(Project, title=f.unique('Bench doomed project'))),
+            route('dashboard_projects_bulk', 'POST', role='admin', json=True,
+                  data=lambda i: f.reorder_payload(Project)),
+
+            # Heroes
+            route('dashboard_heroes_list', role='admin'),
+            route('dashboard_hero_create', role='admin'),
+            route('dashboard_hero_create', 'POST', role='admin',
+                  data=lambda i: {'page': 'custom', 'custom_slug': f.unique_slug(), 'title': 'Bench hero', 'order': '99'}),
+            route('dashboard_hero_edit', role='admin', kwargs=lambda i: {'pk': f.hero.pk}),
+            route('dashboard_hero_edit', 'POST', role='admin', kwargs=lambda i: {'pk': f.hero.pk},
+                  data=lambda i: {'page': f.hero.page, 'custom_slug': f.hero.custom_slug, 'title': f.hero.title, 'active': 'on',
+                                  'stats_data': f.hero.stats_data, 'order': str(f.hero.order)}),
+            route('dashboard_hero_delete', 'POST', role='admin',
+                  kwargs=lambda i: f.new_pk(Hero, page='custom', custom_slug=f.unique_slug(), title='Bench doomed hero')),
+
+            # Metadata
+            route('dashboard_metadata_list', role='admin'),
+            route('dashboard_metadata_create', role='admin'),
+            route('dashboard_metadata_create', 'POST', role='admin',
+                  data=lambda i: {'page': 'custom', 'custom_slug': f.unique_slug(), 'title': 'Bench meta'}),
+            route('dashboard_metadata_edit', role='admin', kwargs=lambda i: {'pk': f.metadata.pk}),
+            route('dashboard_metadata_edit', 'POST', role='admin', kwargs=lambda i: {'pk': f.metadata.pk},
+                  data=lambda i: {'page': f.metadata.page, 'custom_slug': f.metadata.custom_slug,
+                                  'title': f.metadata.title}),
+            route('dashboard_metadata_delete', 'POST', role='admin',
+                  kwargs=lambda i: f.new_pk(Metadata, page='custom', custom_slug=f.unique_slug(), title='Bench doomed meta')),
+
+            # Intro settings
+            route('dashboard_intro_settings', role='admin'),
+            route('dashboard_intro_settings', 'POST', role='admin', data=lambda i: {'use_svg_fallback': 'on'}),
+
+            # Gallery
+            route('dashboard_gallery', role='author'),
+            route('gallery_api_list', role='author'),
+            route('gallery_api_upload', 'POST', role='author',
+                  data=lambda i: {'files': SimpleUploadedFile(f'bench-{i}.png', f.png, 'image/png')}),
+            route('gallery_api_delete', 'POST', role='author',
+                  kwargs=lambda i: f.new_pk(MediaAsset, title=f.unique('Bench doomed asset'))),
+            route('gallery_api_bulk_delete', 'POST', role='author', json=True,
+                  data=lambda i: {'ids': [f.new_pk(MediaAsset, title=f.unique('Bench doomed asset'),
+                                                   public_id=f.unique_slug())['pk'] for _ in range(10)]}),
+            route('gallery_upload_start', 'POST', role='author', json=True,
+                  data=f.upload_start),
+            route('gallery_upload_chunk', role='author', kwargs=lambda i: f.upload_session()),
+            route('gallery_upload_chunk', 'PUT', role='author', kwargs=lambda i: f.upload_session(),
+                  data=lambda i: f.png, headers={'Upload-Offset': '0', 'Upload-Checksum': f.png_checksum}),
+            route('gallery_upload_finalize', 'POST', role='author', kwargs=lambda i: f.upload_session(complete=True)),
+
+            # Users
+            route('dashboard_users_list', role='admin'),
+            route('dashboard_user_edit', role='admin', kwargs=lambda i: {'pk': f.author.pk}),
+            route('dashboard_user_edit', 'POST', role='admin', kwargs=lambda i: {'pk': f.author.pk},
+                  data=lambda i: {'role': 'blog_author'}),
+
+            # Django admin
+            route('admin:index', role='admin'),
+            route('admin:myApp_insight_changelist', role='admin'),
+        ]
+
+
+def url_names(patterns=None, namespace=''):
+    """Every named route in the root URLconf (namespaced as 'ns:name')"""
+    names = set()
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            names |= url_names(pattern.url_patterns, f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(f'{namespace}{pattern.name}')
+    return names
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every public and dashboard route offline (latency, req/s, queries, bytes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30, help='Requests per route')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients for read routes')
+        parser.add_argument('--scale', type=int, default=0,
+                            help='Also run generate_load_data at this scale (0 = seed_all data only)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for generate_load_data')
+        parser.add_argument('--route', action='append', default=[],
+                            help='Only routes whose name contains this text (repeatable)')
+        parser.add_argument('--output', help='Write JSON results to this file')
+        parser.add_argument('--json', action='store_true', help='Print JSON results to stdout')
+        parser.add_argument('--compare', help='Baseline JSON file to compare against')
+
+    def run_route(self, spec, fixtures, total, concurrency):
+        users = {'admin': fixtures.admin, 'author': fixtures.author}
+        lock = threading.Lock()
+
+        def new_client():
+            client = Client()
+            if spec['role']:
+                client.force_login(users[spec['role']])
+            return client
+
+        # Log clients in up front: logins write, and SQLite rejects writes
+        # while other connections are reading the same table
+        clients = queue.SimpleQueue()
+        if not spec['fresh_session']:
+            for _ in range(concurrency):
+                clients.put(new_client())
+
+        def fetch(i):
+            with lock:  # fixture factories write; keep them out of the timed section
+                client = new_client() if spec['fresh_session'] else clients.get()
+                url = reverse(spec['name'], kwargs=spec['kwargs'](i))
+                data = spec['data'](i)
+
+            queries = [0]
+
+            def count_queries(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_queries):
+                start = time.perf_counter()
+                if spec['method'] == 'POST' and spec['json']:
+                    response = client.post(url, data, content_type='application/json')
+                elif spec['method'] == 'POST':
+                    response = client.post(url, data)
+                elif spec['method'] == 'PUT':
+                    response = client.put(url, data, content_type='application/octet-stream', headers=spec['headers'])
+                else:
+                    response = client.get(url)
+                elapsed = time.perf_counter() - start
+            if not spec['fresh_session']:
+                clients.put(client)
+            return elapsed, queries[0], len(response.content), response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(fetch, range(total)))
+        stats = summarize([s[0] for s in samples], time.perf_counter() - started)
+        stats.update({
+            'queries': round(statistics.fmean(s[1] for s in samples), 1),
+            'bytes': round(statistics.fmean(s[2] for s in samples)),
+            'status': sorted({s[3] for s in samples}),
+            'errors': sum(1 for s in samples if s[3] >= 400),
+        })
+        return stats
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+
+        with override_settings(ALLOWED_HOSTS=['testserver']), benchmark_database(), offline_services(), \
+                tempfile.TemporaryDirectory() as upload_dir, override_settings(CHUNKED_UPLOAD_DIR=upload_dir):
+            if options['scale']:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    call_command('generate_load_data', scale=options['scale'], seed=options['seed'])
+            fixtures = Fixtures()
+            routes = fixtures.routes()
+
+            missing = url_names() - {spec['name'] for spec in routes} - SKIPPED_ROUTES
+            for name in sorted(n for n in missing if not n.startswith('admin:')):
+                self.stdout.write(self.style.WARNING(f'Route not benchmarked: {name}'))
+
+            if options['route']:
+                routes = [s for s in routes if any(text in s['name'] for text in options['route'])]
+
+            # SQLite allows a single writer, so writes are measured one at a time
+            write_concurrency = 1 if connection.vendor == 'sqlite' else concurrency
+            results = {}
+            # Views print diagnostics (contact form); keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                for spec in routes:
+                    self.run_route(spec, fixtures, min(total, 3), 1)  # warm-up
+                    results[spec['key']] = self.run_route(
+                        spec, fixtures, total, write_concurrency if spec['method'] != 'GET' or spec['fresh_session'] else concurrency
+                    )
+
+        report = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'requests': total,
+                'concurrency': concurrency,
+                'scale': options['scale'],
+                'seed': options['seed'],
+            },
+            'routes': results,
+        }
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.print_table(results)
+        if options['compare']:
+            self.print_comparison(results, options['compare'])
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"\n✓ Results written to {options['output']}"))
+
+    def print_table(self, results):
+        self.stdout.write(
+            f"{'route':<42} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'bytes':>8} status"
+        )
+        for key, stats in results.items():
+            line = (
+                f"{key:<42} {stats['rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+                f"{stats['queries']:>8} {stats['bytes']:>8} {','.join(map(str, stats['status']))}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
+
+    def print_comparison(self, results, path):
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)['routes']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read baseline {path}: {e}')
+
+        self.stdout.write(f"\nCompared with {path}\n{'route':<42} {'p95 Δ%':>8} {'req/s Δ%':>9} {'queries Δ':>10}")
+        for key, stats in results.items():
+            old = baseline.get(key)
+            if not old:
+                continue
+
+            def delta(new, before):
+                return f'{(new - before) / before * 100:+.1f}' if before else 'n/a'
+
+            self.stdout.write(
+                f"{key:<42} {delta(stats['p95_ms'], old['p95_ms']):>8} {delta(stats['rps'], old['rps']):>9} "
+                f"{stats['queries'] - old['queries']:>+10.1f}"
+            )
@@ -0,0 +1,326 @@
+"""
+Management command to generate large, realistic datasets for load testing.
+Run with: python manage.py generate_load_data --scale 10 --seed 42
+
+Unlike the seed_* commands (a handful of fixed rows), this bulk-creates volumes
+proportional to --scale. Per unit of scale:
+- 2000 insights with Editor.js content of 3-60 blocks (some referencing media)
+- 200 projects with 4-gallery-image relational galleries
+- 400 media assets with a 4-width WebP variant ladder
+- 10 services with long pipe-delimited fields
+
+Output is deterministic for a given --seed. Generated rows are tagged (slugs
+prefixed with 'load-', media public_ids with 'load/') so --clear removes only them.
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from myApp.content_cache import invalidate_footer_services
+from myApp.signals import deferred_counters
+from myApp.models import (
+    Insight, MediaAsset, MediaAssetVariant, MediaDeletion, Project, ProjectImage, Service, UserProfile,
+)
+
+SLUG_PREFIX = 'load-'
+PUBLIC_ID_PREFIX = 'load/'
+BATCH_SIZE = 2000
+
+PER_SCALE = {
+    'services': 10,
+    'assets': 400,
+    'projects': 200,
+    'insights': 2000,
+}
+AUTHORS = 5
+GALLERY_SIZE = 4
+VARIANT_WIDTHS = [480, 960, 1600, 2400]
+
+# Fixed epoch so published_at values are reproducible across runs
+BASE_DATE = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+CLOUDINARY_BASE = 'https://res.cloudinary.com/loadtest/image/upload'
+
+WORDS = (
+    'garden villa pool terrace desert palm shade irrigation courtyard pergola '
+    'stone limestone olive bougainvillea lawn lighting water feature majlis '
+    'native drought planting soil climate summer breeze design landscape '
+    'Dubai Emirates Hills Jumeirah Arabian Ranches marina rooftop hardscape '
+    'maintenance sustainable texture evening fountain pathway boundary canopy'
+).split()
+ICONS = ['fa-search', 'fa-drafting-compass', 'fa-seedling', 'fa-tools', 'fa-water', 'fa-sun', 'fa-leaf']
+LOCATIONS = ['Dubai Hills Estate', 'Emirates Hills', 'Palm Jumeirah', 'Arabian Ranches', 'Al Barari', 'Jumeirah Golf Estates']
+CATEGORIES = ['Villa Landscaping', 'Villa Landscaping + Pool', 'Rooftop Garden', 'Courtyard Design', 'Irrigation Upgrade']
+
+
+class Generator:
+    """Builds unsaved model instances from a seeded RNG"""
+
+    PARAGRAPH_POOL = 2000
+    BLOCK_POOL = 5000
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        # Body text and Editor.js blocks are drawn from pools: generating every
+        # one from scratch dominates the run time at tens of thousands of insights
+        self.paragraphs = [self.make_paragraph(1, 6) for _ in range(self.PARAGRAPH_POOL)]
+        self.blocks = []
+
+    def words(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def sentence(self, low=8, high=20):
+        return self.words(low, high).capitalize() + '.'
+
+    def make_paragraph(self, low, high):
+        return ' '.join(self.sentence() for _ in range(self.rng.randint(low, high)))
+
+    def paragraph(self, low=2, high=6):
+        return ' '.join(self.rng.choices(self.paragraphs, k=self.rng.randint(low, high)))
+
+    def pipe_field(self, count, *parts):
+        """Comma-separated records of '|'-joined parts (callables or strings)"""
+        return ','.join(
+            '|'.join(part() if callable(part) else part for part in parts)
+            for _ in range(count)
+        )
+
+    def media_asset(self, i):
+        width = self.rng.choice([1600, 2400, 3200, 4000])
+        height = int(width * self.rng.choice([0.5625, 0.666, 0.75, 1.0]))
+        public_id = f'{PUBLIC_ID_PREFIX}asset-{i:06d}'
+        url = f'{CLOUDINARY_BASE}/v1/{public_id}.webp'
+        return MediaAsset(
+            title=self.words(2, 5).title()[:200],
+            public_id=public_id,
+            secure_url=url,
+            web_url=f'{CLOUDINARY_BASE}/f_auto,q_auto/v1/{public_id}.webp',
+            thumb_url=f'{CLOUDINARY_BASE}/c_fill,w_400,h_300/v1/{public_id}.webp',
+            bytes_size=self.rng.randint(80_000, 900_000),
+            width=width,
+            height=height,
+            format='webp',
+            tags_csv='load,generated',
+            dominant_color='#%06x' % self.rng.randint(0, 0xFFFFFF),
+        )
+
+    def variants(self, asset):
+        return [
+            MediaAssetVariant(
+                asset=asset,
+                width=width,
+                height=round(asset.height * width / asset.width),
+                format='webp',
+                bytes_size=asset.bytes_size * width // asset.width,
+                secure_url=f'{CLOUDINARY_BASE}/c_limit,w_{width}/f_webp,q_auto/v1/{asset.public_id}.webp',
+                transformation=f'c_limit,w_{width}/f_webp,q_auto',
+            )
+            for width in VARIANT_WIDTHS
+            if width <= asset.width
+        ]
+
+    def service(self, i, slugs):
+        title = self.words(2, 4).title()
+        return Service(
+            title=title,
+            slug=f'{SLUG_PREFIX}service-{i:05d}',
+            short_description=self.sentence(),
+            full_description=self.paragraph(),
+            icon=self.rng.choice(ICONS),
+            hero_tag=self.words(1, 3).title()[:100],
+            hero_meta_projects=f'{self.rng.randint(20, 400)}+',
+            hero_meta_satisfaction=f'4.{self.rng.randint(5, 9)} ★',
+            hero_meta_guarantee=f'{self.rng.randint(1, 5)} Yrs',
+            cta_text='Book a Consultation',
+            cta_link='/#contact',
+            stats_strip_data=self.pipe_field(
+                self.rng.randint(3, 6), lambda: f'{self.rng.randint(2, 500)}+', lambda: self.words(2, 4).title(), self.sentence
+            ),
+            overview_content='\n\n'.join(self.paragraph() for _ in range(self.rng.randint(2, 5))),
+            whats_included='\n'.join(self.sentence(4, 10) for _ in range(self.rng.randint(5, 15))),
+            timeline_data=self.pipe_field(
+                self.rng.randint(4, 12), lambda: f'Week {self.rng.randint(1, 12)}', lambda: self.sentence(5, 12)[:-1]
+            ),
+            process_steps_data=self.pipe_field(
+                self.rng.randint(4, 8), lambda: self.rng.choice(ICONS), lambda: self.words(2, 4).title(), lambda: self.sentence()[:-1]
+            ),
+            showcase_projects_data=self.pipe_field(
+                self.rng.randint(3, 6), lambda: self.rng.choice(LOCATIONS), lambda: self.words(2, 4).title(),
+                lambda: self.rng.choice(['large', 'half'])
+            ),
+            specs_data=self.pipe_field(self.rng.randint(4, 10), lambda: self.words(1, 3).title(), lambda: self.words(1, 4)),
+            faq_data=self.pipe_field(
+                self.rng.randint(5, 15), lambda: self.sentence(5, 10)[:-1] + '?', lambda: self.sentence(10, 30)[:-1]
+            ),
+            testimonial_text=self.paragraph(1, 3),
+            testimonial_author=self.words(2, 2).title(),
+            testimonial_role=self.words(2, 3).title(),
+            related_services=','.join(self.rng.sample(slugs, min(4, len(slugs))))[:500],
+            featured=i < 6,
+            order=i,
+        )
+
+    def project(self, i, services, gallery):
+        return Project(
+            title=self.words(2, 5).title(),
+            slug=f'{SLUG_PREFIX}project-{i:06d}',
+            location=self.rng.choice(LOCATIONS),
+            category=self.rng.choice(CATEGORIES),
+            hero_image_url=gallery[0].secure_url,
+            short_description=self.sentence(),
+            full_description='\n\n'.join(self.paragraph() for _ in range(self.rng.randint(2, 6))),
+            specs_data=self.pipe_field(self.rng.randint(3, 6), lambda: self.words(1, 2).title(), lambda: self.words(1, 3)),
+            gallery_images=','.join(asset.secure_url for asset in gallery),
+            related_service=self.rng.choice(services) if services else None,
+            featured=self.rng.random() < 0.05,
+            order=i,
+        )
+
+    def editorjs_block(self, assets):
+        kind = self.rng.choices(
+            ['paragraph', 'header', 'list', 'quote', 'image', 'delimiter', 'code'],
+            weights=[50, 12, 10, 6, 12, 4, 6],
+        )[0]
+        if kind == 'paragraph':
+            data = {'text': self.paragraph(1, 5)}
+        elif kind == 'header':
+            data = {'text': self.words(3, 8).title(), 'level': self.rng.choice([2, 3])}
+        elif kind == 'list':
+            data = {
+                'style': self.rng.choice(['ordered', 'unordered']),
+                'items': [self.sentence(4, 12) for _ in range(self.rng.randint(2, 8))],
+            }
+        elif kind == 'quote':
+            data = {'text': self.sentence(10, 25), 'caption': self.words(2, 3).title()}
+        elif kind == 'image':
+            data = {'url': self.rng.choice(assets).secure_url, 'caption': self.sentence(4, 10)}
+        elif kind == 'code':
+            data = {'code': '\n'.join(f'zone_{n} = {self.rng.randint(1, 99)}' for n in range(self.rng.randint(2, 10)))}
+        else:
+            data = {}
+        return {'type': kind, 'data': data}
+
+    def editorjs_content(self, assets):
+        """Editor.js document of 3-60 blocks, assembled from pre-serialized blocks"""
+        if not self.blocks:
+            self.blocks = [json.dumps(self.editorjs_block(assets)) for _ in range(self.BLOCK_POOL)]
+        blocks = self.rng.choices(self.blocks, k=self.rng.randint(3, 60))
+        return '{"time": 0, "blocks": [%s], "version": "2.28.0"}' % ', '.join(blocks)
+
+    def insight(self, i, authors, assets):
+        published = self.rng.random() < 0.85
+        return Insight(
+            title=self.words(4, 10).title()[:200],
+            slug=f'{SLUG_PREFIX}insight-{i:06d}',
+            excerpt=self.sentence(15, 30),
+            content=self.editorjs_content(assets),
+            featured_image_url=self.rng.choice(assets).secure_url,
+            author=self.rng.choice(authors),
+            status='published' if published else 'draft',
+            published_at=BASE_DATE + timedelta(minutes=i * 7 + self.rng.randint(0, 6)) if published else None,
+        )
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a deterministic, large dataset for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help='Dataset size multiplier (1 ≈ 5,000 rows)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated rows before generating',
+        )
+
+    def clear(self):
+        with deferred_counters():
+            Insight.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+            Project.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+            Service.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+            MediaAsset.objects.filter(public_id__startswith=PUBLIC_ID_PREFIX).delete()
+            # Generated assets were never uploaded: nothing to remove remotely
+            MediaDeletion.objects.filter(public_id__startswith=PUBLIC_ID_PREFIX).delete()
+
+    def authors(self):
+        authors = []
+        for i in range(AUTHORS):
+            user, _ = User.objects.get_or_create(
+                username=f'load_author_{i}',
+                defaults={'first_name': 'Load', 'last_name': f'Author {i}', 'email': f'load_author_{i}@example.com'},
+            )
+            authors.append(user)
+        UserProfile.objects.filter(user__in=authors).update(role='blog_author')
+        return authors
+
+    def handle(self, *args, **options):
+        scale = max(1, options['scale'])
+        counts = {name: per_scale * scale for name, per_scale in PER_SCALE.items()}
+        gen = Generator(options['seed'])
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.stdout.write('Clearing previously generated rows...')
+            self.clear()
+
+        if Insight.objects.filter(slug__startswith=SLUG_PREFIX).exists():
+            self.stdout.write(self.style.ERROR('Generated data already exists; re-run with --clear'))
+            return
+
+        # With DEBUG on, Django formats and keeps the SQL of every bulk insert,
+        # which costs as much as the inserts themselves
+        # deferred_counters(): bulk_create skips the counter signals, recount once at the end
+        with override_settings(DEBUG=False), transaction.atomic(), deferred_counters():
+            authors = self.authors()
+
+            assets = MediaAsset.objects.bulk_create(
+                [gen.media_asset(i) for i in range(counts['assets'])], batch_size=BATCH_SIZE
+            )
+            variants = MediaAssetVariant.objects.bulk_create(
+                [variant for asset in assets for variant in gen.variants(asset)], batch_size=BATCH_SIZE
+            )
+            self.stdout.write(f'  {len(assets)} media assets, {len(variants)} variants')
+
+            slugs = [f'{SLUG_PREFIX}service-{i:05d}' for i in range(counts['services'])]
+            services = Service.objects.bulk_create(
+                [gen.service(i, slugs) for i in range(counts['services'])], batch_size=BATCH_SIZE
+            )
+            self.stdout.write(f'  {len(services)} services')
+
+            galleries = [gen.rng.sample(assets, GALLERY_SIZE) for _ in range(counts['projects'])]
+            projects = Project.objects.bulk_create(
+                [gen.project(i, services, gallery) for i, gallery in enumerate(galleries)], batch_size=BATCH_SIZE
+            )
+            images = ProjectImage.objects.bulk_create(
+                [
+                    ProjectImage(project=project, asset=asset, order=order)
+                    for project, gallery in zip(projects, galleries)
+                    for order, asset in enumerate(gallery)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            self.stdout.write(f'  {len(projects)} projects, {len(images)} gallery images')
+
+            insights = []
+            for i in range(counts['insights']):
+                insights.append(gen.insight(i, authors, assets))
+                if len(insights) == BATCH_SIZE:
+                    Insight.objects.bulk_create(insights)
+                    insights = []
+            Insight.objects.bulk_create(insights)
+            self.stdout.write(f"  {counts['insights']} insights")
+
+        # bulk_create skips post_save, so drop caches the signals would have cleared
+        invalidate_footer_services()
+
+        total = (
+            len(assets) + len(variants) + len(services) + len(projects) + len(images) + counts['insights']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ Generated {total:,} rows in {time.perf_counter() - started:.1f}s (seed {options["seed"]})'
+        ))
@@ -0,0 +1,43 @@
+"""
+Destroy queued Cloudinary assets of deleted MediaAssets in batches (see media_cleanup.py).
+Schedule it (e.g. every few minutes from cron) or keep it running with --watch.
+Run with: python manage.py process_media_deletions [--watch 60] [--limit N] [--retry-failed]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from myApp.media_cleanup import process_deletions
+from myApp.models import MediaDeletion
+
+
+class Command(BaseCommand):
+    help = 'Delete queued Cloudinary assets in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Process at most N queued assets per run')
+        parser.add_argument('--watch', type=int, default=0, metavar='SECONDS',
+                            help='Keep running, processing the queue every SECONDS')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Re-queue entries that exhausted their attempts first')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            count = MediaDeletion.objects.filter(status='failed').update(status='pending', attempts=0)
+            self.stdout.write(f'Re-queued {count} failed deletions')
+
+        while True:
+            summary = process_deletions(limit=options['limit'])
+            if any(summary.values()) or not options['watch']:
+                self.stdout.write(
+                    f"Deleted {summary['deleted']}, skipped {summary['skipped']} (in use), "
+                    f"retrying {summary['retried']}, failed {summary['failed']}"
+                )
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
+
+        pending = MediaDeletion.objects.filter(status='pending').count()
+        failed = MediaDeletion.objects.filter(status='failed').count()
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f'Queue: {pending} pending, {failed} failed'))
@@ -0,0 +1,22 @@
+"""
+Remove abandoned chunked uploads and their partial files (see chunked_upload.py).
+Schedule it daily, e.g. from cron.
+Run with: python manage.py purge_upload_sessions [--hours 24]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from myApp.chunked_upload import SESSION_MAX_AGE, purge_stale
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked upload sessions that received no data recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=SESSION_MAX_AGE.total_seconds() / 3600,
+                            help='Idle time after which a session is abandoned')
+
+    def handle(self, *args, **options):
+        count = purge_stale(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'Removed {count} abandoned upload(s)'))
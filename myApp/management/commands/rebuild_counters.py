@@ -0,0 +1,20 @@
+"""
+Recount the dashboard content counters (ContentCounter) from the content tables.
+Needed after bulk loads, raw SQL or queryset.update()/delete(), which skip the
+signals that normally keep them current.
+Run with: python manage.py rebuild_counters
+"""
+from django.core.management.base import BaseCommand
+
+from myApp.models import ContentCounter
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard content counters from the content tables'
+
+    def handle(self, *args, **options):
+        counters = ContentCounter.rebuild()
+        totals = ContentCounter.totals()
+        for model, total in sorted(totals.items()):
+            self.stdout.write(f'  {model}: {total}')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counters)} counter buckets'))
@@ -0,0 +1,79 @@
+"""
+Management command to re-encode legacy and oversized images of the media library
+(see media_reoptimize.py) and point content at the optimized copies.
+Interrupted runs resume from the checkpoint file; --restart starts over.
+Run with: python manage.py reoptimize_media [--workers 4] [--max-bytes 2000000] [--profile max] [--checkpoint FILE] [--restart] [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+
+from myApp.media_reoptimize import OVERSIZED_BYTES, Checkpoint, collect_work, reoptimize
+from myApp.utils.image_encoding import PROFILES
+
+DEFAULT_CHECKPOINT = 'reoptimize_media.checkpoint.json'
+
+
+class Command(BaseCommand):
+    help = 'Re-encode legacy-format and oversized images in parallel and update their references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: one per CPU; 0 runs in this process)')
+        parser.add_argument('--max-bytes', type=int, default=OVERSIZED_BYTES,
+                            help='Re-encode AVIF/WebP assets larger than this')
+        # No upload is waiting on a batch run, so it defaults to the most thorough encoder
+        parser.add_argument('--profile', choices=['auto', *PROFILES], default='max', help='Encoder profile')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Progress file used to resume')
+        parser.add_argument('--restart', action='store_true', help='Discard the checkpoint first')
+        parser.add_argument('--limit', type=int, default=None, help='Process at most N images')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the images that would be re-encoded')
+
+    def handle(self, *args, **options):
+        checkpoint = Checkpoint(options['checkpoint'])
+        if options['restart']:
+            checkpoint.reset()
+
+        items = [item for item in collect_work(options['max_bytes']) if item['key'] not in checkpoint.done]
+        if options['limit']:
+            items = items[:options['limit']]
+        if checkpoint.done:
+            self.stdout.write(f'Resuming: {len(checkpoint.done)} images already processed')
+        if not items:
+            self.stdout.write(self.style.SUCCESS('Nothing to re-optimize'))
+            return
+
+        if options['dry_run']:
+            for item in items:
+                self.stdout.write(f"{item['key']}: {item['format'] or 'unknown format'} from {item['source'][1]}")
+            self.stdout.write(f'{len(items)} images would be re-encoded')
+            return
+
+        self.stdout.write(f'Re-encoding {len(items)} images with the {options["profile"]} profile')
+        summary = reoptimize(
+            items,
+            checkpoint,
+            workers=options['workers'],
+            profile=options['profile'],
+            on_result=self.report,
+        )
+
+        style = self.style.WARNING if summary['failed'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Optimized {summary['optimized']}, unchanged {summary['unchanged']}, "
+            f"failed {summary['failed']} (retried on the next run); "
+            f"{summary['references']} content references updated"
+        ))
+        self.stdout.write(style(
+            f"Saved {summary['saved_bytes']:,} bytes this run, {checkpoint.saved_bytes:,} bytes in total"
+        ))
+
+    def report(self, item, result, references):
+        if result['status'] == 'optimized':
+            stored = result['stored']
+            self.stdout.write(
+                f"{item['key']}: {item['format'] or 'unknown'} {result['source_bytes']:,} -> "
+                f"{stored['format']} {stored['bytes']:,} bytes ({references} references)"
+            )
+        elif result['status'] == 'unchanged':
+            self.stdout.write(f"{item['key']}: already optimal ({result['source_bytes']:,} bytes)")
+        else:
+            self.stderr.write(f"{item['key']}: {result['error']}")
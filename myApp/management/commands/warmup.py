@@ -0,0 +1,37 @@
+"""
+Management command to warm templates, caches and DB connections and report first-request latency.
+Run with: python manage.py warmup [--no-requests]
+
+The same warm-up runs automatically in each worker when WARMUP_ON_STARTUP=True.
+"""
+from django.core.management.base import BaseCommand
+
+from myApp.warmup import first_requests, warm_up
+
+
+class Command(BaseCommand):
+    help = 'Precompile templates, prime content caches, open DB connections and report first-request latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-requests',
+            action='store_true',
+            help='Skip issuing a request to each public page',
+        )
+
+    def handle(self, *args, **options):
+        report = warm_up(requests=not options['no_requests'])
+
+        self.stdout.write(f"DB connections opened in {report['connections_ms']:.1f} ms")
+        self.stdout.write(f"{report['templates']} templates compiled in {report['templates_ms']:.1f} ms")
+        for name, error in report['failed_templates']:
+            self.stdout.write(self.style.WARNING(f'  ✗ {name}: {error}'))
+        self.stdout.write(f"Content caches primed in {report['caches_ms']:.1f} ms")
+
+        if report['first_requests']:
+            warm = first_requests(list(report['first_requests']))
+            self.stdout.write(f"\n{'url':<50} {'status':>6} {'first ms':>9} {'warm ms':>8}")
+            for url, (status, ms) in report['first_requests'].items():
+                self.stdout.write(f'{url:<50} {status:>6} {ms:>9.1f} {warm[url][1]:>8.1f}')
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Warm-up complete'))
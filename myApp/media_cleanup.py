@@ -0,0 +1,106 @@
+"""
+Remote cleanup of deleted media.
+
+Deleting a MediaAsset only removes the database row; the post_delete signal
+queues its public_id as a MediaDeletion (see signals.py). process_deletions()
+then destroys due entries through the storage backend (media_storage.py) in
+batches of its delete_batch_size - for Cloudinary, one Admin API bulk delete
+per batch. Failed calls are retried with exponential
+backoff until MAX_ATTEMPTS, after which the entry is kept as 'failed' for
+inspection (`process_media_deletions --retry-failed` re-queues them).
+"""
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import MediaAsset, MediaDeletion
+from .media_storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+# Per-resource results that mean the asset is gone
+DONE_STATUSES = {'deleted', 'not_found'}
+
+
+def queue_deletions(public_ids):
+    """Queue public_ids for deletion (blank and already queued ids are ignored)"""
+    entries = [MediaDeletion(public_id=public_id) for public_id in set(public_ids) if public_id]
+    MediaDeletion.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: 1, 2, 4 ... minutes, at most a day"""
+    return timedelta(minutes=min(2 ** (attempts - 1), 24 * 60))
+
+
+def record_failure(entries, errors):
+    now = timezone.now()
+    for entry in entries:
+        entry.attempts += 1
+        entry.last_error = errors[entry.public_id][:1000]
+        entry.next_attempt_at = now + retry_delay(entry.attempts)
+        if entry.attempts >= MAX_ATTEMPTS:
+            entry.status = 'failed'
+    MediaDeletion.objects.bulk_update(entries, ['attempts', 'last_error', 'next_attempt_at', 'status'])
+
+
+def process_deletions(limit=None, batch_size=None):
+    """
+    Destroy the due queue entries in the configured storage backend.
+
+    Args:
+        limit: Process at most this many entries
+        batch_size: public_ids per delete call (default: the backend's delete_batch_size)
+
+    Returns:
+        dict: Counts of deleted, skipped (id used by an asset again), retried and failed entries
+    """
+    due = MediaDeletion.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+    entries = list(due[:limit] if limit else due)
+    storage = get_storage()
+    batch_size = batch_size or storage.delete_batch_size
+    summary = {'deleted': 0, 'skipped': 0, 'retried': 0, 'failed': 0}
+
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        ids = [entry.public_id for entry in batch]
+
+        # An upload with the same public_id (overwrite=True) reuses the stored image
+        in_use = set(MediaAsset.objects.filter(public_id__in=ids).values_list('public_id', flat=True))
+        if in_use:
+            MediaDeletion.objects.filter(public_id__in=in_use).delete()
+            summary['skipped'] += len(in_use)
+            batch = [entry for entry in batch if entry.public_id not in in_use]
+            if not batch:
+                continue
+
+        try:
+            result = storage.delete([entry.public_id for entry in batch])
+        except Exception as e:
+            logger.warning("%s delete of %d assets failed: %s", storage.name, len(batch), e)
+            errors = {entry.public_id: str(e) or e.__class__.__name__ for entry in batch}
+            done = []
+        else:
+            statuses = result['deleted']
+            errors = {}
+            done = []
+            for entry in batch:
+                status = statuses.get(entry.public_id, 'missing from response')
+                if status in DONE_STATUSES and not result['partial']:
+                    done.append(entry)
+                else:
+                    errors[entry.public_id] = 'partial delete' if result['partial'] else f'{storage.name}: {status}'
+
+        if done:
+            MediaDeletion.objects.filter(pk__in=[entry.pk for entry in done]).delete()
+            summary['deleted'] += len(done)
+        retry = [entry for entry in batch if entry.public_id in errors]
+        if retry:
+            record_failure(retry, errors)
+            failed = sum(1 for entry in retry if entry.status == 'failed')
+            summary['failed'] += failed
+            summary['retried'] += len(retry) - failed
+
+    return summary
@@ -0,0 +1,87 @@
+"""
+Upload pipeline shared by the gallery endpoints.
+Compresses the source image, hands it to the configured storage backend
+(Cloudinary or local files, see media_storage.py) and records the resulting
+MediaAsset together with its eagerly generated variant ladder.
+"""
+import os
+import uuid
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .models import MediaAsset, MediaAssetVariant
+from . import metrics
+from .media_storage import get_storage
+from .profiling import timed
+from .utils.cloudinary_utils import smart_compress_to_bytes
+
+
+def source_size(src_file):
+    """Size in bytes of an uploaded file or path"""
+    if isinstance(src_file, (str, os.PathLike)):
+        return os.path.getsize(src_file)
+    size = getattr(src_file, 'size', None)
+    if size is None and hasattr(src_file, 'seek'):
+        position = src_file.tell()
+        size = src_file.seek(0, os.SEEK_END)
+        src_file.seek(position)
+    return size or 0
+
+
+def ingest_image(src_file, filename, album=None, folder="uploads", tags=None):
+    """
+    Compress, upload and persist a single image.
+
+    Args:
+        src_file: File-like object or path accepted by smart_compress_to_bytes
+        filename: Original filename (used for the title and public_id)
+        album: Optional MediaAlbum to attach the asset to
+        folder: Storage folder
+        tags: Optional list of tags
+
+    Returns:
+        MediaAsset: The saved asset with its variants
+    """
+    if hasattr(src_file, 'seek'):
+        src_file.seek(0)
+    meta = {}
+    with timed('compress'), metrics.upload_stage('compress'):
+        file_bytes = smart_compress_to_bytes(src_file, meta=meta)
+
+    # Generate clean public_id from filename (remove extension since it is re-encoded)
+    base_name = filename.rsplit('.', 1)[0] if '.' in filename else filename
+    # Names without any ASCII letter or digit (e.g. 日本.png) slugify to ''
+    public_id = slugify(base_name)[:120] or uuid.uuid4().hex[:12]
+
+    with metrics.upload_stage('upload'):
+        stored = get_storage().upload(
+            file_bytes=file_bytes,
+            folder=folder,
+            public_id=public_id,
+            tags=tags
+        )
+
+    with metrics.upload_stage('persist'), transaction.atomic():
+        asset = MediaAsset.objects.create(
+            album=album,
+            title=filename.split('.')[0],
+            public_id=stored['public_id'],
+            secure_url=stored['secure_url'],
+            web_url=stored['web_url'],
+            thumb_url=stored['thumb_url'],
+            bytes_size=stored['bytes'],
+            width=stored['width'],
+            height=stored['height'],
+            format=stored['format'],
+            source_bytes=source_size(src_file),
+            savings_bytes=meta.get('savings_bytes', 0),
+            placeholder_data_uri=meta.get('placeholder', ''),
+            dominant_color=meta.get('dominant_color', ''),
+        )
+        MediaAssetVariant.objects.bulk_create([
+            MediaAssetVariant(asset=asset, **variant)
+            for variant in stored['variants']
+        ])
+
+    return asset
@@ -0,0 +1,401 @@
+"""
+Re-optimization of the existing media library.
+
+Images uploaded before the compression pipeline, and image URLs pasted into
+content fields, were stored as they came. collect_work() finds them:
+
+- MediaAssets in a legacy format (anything but AVIF/WebP, including pasted
+  URLs recorded without a format), larger than `max_bytes`, or with an AVIF
+  web_url (stored before web_url was always WebP)
+- http(s) URLs in URL_FIELDS and in Editor.js image blocks of insights that
+  no MediaAsset stands for
+
+reoptimize() re-encodes each one like an upload (smart_compress_to_bytes and
+the storage backend) in a pool of worker processes. Workers only fetch, encode
+and store; the parent process updates the MediaAsset, rewrites every reference
+to the old URL and records the item in a Checkpoint, so an interrupted run
+resumes where it stopped (`python manage.py reoptimize_media`).
+"""
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .media_cleanup import queue_deletions
+from .media_storage import LocalStorage, get_storage
+from .models import Hero, Insight, MediaAsset, MediaAssetVariant, Project, Service
+from .utils.cloudinary_utils import smart_compress_to_bytes
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZED_FORMATS = ('avif', 'webp')
+# Assets above this size are re-encoded even when already AVIF/WebP
+OVERSIZED_BYTES = 2_000_000
+FETCH_TIMEOUT = 30
+FETCH_CHUNK_BYTES = 64 * 1024
+# Content fields holding image URLs; gallery_images is comma-separated
+URL_FIELDS = [
+    (Service, 'hero_image_url'),
+    (Project, 'hero_image_url'),
+    (Project, 'gallery_images'),
+    (Insight, 'featured_image_url'),
+    (Hero, 'background_image_url'),
+]
+IMAGE_BLOCKS = ('image', 'imageCaption')
+
+
+def field_urls(field, value):
+    if field == 'gallery_images':
+        return [url.strip() for url in value.split(',') if url.strip()]
+    return [value] if value else []
+
+
+def content_blocks(content):
+    """Editor.js blocks of an insight body ([] for legacy HTML content)"""
+    try:
+        data = json.loads(content)
+        return data, data.get('blocks', [])
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        return None, []
+
+
+def referenced_urls():
+    """Every image URL used by content"""
+    urls = set()
+    for model, field in URL_FIELDS:
+        for value in model.objects.exclude(**{field: ''}).values_list(field, flat=True):
+            urls.update(field_urls(field, value))
+    for content in Insight.objects.filter(content__contains='"image').values_list('content', flat=True):
+        _, blocks = content_blocks(content)
+        urls.update(
+            block.get('data', {}).get('url', '') for block in blocks if block.get('type') in IMAGE_BLOCKS
+        )
+    urls.discard('')
+    return urls
+
+
+def is_remote(url):
+    return url.startswith(('http://', 'https://'))
+
+
+def asset_source(asset, storage):
+    """Where a worker reads an asset's current image: ('local', name), ('url', url) or None"""
+    if asset.public_id and isinstance(storage, LocalStorage):
+        name = storage.original_name(asset.public_id)
+        if storage.path(name).exists():
+            return ('local', name)
+    if is_remote(asset.secure_url):
+        return ('url', asset.secure_url)
+    return None
+
+
+def collect_work(max_bytes=OVERSIZED_BYTES):
+    """
+    Images to re-optimize.
+
+    Returns:
+        list: dicts with key (checkpoint id), asset_id (None for bare URLs),
+              source, format, folder and public_id (where the result is stored),
+              and rebuild (store even when the encoding is not smaller)
+    """
+    storage = get_storage()
+    items = []
+    assets = MediaAsset.objects.only(
+        'pk', 'title', 'public_id', 'secure_url', 'web_url', 'format', 'bytes_size',
+    ).order_by('pk')
+    for asset in assets:
+        # Local AVIF uploads used to be served as their web_url too: store them again
+        rebuild = asset.web_url.endswith('.avif')
+        if asset.format.lower() in OPTIMIZED_FORMATS and asset.bytes_size <= max_bytes and not rebuild:
+            continue
+        source = asset_source(asset, storage)
+        if source is None:
+            continue
+        if asset.public_id:
+            folder, _, public_id = asset.public_id.rpartition('/')
+        else:
+            folder, public_id = 'uploads', f'{slugify(asset.title)[:110]}-{asset.pk}'
+        items.append({
+            'key': f'asset:{asset.pk}',
+            'asset_id': asset.pk,
+            'title': asset.title,
+            'source': source,
+            'format': asset.format,
+            'folder': folder,
+            'public_id': public_id,
+            'rebuild': rebuild,
+        })
+
+    urls = referenced_urls()
+    known = MediaAsset.lookup_by_urls(urls)
+    for url in sorted(url for url in urls - set(known) if is_remote(url) and len(url) <= 200):
+        title = url.rsplit('/', 1)[-1].rsplit('.', 1)[0][:200]
+        digest = hashlib.sha1(url.encode()).hexdigest()[:8]
+        items.append({
+            'key': f'url:{url}',
+            'asset_id': None,
+            'title': title,
+            'source': ('url', url),
+            'format': '',
+            'folder': 'uploads',
+            'public_id': f'{slugify(title)[:110]}-{digest}',
+            'rebuild': False,
+        })
+    return items
+
+
+class SourceTooLarge(Exception):
+    """A remote source is larger than MEDIA_MAX_SOURCE_BYTES"""
+
+
+def download(url, max_bytes):
+    """
+    Fetch `url` into memory, streaming so that no more than `max_bytes` are read.
+
+    Raises:
+        SourceTooLarge: The declared or received body is larger than `max_bytes`
+    """
+    import requests
+
+    with requests.get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        declared = int(response.headers.get('Content-Length') or 0)
+        if declared > max_bytes:
+            raise SourceTooLarge(f'{declared:,} bytes (limit {max_bytes:,})')
+        buf = io.BytesIO()
+        for chunk in response.iter_content(FETCH_CHUNK_BYTES):
+            if buf.tell() + len(chunk) > max_bytes:
+                raise SourceTooLarge(f'more than {max_bytes:,} bytes')
+            buf.write(chunk)
+    buf.seek(0)
+    return buf
+
+
+@contextlib.contextmanager
+def open_source(source):
+    """Yield (file-like image, size in bytes) for a work item's source"""
+    kind, location = source
+    if kind == 'local':
+        # Memory-mapped: the original is decoded straight from the page cache
+        with get_storage('local').open_mapped(location) as data:
+            yield (io.BytesIO(data) if isinstance(data, memoryview) else data), len(data)
+    else:
+        data = download(location, settings.MEDIA_MAX_SOURCE_BYTES)
+        yield data, len(data.getbuffer())
+
+
+def reencode(item, profile=None):
+    """
+    Fetch, encode and store one item. Runs in a worker process, so it must not
+    touch the database; the parent applies the result (apply_result).
+
+    Returns:
+        dict: key, status ('optimized', 'unchanged' or 'failed'), source_bytes,
+              and stored + meta for optimized items or error for failed ones
+    """
+    try:
+        with open_source(item['source']) as (src, size):
+            meta = {}
+            data = smart_compress_to_bytes(src, meta=meta, profile=profile)
+        if len(data) >= size and not item['rebuild']:
+            return {'key': item['key'], 'status': 'unchanged', 'source_bytes': size}
+        stored = get_storage().upload(
+            file_bytes=data,
+            folder=item['folder'],
+            public_id=item['public_id'],
+            tags=['reoptimized'],
+        )
+    except Exception as exc:
+        return {'key': item['key'], 'status': 'failed', 'error': f'{type(exc).__name__}: {exc}'}
+    return {
+        'key': item['key'],
+        'status': 'optimized',
+        'source_bytes': size,
+        'stored': stored,
+        'meta': {key: meta.get(key, '') for key in ('placeholder', 'dominant_color', 'savings_bytes')},
+    }
+
+
+def rewrite_references(mapping):
+    """
+    Replace old image URLs (mapping old -> new) in every content field.
+
+    Returns:
+        int: Objects updated
+    """
+    mapping = {old: new for old, new in mapping.items() if old and old != new}
+    if not mapping:
+        return 0
+    updated = 0
+    for model, field in URL_FIELDS:
+        matches = Q()
+        for old in mapping:
+            matches |= Q(**{f'{field}__contains': old})
+        for obj in model.objects.filter(matches):
+            value = getattr(obj, field)
+            if field == 'gallery_images':
+                new_value = ','.join(mapping.get(url, url) for url in field_urls(field, value))
+            else:
+                new_value = mapping.get(value, value)
+            if new_value != value:
+                setattr(obj, field, new_value)
+                obj.save(update_fields=[field])
+                if field == 'gallery_images':
+                    obj.sync_gallery_images()
+                updated += 1
+
+    matches = Q()
+    for old in mapping:
+        matches |= Q(content__contains=old)
+    for insight in Insight.objects.filter(matches):
+        data, blocks = content_blocks(insight.content)
+        changed = False
+        for block in blocks:
+            block_data = block.get('data', {})
+            if block.get('type') in IMAGE_BLOCKS and block_data.get('url') in mapping:
+                block_data['url'] = mapping[block_data['url']]
+                changed = True
+        if changed:
+            insight.content = json.dumps(data)
+            insight.save(update_fields=['content'])
+            updated += 1
+    return updated
+
+
+def apply_result(item, result):
+    """
+    Record an optimized image: update (or create) its MediaAsset with the new
+    variants and point content at the new URL.
+
+    Returns:
+        int: Content objects whose references were rewritten
+    """
+    stored, meta = result['stored'], result['meta']
+    fields = {
+        'public_id': stored['public_id'],
+        'secure_url': stored['secure_url'],
+        'web_url': stored['web_url'],
+        'thumb_url': stored['thumb_url'],
+        'bytes_size': stored['bytes'],
+        'width': stored['width'],
+        'height': stored['height'],
+        'format': stored['format'],
+        'savings_bytes': meta['savings_bytes'] or 0,
+        'placeholder_data_uri': meta['placeholder'],
+        'dominant_color': meta['dominant_color'],
+    }
+    with transaction.atomic():
+        if item['asset_id']:
+            asset = MediaAsset.objects.filter(pk=item['asset_id']).first()
+            if asset is None:
+                # Deleted while it was being encoded
+                queue_deletions([stored['public_id']])
+                return 0
+            old_urls = [asset.secure_url, asset.web_url]
+            for name, value in fields.items():
+                setattr(asset, name, value)
+            asset.source_bytes = asset.source_bytes or result['source_bytes']
+            asset.save()
+            asset.variants.all().delete()
+        else:
+            asset = MediaAsset.objects.create(title=item['title'], source_bytes=result['source_bytes'], **fields)
+            old_urls = [item['source'][1]]
+        MediaAssetVariant.objects.bulk_create([
+            MediaAssetVariant(asset=asset, **variant)
+            for variant in stored['variants']
+        ])
+        return rewrite_references({url: asset.web_url for url in old_urls})
+
+
+class Checkpoint:
+    """
+    Progress of a re-optimization run, saved as JSON after every item.
+
+    Args:
+        path: Checkpoint file (created on the first recorded item)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = {}
+        self.saved_bytes = 0
+        if self.path.exists():
+            state = json.loads(self.path.read_text())
+            self.done = state['done']
+            self.saved_bytes = state['saved_bytes']
+
+    def record(self, key, status, saved_bytes=0):
+        self.done[key] = status
+        self.saved_bytes += saved_bytes
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix='.checkpoint-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'done': self.done, 'saved_bytes': self.saved_bytes}, f)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        self.path.unlink(missing_ok=True)
+        self.done = {}
+        self.saved_bytes = 0
+
+
+def reoptimize(items, checkpoint, workers=None, profile=None, on_result=None):
+    """
+    Re-encode the items not in `checkpoint` yet.
+
+    Args:
+        items: Work items from collect_work()
+        checkpoint: Checkpoint, updated as items finish
+        workers: Worker processes (default: one per CPU; 0 encodes in this process)
+        profile: Encoder profile name (see utils/image_encoding.py)
+        on_result: Optional callback(item, result, references_updated)
+
+    Returns:
+        dict: Counts of optimized, unchanged and failed items, saved_bytes and references
+    """
+    pending = [item for item in items if item['key'] not in checkpoint.done]
+    summary = {'optimized': 0, 'unchanged': 0, 'failed': 0, 'saved_bytes': 0, 'references': 0}
+
+    def finish(item, result):
+        references = 0
+        saved = 0
+        if result['status'] == 'optimized':
+            references = apply_result(item, result)
+            saved = max(0, result['source_bytes'] - result['stored']['bytes'])
+            summary['saved_bytes'] += saved
+            summary['references'] += references
+        if result['status'] == 'failed':
+            # Not checkpointed: retried by the next run
+            logger.warning('Re-optimizing %s failed: %s', item['key'], result['error'])
+        else:
+            checkpoint.record(item['key'], result['status'], saved)
+        summary[result['status']] += 1
+        if on_result:
+            on_result(item, result, references)
+
+    if workers == 0:
+        for item in pending:
+            finish(item, reencode(item, profile))
+        return summary
+
+    # Forked workers must not inherit open database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=django.setup) as pool:
+        futures = {pool.submit(reencode, item, profile): item for item in pending}
+        for future in as_completed(futures):
+            finish(futures[future], future.result())
+    return summary
@@ -0,0 +1,329 @@
+"""
+Storage backends for uploaded images.
+
+The upload pipeline (media_pipeline.py) and the remote cleanup (media_cleanup.py)
+talk to a StorageBackend instead of the Cloudinary SDK directly:
+
+    upload(file_bytes, folder, public_id, tags)  -> stored image (URLs + variant ladder)
+    delete(public_ids)                           -> per-id status, like the Admin API
+    url(public_id, width, format)                -> URL of the best rendition for a width
+
+settings.MEDIA_STORAGE_BACKEND picks the implementation:
+
+- 'cloudinary' (default): uploads to Cloudinary, variants are eager transformations.
+- 'local': writes the original and its variant ladder under LOCAL_MEDIA_ROOT and
+  serves them from LOCAL_MEDIA_URL (see views.local_media). No network calls, so
+  the pipeline can be benchmarked offline.
+
+Both backends pass the same contract tests (StorageContractTests in tests.py).
+"""
+import abc
+import contextlib
+import io
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+
+from .utils import cloudinary_utils
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend(abc.ABC):
+    """Interface implemented by every storage backend"""
+
+    name = ''
+    # public_ids per delete() call
+    delete_batch_size = 100
+
+    @abc.abstractmethod
+    def upload(self, file_bytes, folder, public_id, tags=None):
+        """
+        Store a compressed image and generate its responsive variants.
+
+        Args:
+            file_bytes: Compressed image bytes (from smart_compress_to_bytes)
+            folder: Folder prefixed to the public_id (e.g. "uploads")
+            public_id: Name within the folder; an existing image is replaced
+            tags: Optional list of tags (ignored by backends without tagging)
+
+        Returns:
+            dict: public_id, secure_url, web_url, thumb_url, bytes, width, height, format
+                  and variants (dicts with width, height, format, bytes_size, secure_url,
+                  transformation; one per distinct rendition)
+        """
+
+    @abc.abstractmethod
+    def delete(self, public_ids):
+        """
+        Remove images with all their variants.
+
+        Returns:
+            dict: 'deleted' (public_id -> 'deleted' or 'not_found') and 'partial'
+                  (True when the call must be repeated for the rest)
+        """
+
+    @abc.abstractmethod
+    def url(self, public_id, width=None, format='webp'):
+        """URL of the rendition to use for `width` px (the web-optimized original when None)"""
+
+
+class CloudinaryStorage(StorageBackend):
+    """Cloudinary upload / Admin API (see utils/cloudinary_utils.py)"""
+
+    name = 'cloudinary'
+    delete_batch_size = cloudinary_utils.DELETE_BATCH_SIZE
+
+    def upload(self, file_bytes, folder, public_id, tags=None):
+        result, web_url, thumb_url = cloudinary_utils.upload_to_cloudinary(
+            file_bytes=file_bytes,
+            folder=folder,
+            public_id=public_id,
+            tags=tags,
+        )
+        return {
+            'public_id': result.get('public_id', ''),
+            'secure_url': result.get('secure_url', ''),
+            'web_url': web_url,
+            'thumb_url': thumb_url,
+            'bytes': result.get('bytes', 0),
+            'width': result.get('width', 0),
+            'height': result.get('height', 0),
+            'format': result.get('format', ''),
+            'variants': cloudinary_utils.extract_eager_variants(result),
+        }
+
+    def delete(self, public_ids):
+        return cloudinary_utils.delete_from_cloudinary(public_ids)
+
+    def url(self, public_id, width=None, format='webp'):
+        # Same transformation as the eager ladder, so the derived image is already cached
+        transformation = f'c_limit,w_{width}/f_{format},q_auto' if width else 'f_auto,q_auto'
+        return f'https://res.cloudinary.com/{settings.CLOUDINARY_CLOUD_NAME}/image/upload/{transformation}/{public_id}'
+
+
+class LocalStorage(StorageBackend):
+    """
+    Images on the local filesystem:
+
+        <root>/<public_id>.<avif|webp>      original
+        <root>/<public_id>/web.webp         full-size WebP of an AVIF original (web_url)
+        <root>/<public_id>/w<width>.<fmt>   variant ladder (never upscaled)
+        <root>/<public_id>/thumb.webp       480x320 crop
+
+    web_url is always WebP, which every browser decodes. An AVIF original adds
+    an AVIF ladder, offered only through <picture> sources where browsers that
+    decode it choose it.
+
+    Args:
+        root: Directory holding the files (defaults to settings.LOCAL_MEDIA_ROOT)
+        base_url: URL prefix they are served from (defaults to settings.LOCAL_MEDIA_URL)
+    """
+
+    name = 'local'
+    delete_batch_size = 500
+    thumb_size = (480, 320)
+    quality = 80
+    # Formats an original may be stored in (see utils/image_encoding.py)
+    original_formats = ('avif', 'webp')
+
+    def __init__(self, root=None, base_url=None):
+        self._root = root
+        self._base_url = base_url
+
+    @property
+    def root(self):
+        return Path(self._root or settings.LOCAL_MEDIA_ROOT)
+
+    @property
+    def base_url(self):
+        return self._base_url or settings.LOCAL_MEDIA_URL
+
+    def path(self, name):
+        """Absolute path of a stored file (SuspiciousFileOperation for names outside root)"""
+        return Path(safe_join(self.root, name))
+
+    def image_dir(self, public_id, folder=''):
+        """
+        Variant directory of one image. Raises SuspiciousFileOperation unless
+        `public_id` names a single image strictly inside root (and `folder`):
+        '', 'uploads/' or 'uploads/../x' would make remove() delete other images.
+        """
+        if not public_id or any(part in ('', '.', '..') for part in public_id.split('/')):
+            raise SuspiciousFileOperation(f'Invalid public_id: {public_id!r}')
+        path = self.path(public_id)
+        base = self.path(folder) if folder else Path(os.path.abspath(self.root))
+        if base not in path.parents:
+            raise SuspiciousFileOperation(f'public_id {public_id!r} is outside {base}')
+        return path
+
+    def file_url(self, name):
+        return f'{self.base_url}{name}'
+
+    def upload(self, file_bytes, folder, public_id, tags=None):
+        from PIL import Image, ImageOps
+
+        full_id = f'{folder}/{public_id}' if folder else public_id
+        self.image_dir(full_id, folder)
+        widths = sorted(set(getattr(settings, 'MEDIA_VARIANT_WIDTHS', cloudinary_utils.DEFAULT_VARIANT_WIDTHS)))
+        formats = getattr(settings, 'MEDIA_VARIANT_FORMATS', cloudinary_utils.DEFAULT_VARIANT_FORMATS)
+
+        with Image.open(io.BytesIO(file_bytes)) as im:
+            im.load()
+            source_format = (im.format or 'webp').lower()
+            # Replacing an image: drop the previous original and its renditions
+            self.remove(full_id)
+            self.path(full_id).mkdir(parents=True)
+            original_name = f'{full_id}.{source_format}'
+            self.write(self.path(original_name), file_bytes)
+            if source_format not in formats:
+                # The negotiated format reaches browsers through the ladder only
+                formats = [*formats, source_format]
+            variants = []
+            for fmt in formats:
+                seen = set()
+                for step in widths:
+                    width = min(step, im.width)
+                    if width in seen:
+                        continue
+                    seen.add(width)
+                    height = max(1, round(im.height * width / im.width))
+                    rendition = im if width == im.width else im.resize((width, height), Image.LANCZOS)
+                    name = f'{full_id}/w{width}.{fmt}'
+                    size = self.save_image(rendition, name, fmt)
+                    variants.append({
+                        'width': width,
+                        'height': height,
+                        'format': fmt,
+                        'bytes_size': size,
+                        'secure_url': self.file_url(name),
+                        'transformation': f'c_limit,w_{step}/f_{fmt}',
+                    })
+            thumb = ImageOps.fit(im, self.thumb_size, Image.LANCZOS)
+            self.save_image(thumb, f'{full_id}/thumb.webp', 'webp')
+            web_name = original_name
+            if source_format != 'webp':
+                web_name = f'{full_id}/web.webp'
+                self.save_image(im, web_name, 'webp')
+            width, height = im.width, im.height
+
+        return {
+            'public_id': full_id,
+            'secure_url': self.file_url(original_name),
+            'web_url': self.file_url(web_name),
+            'thumb_url': self.file_url(f'{full_id}/thumb.webp'),
+            'bytes': len(file_bytes),
+            'width': width,
+            'height': height,
+            'format': source_format,
+            'variants': variants,
+        }
+
+    def save_image(self, im, name, fmt):
+        buf = io.BytesIO()
+        im.save(buf, format=fmt.upper(), quality=self.quality)
+        self.write(self.path(name), buf.getvalue())
+        return buf.tell()
+
+    def write(self, path, data):
+        """Write via a temporary file + rename, so readers never see a partial file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def original_name(self, public_id):
+        for fmt in self.original_formats:
+            name = f'{public_id}.{fmt}'
+            if self.path(name).exists():
+                return name
+        return f'{public_id}.webp'
+
+    def remove(self, public_id):
+        """Delete an original with its variants; False when nothing was stored"""
+        variant_dir = self.image_dir(public_id)
+        found = False
+        for fmt in self.original_formats:
+            original = self.path(f'{public_id}.{fmt}')
+            if original.exists():
+                original.unlink()
+                found = True
+        if variant_dir.is_dir():
+            shutil.rmtree(variant_dir)
+            found = True
+        return found
+
+    def delete(self, public_ids):
+        statuses = {}
+        for public_id in public_ids:
+            try:
+                statuses[public_id] = 'deleted' if self.remove(public_id) else 'not_found'
+            except SuspiciousFileOperation as exc:
+                # Nothing this backend stored can live there
+                logger.warning('Not deleting %r: %s', public_id, exc)
+                statuses[public_id] = 'not_found'
+        return {'deleted': statuses, 'partial': False}
+
+    def url(self, public_id, width=None, format='webp'):
+        if not width:
+            return self.file_url(self.original_name(public_id))
+        # Smallest variant at least `width` wide, else the largest (like MediaAsset.best_variant)
+        suffix = f'.{format}'
+        try:
+            with os.scandir(self.path(public_id)) as entries:
+                widths = sorted(
+                    int(entry.name[1:-len(suffix)]) for entry in entries
+                    if entry.name.startswith('w') and entry.name.endswith(suffix)
+                )
+        except FileNotFoundError:
+            widths = []
+        if not widths:
+            return self.file_url(self.original_name(public_id))
+        chosen = next((w for w in widths if w >= width), widths[-1])
+        return self.file_url(f'{public_id}/w{chosen}{suffix}')
+
+    @contextlib.contextmanager
+    def open_mapped(self, name):
+        """
+        Memory-map a stored file read-only, e.g. `with storage.open_mapped('uploads/a.webp') as data:`.
+        Pages are read lazily by the kernel and shared with the page cache, so
+        reprocessing large originals doesn't copy them into the Python heap.
+        """
+        with open(self.path(name), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b'')
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+
+STORAGE_BACKENDS = {
+    'cloudinary': CloudinaryStorage,
+    'local': LocalStorage,
+}
+
+_storages = {}
+
+
+def get_storage(name=None):
+    """The configured backend (settings.MEDIA_STORAGE_BACKEND), one instance per name"""
+    name = name or getattr(settings, 'MEDIA_STORAGE_BACKEND', 'cloudinary')
+    if name not in _storages:
+        try:
+            _storages[name] = STORAGE_BACKENDS[name]()
+        except KeyError:
+            raise ValueError(f'Unknown MEDIA_STORAGE_BACKEND: {name!r}')
+    return _storages[name]
@@ -0,0 +1,142 @@
+"""
+Prometheus metrics (request latency per route, in-flight requests, upload
+pipeline stages, email sends and content cache hits), served at /metrics/.
+
+Disabled unless METRICS_ENABLED=True; prometheus_client is only imported then.
+
+Several gunicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by the workers before they start. Each worker writes its samples to
+memory-mapped files there and /metrics/ merges them, whichever worker answers.
+Clear the directory on deploy; gunicorn.conf.py drops dead workers' gauges
+from its child_exit hook.
+
+/metrics/ is readable with the METRICS_TOKEN bearer token, or without a token
+only from METRICS_ALLOWED_IPS (see settings).
+"""
+import contextlib
+import os
+import time
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UPLOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_metrics = None
+
+
+def enabled():
+    return settings.METRICS_ENABLED
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def get_metrics():
+    """Create the metric objects on first use (imports prometheus_client)"""
+    global _metrics
+    if _metrics is None:
+        from prometheus_client import Counter, Gauge, Histogram
+
+        _metrics = {
+            'latency': Histogram(
+                'http_request_duration_seconds', 'Request latency by URL name',
+                ['route', 'method'], buckets=LATENCY_BUCKETS,
+            ),
+            'requests': Counter(
+                'http_requests', 'Requests by URL name and status code',
+                ['route', 'method', 'status'],
+            ),
+            'in_flight': Gauge(
+                'http_requests_in_flight', 'Requests currently being handled',
+                multiprocess_mode='livesum',
+            ),
+            'upload_stage': Histogram(
+                'upload_stage_duration_seconds', 'Image upload pipeline stage duration',
+                ['stage'], buckets=UPLOAD_BUCKETS,
+            ),
+            'emails': Counter(
+                'emails_sent', 'Emails sent through Resend',
+                ['kind', 'result'],
+            ),
+            'cache': Counter(
+                'content_cache_requests', 'Content cache lookups (hit ratio = hit / total)',
+                ['cache', 'result'],
+            ),
+        }
+    return _metrics
+
+
+def observe_request(route, method, status, seconds):
+    if not enabled():
+        return
+    metrics = get_metrics()
+    metrics['latency'].labels(route, method).observe(seconds)
+    metrics['requests'].labels(route, method, str(status)).inc()
+
+
+@contextlib.contextmanager
+def in_flight():
+    """Count the block as an in-flight request"""
+    if not enabled():
+        yield
+        return
+    gauge = get_metrics()['in_flight']
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+@contextlib.contextmanager
+def upload_stage(stage):
+    """Time one upload pipeline stage (compress, upload, persist)"""
+    if not enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics()['upload_stage'].labels(stage).observe(time.perf_counter() - start)
+
+
+def count_email(kind, success):
+    if enabled():
+        get_metrics()['emails'].labels(kind, 'success' if success else 'failure').inc()
+
+
+def count_cache(cache, hit):
+    if enabled():
+        get_metrics()['cache'].labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def exposition():
+    """
+    Render every metric in the Prometheus text format, merged across worker
+    processes in multiprocess mode.
+
+    Returns:
+        tuple: (body bytes, content type)
+    """
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    get_metrics()
+    if multiprocess_dir():
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges (call from gunicorn's child_exit hook)"""
+    if multiprocess_dir():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
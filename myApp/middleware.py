@@ -0,0 +1,166 @@
+"""
+Request profiling (see profiling.py), Prometheus metrics (see metrics.py) and
+preload hint (see preload_hints.py) middleware.
+"""
+import contextlib
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, preload_hints, profiling
+
+
+SERVER_TIMING_ENTRIES = [
+    ('db', 'Database'),
+    ('template', 'Template render'),
+    ('cache', 'Cache'),
+    ('compress', 'Image compression'),
+]
+
+
+def server_timing_header(profile, total_ms):
+    """Server-Timing value with db, template, cache, compress and total entries"""
+    entries = []
+    for name, description in SERVER_TIMING_ENTRIES:
+        count = profile.counts.get(name, 0)
+        if name == 'db':
+            description = f'{count} quer{"y" if count == 1 else "ies"}'
+        entries.append(f'{name};dur={profile.timings.get(name, 0.0):.1f};desc="{description}"')
+    entries.append(f'total;dur={total_ms:.1f};desc="Total"')
+    return ', '.join(entries)
+
+
+class RequestProfilingMiddleware:
+    """
+    Record wall, SQL and template time plus response size per resolved URL name,
+    capture slow queries (SLOW_QUERY_MS) and optionally attach a Server-Timing
+    header (SERVER_TIMING=True).
+    Place first in MIDDLEWARE so the total includes every other middleware.
+    Runs natively in async stacks too, so async views are not adapted to sync.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not (settings.REQUEST_PROFILING or settings.SERVER_TIMING or settings.SLOW_QUERY_MS):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.record = settings.REQUEST_PROFILING
+        self.server_timing = settings.SERVER_TIMING
+        profiling.install_query_timer()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @contextlib.contextmanager
+    def profiling(self, request):
+        profile = profiling.RequestProfile(request)
+        token = profiling.activate(profile)
+        try:
+            yield profile
+        finally:
+            profiling.deactivate(token)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.profiling(request) as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        with self.profiling(request) as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total_ms = profile.elapsed_ms()
+        if self.record:
+            match = request.resolver_match
+            route = match.view_name if match else '<unresolved>'
+            size = 0 if response.streaming else len(response.content)
+            profiling.record(route, profile, total_ms, size)
+        if self.server_timing:
+            response['Server-Timing'] = server_timing_header(profile, total_ms)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Feed per-route latency, status and in-flight metrics to metrics.py.
+    Runs natively in sync and async stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with metrics.in_flight():
+            response = self.get_response(request)
+        return self.observe(request, response, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with metrics.in_flight():
+            response = await self.get_response(request)
+        return self.observe(request, response, start)
+
+    def observe(self, request, response, start):
+        match = request.resolver_match
+        route = match.view_name if match else '<unresolved>'
+        metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+
+class PreloadHintsMiddleware:
+    """
+    Link header preloading the LCP image and stylesheets of public pages and
+    preconnecting to font hosts; remembered per path for 103 Early Hints.
+    Pure post-processing, so it runs natively in sync and async stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PRELOAD_HINTS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.add_links(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_links(request, await self.get_response(request))
+
+    def add_links(self, request, response):
+        match = request.resolver_match
+        if (
+            match
+            and match.url_name in preload_hints.PUBLIC_ROUTES
+            and request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and response.get('Content-Type', '').startswith('text/html')
+        ):
+            links = preload_hints.page_links(request, response.content, response.charset)
+            if links:
+                response['Link'] = ', '.join(filter(None, [response.get('Link'), *links]))
+                preload_hints.remember(request.path, links)
+        return response
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0006_introsettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAssetVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('width', models.PositiveIntegerField(default=0)),
+                ('height', models.PositiveIntegerField(default=0)),
+                ('format', models.CharField(blank=True, max_length=10)),
+                ('bytes_size', models.PositiveIntegerField(default=0)),
+                ('secure_url', models.URLField(max_length=500)),
+                ('transformation', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='myApp.mediaasset')),
+            ],
+            options={
+                'ordering': ['asset', 'format', 'width'],
+            },
+        ),
+    ]
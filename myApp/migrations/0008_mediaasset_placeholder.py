@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0007_mediaassetvariant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='dominant_color',
+            field=models.CharField(blank=True, help_text='Dominant colour as #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='placeholder_data_uri',
+            field=models.TextField(blank=True, help_text='Tiny blurred base64 placeholder (LQIP)'),
+        ),
+    ]
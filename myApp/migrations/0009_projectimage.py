@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0008_mediaasset_placeholder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(default=0, help_text='Display order')),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_images', to='myApp.mediaasset')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='myApp.project')),
+            ],
+            options={
+                'ordering': ['project', 'order', 'id'],
+            },
+        ),
+    ]
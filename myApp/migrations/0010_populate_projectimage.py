@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def gallery_urls_to_project_images(apps, schema_editor):
+    """
+    Create ordered ProjectImage rows for every gallery URL: linked to the
+    MediaAsset serving it, or holding the URL itself (external images).
+    """
+    Project = apps.get_model('myApp', 'Project')
+    ProjectImage = apps.get_model('myApp', 'ProjectImage')
+    MediaAsset = apps.get_model('myApp', 'MediaAsset')
+
+    for project in Project.objects.exclude(gallery_images=''):
+        urls = [url.strip() for url in project.gallery_images.split(',') if url.strip()]
+        images = []
+        for order, url in enumerate(urls):
+            asset = MediaAsset.objects.filter(Q(secure_url=url) | Q(web_url=url)).first()
+            images.append(ProjectImage(project=project, asset=asset, image_url='' if asset else url, order=order))
+        ProjectImage.objects.bulk_create(images)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0009_projectimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_url',
+            field=models.URLField(blank=True, help_text='Image URL when there is no MediaAsset', max_length=2000),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='asset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='project_images', to='myApp.mediaasset'),
+        ),
+        migrations.RunPython(gallery_urls_to_project_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-18 23:29
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def count_existing_content(apps, schema_editor):
+    """Fill the counters for content created before they existed (same as ContentCounter.rebuild)"""
+    ContentCounter = apps.get_model('myApp', 'ContentCounter')
+    Insight = apps.get_model('myApp', 'Insight')
+
+    counters = [
+        ContentCounter(model=name, count=apps.get_model('myApp', name).objects.count())
+        for name in ('service', 'hero', 'mediaasset')
+    ]
+    rows = (
+        Insight.objects.order_by()
+        .annotate(created_month=TruncMonth('created_at'))
+        .values('status', 'author_id', 'created_month')
+        .annotate(n=Count('id'))
+    )
+    for row in rows:
+        counters.append(ContentCounter(
+            model='insight',
+            status=row['status'],
+            author_id=row['author_id'] or 0,
+            month=row['created_month'].strftime('%Y-%m') if row['created_month'] else '',
+            count=row['n'],
+        ))
+    ContentCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0010_populate_projectimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text="Counted model name (e.g. 'insight')", max_length=30)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('author_id', models.PositiveIntegerField(default=0, help_text='Author user id (0 = none)')),
+                ('month', models.CharField(blank=True, help_text='Creation month as YYYY-MM', max_length=7)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model', 'status', 'author_id', 'month'), name='unique_content_counter_bucket')],
+            },
+        ),
+        migrations.RunPython(count_existing_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 23:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0011_contentcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['author', 'status', '-created_at', '-id'], name='insight_author_status_created'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myApp', '0012_insight_author_status_index'),
+    ]
+
+    operations = [
+        # auth.User has no Meta we can extend: index its dashboard "joined" sort directly
+        migrations.RunSQL(
+            'CREATE INDEX user_date_joined ON auth_user (date_joined, id)',
+            'DROP INDEX user_date_joined',
+        ),
+        migrations.AddIndex(
+            model_name='hero',
+            index=models.Index(fields=['page', 'order', 'id'], name='hero_page_order'),
+        ),
+        migrations.AddIndex(
+            model_name='hero',
+            index=models.Index(fields=['title', 'id'], name='hero_title'),
+        ),
+        migrations.AddIndex(
+            model_name='metadata',
+            index=models.Index(fields=['title', 'id'], name='metadata_title'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-featured', 'order', '-created_at', '-id'], name='project_featured_order'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['title', 'id'], name='project_title'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at', 'id'], name='project_created'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['order', 'title', 'id'], name='service_order_title'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['title', 'id'], name='service_title'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['created_at', 'id'], name='service_created'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0015_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='savings_bytes',
+            field=models.PositiveIntegerField(default=0, help_text='Bytes saved by the chosen format over WebP'),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='source_bytes',
+            field=models.PositiveIntegerField(default=0, help_text='Size of the uploaded file'),
+        ),
+    ]
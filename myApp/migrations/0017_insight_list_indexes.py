@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-19 00:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0016_mediaasset_encoding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='insight_author_created'),
+        ),
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='insight_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['-created_at', '-id'], name='insight_created'),
+        ),
+    ]
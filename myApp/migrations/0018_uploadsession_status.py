@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0017_insight_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('receiving', 'Receiving'), ('finalizing', 'Finalizing'), ('failed', 'Failed')], default='receiving', max_length=20),
+        ),
+    ]
@@ -1,9 +1,18 @@
-from django.db import models
+import re
+import uuid
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, TruncMonth
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 from django.urls import reverse
 
 
+# Strips HTML tags from titles that carry inline markup (e.g. "Villa<br><em>Gardens</em>")
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
 class UserProfile(models.Model):
     """Extended user profile with role information"""
     ROLE_CHOICES = [
@@ -59,7 +68,11 @@ class MediaAsset(models.Model):
     width = models.PositiveIntegerField(default=0)
     height = models.PositiveIntegerField(default=0)
     format = models.CharField(max_length=10, blank=True)
+    source_bytes = models.PositiveIntegerField(default=0, help_text="Size of the uploaded file")
+    savings_bytes = models.PositiveIntegerField(default=0, help_text="Bytes saved by the chosen format over WebP")
     tags_csv = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    placeholder_data_uri = models.TextField(blank=True, help_text="Tiny blurred base64 placeholder (LQIP)")
+    dominant_color = models.CharField(max_length=7, blank=True, help_text="Dominant colour as #rrggbb")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -68,6 +81,157 @@ class MediaAsset(models.Model):
     
     def __str__(self):
         return self.title
+    
+    @classmethod
+    def lookup_by_urls(cls, urls):
+        """Resolve content URLs (original or web URL) to assets with variants prefetched"""
+        urls = {url for url in urls if url}
+        if not urls:
+            return {}
+        assets = cls.objects.filter(
+            models.Q(secure_url__in=urls) | models.Q(web_url__in=urls)
+        ).prefetch_related('variants')
+        lookup = {}
+        for asset in assets:
+            for url in (asset.secure_url, asset.web_url):
+                if url in urls:
+                    lookup[url] = asset
+        return lookup
+    
+    def get_variants(self, format=None):
+        """Variants sorted by width (uses prefetched variants when available)"""
+        variants = [v for v in self.variants.all() if format is None or v.format == format]
+        return sorted(variants, key=lambda v: v.width)
+    
+    def best_variant(self, width, format=None):
+        """Smallest variant at least `width` px wide, or the largest one available"""
+        variants = self.get_variants(format)
+        if not variants:
+            return None
+        for variant in variants:
+            if variant.width >= width:
+                return variant
+        return variants[-1]
+    
+    def fallback_format(self):
+        """Format of the <img> srcset: WebP when the ladder has it, as every browser decodes it"""
+        formats = sorted({v.format for v in self.get_variants()})
+        return 'webp' if 'webp' in formats or not formats else formats[0]
+    
+    def srcset(self, format=None):
+        """Build an <img srcset> value from one format of the variant ladder (fallback_format by default)"""
+        return ', '.join(f'{v.secure_url} {v.width}w' for v in self.get_variants(format or self.fallback_format()))
+    
+    def responsive_attrs(self, sizes='(max-width: 900px) 100vw, 900px'):
+        """srcset/sizes attributes for an <img> tag ('' when no variants exist)"""
+        from django.utils.html import escape
+        from django.utils.safestring import mark_safe
+        srcset = self.srcset()
+        if not srcset:
+            return ''
+        return mark_safe(f' srcset="{escape(srcset)}" sizes="{escape(sizes)}"')
+    
+    def picture_sources(self, sizes='(max-width: 900px) 100vw, 900px'):
+        """<source> tags for the ladder's other formats (e.g. AVIF), to precede the <img> in a <picture>"""
+        from django.utils.html import escape
+        from django.utils.safestring import mark_safe
+        fallback = self.fallback_format()
+        formats = sorted({v.format for v in self.get_variants()} - {fallback})
+        return mark_safe(''.join(
+            f'<source type="image/{escape(fmt)}" srcset="{escape(self.srcset(fmt))}" sizes="{escape(sizes)}">'
+            for fmt in formats
+        ))
+    
+    def picture(self, img_tag):
+        """Wrap an <img> rendered with responsive_attrs() in a <picture> offering picture_sources()"""
+        from django.utils.safestring import mark_safe
+        sources = self.picture_sources()
+        if not sources:
+            return img_tag
+        # display:contents keeps the <img> laid out as a child of the original container
+        return mark_safe(f'<picture style="display:contents">{sources}{img_tag}</picture>')
+
+
+class MediaDeletion(models.Model):
+    """
+    Cloudinary asset waiting to be destroyed, queued when its MediaAsset is deleted.
+    Processed in batches with retries by `python manage.py process_media_deletions`
+    (see media_cleanup.py).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),
+    ]
+    
+    public_id = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='mediadeletion_due'),
+        ]
+    
+    def __str__(self):
+        return f"{self.public_id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """
+    Chunked gallery upload in progress: chunks are appended to a temporary file
+    until `received` reaches `size`, then the file is compressed and stored
+    (see chunked_upload.py). Abandoned sessions are removed by
+    `python manage.py purge_upload_sessions`.
+    """
+    RECEIVING = 'receiving'
+    FINALIZING = 'finalizing'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (RECEIVING, 'Receiving'),
+        (FINALIZING, 'Finalizing'),
+        (FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RECEIVING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+    
+    @property
+    def complete(self):
+        return self.received >= self.size
+
+
+class MediaAssetVariant(models.Model):
+    """Pre-generated rendition of a MediaAsset at a given width and format"""
+    asset = models.ForeignKey(MediaAsset, on_delete=models.CASCADE, related_name='variants')
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    format = models.CharField(max_length=10, blank=True)
+    bytes_size = models.PositiveIntegerField(default=0)
+    secure_url = models.URLField(max_length=500)
+    transformation = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['asset', 'format', 'width']
+    
+    def __str__(self):
+        return f"{self.asset.title} ({self.format} {self.width}w)"
 
 
 class Service(models.Model):
@@ -124,6 +288,12 @@ class Service(models.Model):
     
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            # Dashboard list sorts (see views.SERVICES_LIST)
+            models.Index(fields=['order', 'title', 'id'], name='service_order_title'),
+            models.Index(fields=['title', 'id'], name='service_title'),
+            models.Index(fields=['created_at', 'id'], name='service_created'),
+        ]
     
     def __str__(self):
         return self.title
@@ -210,12 +380,37 @@ class Service(models.Model):
                 faqs.append({'question': question.strip(), 'answer': answer.strip()})
         return faqs
     
-    def get_related_services_list(self):
-        """Get related services as Service objects"""
+    def get_related_slugs(self):
+        """Parse related_services into a list of slugs"""
         if not self.related_services:
-            return Service.objects.none()
-        slugs = [s.strip() for s in self.related_services.split(',') if s.strip()]
-        return Service.objects.filter(slug__in=slugs).exclude(id=self.id)[:3]
+            return []
+        return [s.strip() for s in self.related_services.split(',') if s.strip()]
+    
+    @classmethod
+    def prefetch_related_services(cls, services, limit=3):
+        """
+        Resolve related_services for many services with a single query and
+        memoize the result on each instance (used by get_related_services_list).
+        """
+        services = list(services)
+        slugs = {slug for service in services for slug in service.get_related_slugs()}
+        candidates = sorted(
+            cls.objects.filter(slug__in=slugs) if slugs else [],
+            key=lambda s: (s.order, s.title)
+        )
+        for service in services:
+            wanted = set(service.get_related_slugs())
+            service._related_services_cache = [
+                candidate for candidate in candidates
+                if candidate.slug in wanted and candidate.id != service.id
+            ][:limit]
+        return services
+    
+    def get_related_services_list(self):
+        """Get related services as Service objects (memoized per instance)"""
+        if not hasattr(self, '_related_services_cache'):
+            Service.prefetch_related_services([self])
+        return self._related_services_cache
     
     def get_whats_included_list(self):
         """Parse whats_included and return list of items"""
@@ -225,12 +420,13 @@ class Service(models.Model):
     
     def get_clean_title(self):
         """Get title without HTML tags for use in tags/labels"""
-        import re
         if not self.title:
             return ''
-        # Remove HTML tags
-        clean = re.sub(r'<[^>]+>', '', self.title)
-        return clean.strip()
+        if getattr(self, '_clean_title_source', None) != self.title:
+            # Remove HTML tags
+            self._clean_title = HTML_TAG_RE.sub('', self.title).strip()
+            self._clean_title_source = self.title
+        return self._clean_title
 
 
 class Insight(models.Model):
@@ -253,6 +449,14 @@ class Insight(models.Model):
     
     class Meta:
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Dashboard list: an author's insights by status, newest first (id breaks ties)
+            models.Index(fields=['author', 'status', '-created_at', '-id'], name='insight_author_status_created'),
+            # ... all of an author's insights, one status for admins, and the unfiltered admin list
+            models.Index(fields=['author', '-created_at', '-id'], name='insight_author_created'),
+            models.Index(fields=['status', '-created_at', '-id'], name='insight_status_created'),
+            models.Index(fields=['-created_at', '-id'], name='insight_created'),
+        ]
     
     def __str__(self):
         return self.title
@@ -284,6 +488,14 @@ class Insight(models.Model):
             # If not JSON, assume it's HTML and return as-is
             return mark_safe(self.content)
         
+        # Resolve every image block to its MediaAsset in one query so the
+        # smallest adequate variant can be picked by the browser via srcset
+        image_assets = MediaAsset.lookup_by_urls(
+            block.get('data', {}).get('url', '')
+            for block in blocks
+            if block.get('type') in ('image', 'imageCaption')
+        )
+        
         html_parts = []
         
         for block in blocks:
@@ -340,7 +552,10 @@ class Insight(models.Model):
                 if url:
                     html_parts.append('<div class="article-img">')
                     html_parts.append(f'<div class="article-img-inner {escape(style)}">')
-                    html_parts.append(f'<img src="{escape(url)}" alt="{escape(caption)}" style="width:100%;height:100%;object-fit:cover;">')
+                    asset = image_assets.get(url)
+                    srcset = asset.responsive_attrs() if asset else ''
+                    img = f'<img src="{escape(url)}"{srcset} alt="{escape(caption)}" loading="lazy" style="width:100%;height:100%;object-fit:cover;">'
+                    html_parts.append(asset.picture(img) if asset else img)
                     html_parts.append('</div>')
                     html_parts.append('</div>')
                     if caption:
@@ -352,7 +567,10 @@ class Insight(models.Model):
                 if url:
                     html_parts.append('<div class="article-img">')
                     html_parts.append('<div class="article-img-inner teal">')
-                    html_parts.append(f'<img src="{escape(url)}" alt="{escape(caption)}" style="width:100%;height:100%;object-fit:cover;">')
+                    asset = image_assets.get(url)
+                    srcset = asset.responsive_attrs() if asset else ''
+                    img = f'<img src="{escape(url)}"{srcset} alt="{escape(caption)}" loading="lazy" style="width:100%;height:100%;object-fit:cover;">'
+                    html_parts.append(asset.picture(img) if asset else img)
                     html_parts.append('</div>')
                     html_parts.append('</div>')
                     if caption:
@@ -404,6 +622,11 @@ class Hero(models.Model):
     class Meta:
         ordering = ['page', 'order']
         unique_together = [['page', 'custom_slug']]
+        indexes = [
+            # Dashboard list sorts (see views.HEROES_LIST)
+            models.Index(fields=['page', 'order', 'id'], name='hero_page_order'),
+            models.Index(fields=['title', 'id'], name='hero_title'),
+        ]
     
     def __str__(self):
         return f"{self.get_page_display()} - {self.title}"
@@ -443,6 +666,10 @@ class Metadata(models.Model):
     class Meta:
         ordering = ['page', 'custom_slug']
         unique_together = [['page', 'custom_slug']]
+        indexes = [
+            # Dashboard list title sort (see views.METADATA_LIST)
+            models.Index(fields=['title', 'id'], name='metadata_title'),
+        ]
     
     def __str__(self):
         return f"{self.get_page_display()} - {self.title}"
@@ -482,7 +709,7 @@ class Project(models.Model):
     # Project Specifications (format: "key|value,key|value,...")
     specs_data = models.TextField(blank=True, help_text="Project specs in format: 'Area|500 sqm,Completion|2024,Style|Tropical Modern'")
     
-    # Gallery Images (comma-separated Cloudinary URLs)
+    # Gallery Images (comma-separated Cloudinary URLs, synced to ProjectImage rows on save from the dashboard and admin)
     gallery_images = models.TextField(blank=True, help_text="Comma-separated Cloudinary URLs for gallery")
     
     # Related Service (optional)
@@ -496,6 +723,12 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-featured', 'order', '-created_at']
+        indexes = [
+            # Dashboard list sorts (see views.PROJECTS_LIST)
+            models.Index(fields=['-featured', 'order', '-created_at', '-id'], name='project_featured_order'),
+            models.Index(fields=['title', 'id'], name='project_title'),
+            models.Index(fields=['created_at', 'id'], name='project_created'),
+        ]
     
     def __str__(self):
         return self.title
@@ -520,11 +753,49 @@ class Project(models.Model):
                     specs.append({'key': parts[0].strip(), 'value': parts[1].strip()})
         return specs
     
-    def get_gallery_list(self):
-        """Parse gallery_images and return list of URLs"""
+    def parse_gallery_urls(self):
+        """Parse the comma-separated gallery_images field into a list of URLs"""
         if not self.gallery_images:
             return []
         return [url.strip() for url in self.gallery_images.split(',') if url.strip()]
+    
+    def get_gallery_list(self):
+        """Gallery image URLs in display order (from the relational gallery)"""
+        return [image.url for image in self.images.all()]
+    
+    def sync_gallery_images(self):
+        """
+        Rebuild the ProjectImage rows from gallery_images. URLs of MediaAssets link
+        the asset (variants, placeholder, dimensions); any other URL is kept as is.
+        """
+        urls = self.parse_gallery_urls()
+        assets = MediaAsset.lookup_by_urls(urls)
+        with transaction.atomic():
+            self.images.all().delete()
+            ProjectImage.objects.bulk_create([
+                ProjectImage(project=self, asset=assets.get(url), image_url='' if url in assets else url, order=order)
+                for order, url in enumerate(urls)
+            ])
+
+
+class ProjectImage(models.Model):
+    """Ordered gallery image of a Project, backed by a MediaAsset or an external URL"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
+    asset = models.ForeignKey(MediaAsset, on_delete=models.CASCADE, null=True, blank=True, related_name='project_images')
+    image_url = models.URLField(max_length=2000, blank=True, help_text="Image URL when there is no MediaAsset")
+    order = models.IntegerField(default=0, help_text="Display order")
+    
+    class Meta:
+        ordering = ['project', 'order', 'id']
+    
+    def __str__(self):
+        return f"{self.project.title} #{self.order}"
+    
+    @property
+    def url(self):
+        if self.asset_id:
+            return self.asset.web_url or self.asset.secure_url
+        return self.image_url
 
 
 class IntroSettings(models.Model):
@@ -549,4 +820,107 @@ class IntroSettings(models.Model):
     def get_settings(cls):
         """Get or create the singleton instance"""
         obj, created = cls.objects.get_or_create(pk=1)
-        return obj
\ No newline at end of file
+        return obj
+
+
+def month_key(value):
+    """Counter month bucket ('YYYY-MM' in the current timezone) for a datetime"""
+    return timezone.localtime(value).strftime('%Y-%m') if value else ''
+
+
+class ContentCounter(models.Model):
+    """
+    Row counts of dashboard content, bucketed by status, author and creation month
+    (only Insights use the buckets). Kept current by signals (see signals.py), so the
+    dashboards sum a handful of counter rows instead of counting the content tables.
+    Rebuild from scratch with `python manage.py rebuild_counters`.
+    """
+    model = models.CharField(max_length=30, help_text="Counted model name (e.g. 'insight')")
+    status = models.CharField(max_length=20, blank=True)
+    author_id = models.PositiveIntegerField(default=0, help_text="Author user id (0 = none)")
+    month = models.CharField(max_length=7, blank=True, help_text="Creation month as YYYY-MM")
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'status', 'author_id', 'month'], name='unique_content_counter_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} {self.status} {self.author_id} {self.month}: {self.count}"
+    
+    @staticmethod
+    def bucket_for(instance):
+        """Bucket fields (status/author_id/month) an instance is counted under"""
+        if isinstance(instance, Insight):
+            return {
+                'status': instance.status,
+                'author_id': instance.author_id or 0,
+                'month': month_key(instance.created_at),
+            }
+        return {}
+    
+    @classmethod
+    def bump(cls, model_name, delta, **bucket):
+        """Add delta to one bucket, creating it on first use"""
+        counter, _ = cls.objects.get_or_create(model=model_name, **bucket)
+        cls.objects.filter(pk=counter.pk).update(count=models.F('count') + delta)
+    
+    @classmethod
+    def totals(cls):
+        """Total rows per counted model, e.g. {'insight': 120, 'service': 8} (one query)"""
+        return dict(cls.objects.values_list('model').annotate(total=models.Sum('count')).order_by())
+    
+    @classmethod
+    def insight_stats(cls, author_id=None, status=None):
+        """
+        Insight totals for the insights dashboard in one query.
+        
+        Args:
+            author_id: Only count this author's insights
+            status: Only count insights with this status
+        
+        Returns:
+            dict: total, published, draft, this_month
+        """
+        counters = cls.objects.filter(model='insight')
+        if author_id is not None:
+            counters = counters.filter(author_id=author_id)
+        if status:
+            counters = counters.filter(status=status)
+        
+        def total(**filters):
+            return Coalesce(models.Sum('count', filter=models.Q(**filters) if filters else None), 0)
+        
+        return counters.aggregate(
+            total=total(),
+            published=total(status='published'),
+            draft=total(status='draft'),
+            this_month=total(month=month_key(timezone.now())),
+        )
+    
+    @classmethod
+    def rebuild(cls):
+        """Recount every bucket from the content tables (after bulk loads or raw SQL)"""
+        counters = [
+            cls(model=model._meta.model_name, count=model.objects.count())
+            for model in (Service, Hero, MediaAsset)
+        ]
+        rows = (
+            Insight.objects.order_by()
+            .annotate(created_month=TruncMonth('created_at'))
+            .values('status', 'author_id', 'created_month')
+            .annotate(n=models.Count('id'))
+        )
+        for row in rows:
+            counters.append(cls(
+                model='insight',
+                status=row['status'],
+                author_id=row['author_id'] or 0,
+                month=row['created_month'].strftime('%Y-%m') if row['created_month'] else '',
+                count=row['n'],
+            ))
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(counters)
+        return counters
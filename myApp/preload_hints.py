@@ -0,0 +1,111 @@
+"""
+Preload hints for public pages.
+
+Hero backgrounds are set from inline CSS, so the browser only discovers them
+after parsing the markup, and the web fonts only after their stylesheet.
+PreloadHintsMiddleware (middleware.py) announces them up front in a Link
+header on every public HTML page:
+
+    <https://res.cloudinary.com/.../hero.webp>; rel=preload; as=image; fetchpriority=high
+    <https://fonts.gstatic.com>; rel=preconnect; crossorigin
+    <https://fonts.googleapis.com/css2?...>; rel=preload; as=style
+
+The LCP image is the one the view passes to preload_image(); stylesheets and
+preconnects are read from the <head> of the rendered page, so they follow the
+templates.
+
+Under ASGI, EarlyHintsMiddleware (wrapped around the application in
+myProject/asgi.py) sends the links last served for a path as a 103 Early Hints
+response before Django runs the view, so the browser starts those fetches
+while the server is still querying and rendering. That needs a server with the
+ASGI `http.response.early_hint` extension (e.g. Hypercorn); other servers only
+deliver the Link header.
+"""
+import html
+import re
+import threading
+from collections import OrderedDict
+
+from django.utils.encoding import iri_to_uri
+
+PUBLIC_ROUTES = {
+    'home', 'home_ar', 'services', 'service_detail', 'projects', 'project_detail', 'blog_overview', 'blog_detail',
+}
+# Paths whose links are kept for Early Hints; the least recently served are dropped first
+MAX_REMEMBERED_PATHS = 1024
+EARLY_HINT_EXTENSION = 'http.response.early_hint'
+
+_LINK_TAG = re.compile(r'<link\b([^>]*)>', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'([\w-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+_remembered = OrderedDict()
+_lock = threading.Lock()
+
+
+def preload_image(request, url):
+    """Mark `url` as the page's LCP image, preloaded with high priority"""
+    if url:
+        request.preload_image_url = url
+
+
+def head_links(head):
+    """Link values for the stylesheets and preconnects in a page's <head> markup"""
+    links = []
+    for attributes in _LINK_TAG.findall(head):
+        attrs = {
+            match.group(1).lower(): html.unescape(match.group(2) or match.group(3) or match.group(4) or '')
+            for match in _ATTRIBUTE.finditer(attributes)
+        }
+        rel = attrs.get('rel', '').lower().split()
+        href = attrs.get('href')
+        if not href:
+            continue
+        if 'stylesheet' in rel:
+            links.append(f'<{iri_to_uri(href)}>; rel=preload; as=style')
+        elif 'preconnect' in rel:
+            links.append(f'<{iri_to_uri(href)}>; rel=preconnect' + ('; crossorigin' if 'crossorigin' in attrs else ''))
+    return links
+
+
+def page_links(request, content, charset='utf-8'):
+    """Link values for a rendered page: its LCP image first, then head_links()"""
+    links = []
+    image = getattr(request, 'preload_image_url', '')
+    if image:
+        links.append(f'<{iri_to_uri(image)}>; rel=preload; as=image; fetchpriority=high')
+    end = content.find(b'</head>')
+    if end != -1:
+        links += head_links(content[:end].decode(charset, 'replace'))
+    return links
+
+
+def remember(path, links):
+    with _lock:
+        _remembered[path] = links
+        _remembered.move_to_end(path)
+        while len(_remembered) > MAX_REMEMBERED_PATHS:
+            _remembered.popitem(last=False)
+
+
+def recent_links(path):
+    """Links last served for `path` ([] before its first response)"""
+    with _lock:
+        return _remembered.get(path, [])
+
+
+class EarlyHintsMiddleware:
+    """ASGI middleware sending 103 Early Hints with the links last served for the requested path"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] == 'http'
+            and scope['method'] == 'GET'
+            and EARLY_HINT_EXTENSION in (scope.get('extensions') or {})
+        ):
+            links = recent_links(scope['path'])
+            if links:
+                await send({'type': EARLY_HINT_EXTENSION, 'links': [link.encode('latin-1') for link in links]})
+        await self.app(scope, receive, send)
@@ -0,0 +1,214 @@
+"""
+Per-request profiling.
+
+RequestProfilingMiddleware opens a RequestProfile for every request and makes it
+the current one (a context variable, so it follows the request into async views).
+SQL time is collected with a database execute wrapper installed on every
+connection (it hands successful queries slower than SLOW_QUERY_MS to slow_queries.py and
+does nothing outside a profiled request, so async ORM calls are timed whichever
+thread runs them), template time by the
+ProfilingDjangoTemplates backend, and any other phase with `timed(name)`.
+
+Finished requests are folded into rolling per-route windows (the last
+PROFILING_WINDOW requests of each URL name) shown on the dashboard. The windows
+live in process memory, so each worker reports its own traffic.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from . import slow_queries
+from .utils.benchmark import percentile
+
+# Upper bounds (ms) of the latency histogram buckets shown on the dashboard
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Timings (ms) and counts accumulated while one request is handled"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.counts = {}
+
+    def add(self, name, ms, count=1):
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def current_profile():
+    """The RequestProfile of the request being handled, or None"""
+    return _current.get()
+
+
+def activate(profile):
+    """Make `profile` current; returns a token for deactivate()"""
+    return _current.set(profile)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's `name` timing"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - start) * 1000)
+
+
+def sql_execute_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper that times every query into the current profile"""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        profile.add('db', duration_ms)
+    # Failed queries propagate without being captured: re-running them for a plan
+    # would fail again (or wait on the same lock) and the error is reported anyway
+    if settings.SLOW_QUERY_MS and duration_ms >= settings.SLOW_QUERY_MS:
+        slow_queries.capture(profile, context['connection'], sql, params, many, duration_ms)
+    return result
+
+
+def _add_query_timer(sender=None, connection=None, **kwargs):
+    if sql_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_execute_wrapper)
+
+
+def _add_query_timers(sender=None, **kwargs):
+    for connection in connections.all(initialized_only=True):
+        _add_query_timer(connection=connection)
+
+
+def install_query_timer():
+    """
+    Install sql_execute_wrapper on open connections and on every new one.
+    Connections are per thread, so request_started (sent in the thread that runs
+    the request's queries, also under ASGI) covers those another thread opened
+    before the middleware was loaded.
+    """
+    connection_created.connect(_add_query_timer, dispatch_uid='myApp.profiling.query_timer')
+    request_started.connect(_add_query_timers, dispatch_uid='myApp.profiling.query_timers')
+    _add_query_timers()
+
+
+# ==================== TEMPLATE BACKEND ====================
+
+class ProfiledTemplate(Template):
+    """Template whose top-level render is timed as 'template'"""
+
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class ProfilingDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend returning ProfiledTemplate instances"""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return ProfiledTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# ==================== ROLLING ROUTE STATS ====================
+
+class RouteStats:
+    """Rolling window of the most recent requests to one URL name"""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.samples = deque(maxlen=window)
+
+    def add(self, total_ms, db_ms, db_count, template_ms, size):
+        self.requests += 1
+        self.samples.append((total_ms, db_ms, db_count, template_ms, size))
+
+    def summary(self):
+        total, db, queries, template, size = (list(column) for column in zip(*self.samples))
+        n = len(total)
+        histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for ms in total:
+            histogram[next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), -1)] += 1
+        return {
+            'requests': self.requests,
+            'window': n,
+            'mean_ms': round(sum(total) / n, 1),
+            'p50_ms': round(percentile(total, 50), 1),
+            'p95_ms': round(percentile(total, 95), 1),
+            'p99_ms': round(percentile(total, 99), 1),
+            'db_ms': round(sum(db) / n, 1),
+            'queries': round(sum(queries) / n, 1),
+            'template_ms': round(sum(template) / n, 1),
+            'python_ms': round(max(0.0, (sum(total) - sum(db) - sum(template)) / n), 1),
+            'bytes': round(sum(size) / n),
+            'histogram': histogram,
+        }
+
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+def record(route, profile, total_ms, size):
+    """Fold one finished request into its route's rolling window"""
+    with _routes_lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = RouteStats(settings.PROFILING_WINDOW)
+        stats.add(
+            total_ms,
+            profile.timings.get('db', 0.0),
+            profile.counts.get('db', 0),
+            profile.timings.get('template', 0.0),
+            size,
+        )
+
+
+def snapshot():
+    """
+    Summaries of every profiled route, slowest p95 first.
+
+    Returns:
+        list: dicts with 'route' plus RouteStats.summary() fields
+    """
+    with _routes_lock:
+        summaries = [{'route': route, **stats.summary()} for route, stats in _routes.items()]
+    return sorted(summaries, key=lambda s: s['p95_ms'], reverse=True)
+
+
+def reset():
+    with _routes_lock:
+        _routes.clear()
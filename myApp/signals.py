@@ -1,10 +1,17 @@
 """
-Signals to automatically create UserProfile when User is created
+Signals to automatically create UserProfile when User is created,
+to keep cached content and dashboard counters in sync with the database
+and to queue remote cleanup of deleted media
 """
-from django.db.models.signals import post_save
+import contextlib
+import threading
+
+from django.db.models.signals import pre_delete, pre_save, post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, Service, Insight, Hero, MediaAsset, ContentCounter
+from .content_cache import invalidate_footer_services
+from .media_cleanup import queue_deletions
 
 
 @receiver(post_save, sender=User)
@@ -22,3 +29,111 @@ def save_user_profile(sender, instance, **kwargs):
     else:
         UserProfile.objects.get_or_create(user=instance)
 
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_service_caches(sender, **kwargs):
+    """Drop cached footer/nav services when any service changes"""
+    invalidate_footer_services()
+
+
+# ==================== CONTENT COUNTERS ====================
+# Bulk operations (bulk_create, queryset.update) skip these signals: call
+# ContentCounter.rebuild() afterwards, or run them inside deferred_counters().
+
+_counters = threading.local()
+
+
+@contextlib.contextmanager
+def deferred_counters(rebuild=True):
+    """
+    Skip per-row counter updates inside the block and rebuild the counters once at
+    the end (rebuild=False: the caller adjusts them itself).
+    """
+    _counters.deferred = getattr(_counters, 'deferred', 0) + 1
+    try:
+        yield
+    finally:
+        _counters.deferred -= 1
+        if rebuild and not _counters.deferred:
+            ContentCounter.rebuild()
+
+
+def counters_deferred():
+    return getattr(_counters, 'deferred', 0) > 0
+
+
+COUNTER_BUCKET_FIELDS = ('status', 'author_id', 'created_at')
+
+
+@receiver(post_init, sender=Insight)
+def track_counter_bucket(sender, instance, **kwargs):
+    """Remember the bucket a loaded insight is counted under (no query when it is saved)"""
+    if instance.pk is not None and all(name in instance.__dict__ for name in COUNTER_BUCKET_FIELDS):
+        instance._counter_bucket = ContentCounter.bucket_for(instance)
+
+
+@receiver(pre_save, sender=Insight)
+def remember_counter_bucket(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the bucket an existing insight is counted under, in case the save moves it"""
+    if not instance.pk or raw or counters_deferred():
+        instance._counter_bucket = None
+    elif update_fields is not None and not set(update_fields) & {'status', 'author', 'author_id', 'created_at'}:
+        return  # The bucket can't change
+    elif getattr(instance, '_counter_bucket', None) is None:
+        # Loaded with a bucket field deferred (or built by hand): read the stored row
+        old = Insight.objects.filter(pk=instance.pk).only(*COUNTER_BUCKET_FIELDS).first()
+        instance._counter_bucket = ContentCounter.bucket_for(old) if old else None
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Insight)
+@receiver(post_save, sender=Hero)
+@receiver(post_save, sender=MediaAsset)
+def count_saved_content(sender, instance, created, raw=False, **kwargs):
+    """Count new content, or move an edited insight to its new status/author bucket"""
+    if raw or counters_deferred():
+        return
+    model_name = sender._meta.model_name
+    bucket = ContentCounter.bucket_for(instance)
+    if created:
+        ContentCounter.bump(model_name, 1, **bucket)
+    else:
+        old_bucket = getattr(instance, '_counter_bucket', None)
+        if old_bucket is not None and old_bucket != bucket:
+            ContentCounter.bump(model_name, -1, **old_bucket)
+            ContentCounter.bump(model_name, 1, **bucket)
+    if isinstance(instance, Insight):
+        instance._counter_bucket = bucket
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Insight)
+@receiver(post_delete, sender=Hero)
+@receiver(post_delete, sender=MediaAsset)
+def count_deleted_content(sender, instance, **kwargs):
+    if counters_deferred():
+        return
+    ContentCounter.bump(sender._meta.model_name, -1, **ContentCounter.bucket_for(instance))
+
+
+@receiver(pre_delete, sender=User)
+def release_author_counters(sender, instance, **kwargs):
+    """
+    Deleting a user sets Insight.author to NULL in one UPDATE, without insight
+    signals: move the user's insight buckets to 'no author' (author_id 0).
+    """
+    if counters_deferred():
+        return
+    for counter in ContentCounter.objects.filter(model='insight', author_id=instance.pk):
+        ContentCounter.bump('insight', counter.count, status=counter.status, author_id=0, month=counter.month)
+        counter.delete()
+
+
+# ==================== REMOTE MEDIA CLEANUP ====================
+
+@receiver(post_delete, sender=MediaAsset)
+def queue_remote_deletion(sender, instance, **kwargs):
+    """Queue the Cloudinary asset of a deleted MediaAsset (see media_cleanup.py)"""
+    if instance.public_id:
+        queue_deletions([instance.public_id])
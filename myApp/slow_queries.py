@@ -0,0 +1,95 @@
+"""
+Slow query capture.
+
+Every query run during a profiled request goes through profiling.sql_execute_wrapper;
+those slower than SLOW_QUERY_MS are recorded here with the calling view, a summary
+of the project frames that issued them and the database's query plan
+(EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere: never ANALYZE, which would run
+the slow query a second time in the request). Only the last
+SLOW_QUERY_BUFFER entries are kept; they are shown on the dashboard Performance page.
+"""
+import logging
+import threading
+import traceback
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STACK_FRAMES = 6
+
+_entries = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+_lock = threading.Lock()
+
+
+def stack_summary():
+    """The innermost project frames (no Django or site-packages) that led to the query"""
+    base = str(Path(settings.BASE_DIR))
+    here = str(Path(__file__).resolve().parent / 'profiling.py')
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(base)
+        and 'site-packages' not in frame.filename
+        and frame.filename not in (__file__, here)
+    ]
+    return [f'{Path(f.filename).relative_to(base)}:{f.lineno} in {f.name}' for f in frames[-STACK_FRAMES:]]
+
+
+def explain(connection, sql, params):
+    """
+    Query plan for a SELECT, run on the raw cursor so it bypasses execute
+    wrappers (and is never itself profiled or captured).
+
+    Returns:
+        str: The plan, or '' when the statement can't be explained
+    """
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return ''
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.cursor.execute(prefix + sql, params)
+            rows = cursor.cursor.fetchall()
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent each step under its parent
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+
+def capture(profile, connection, sql, params, many, duration_ms):
+    """Record one slow query (called from the profiling SQL wrapper)"""
+    request = getattr(profile, 'request', None)
+    match = getattr(request, 'resolver_match', None)
+    entry = {
+        'at': timezone.now(),
+        'view': match.view_name if match else (request.path if request else ''),
+        'duration_ms': round(duration_ms, 1),
+        'sql': sql,
+        'stack': stack_summary(),
+        'plan': '' if many else explain(connection, sql, params),
+    }
+    with _lock:
+        _entries.appendleft(entry)
+    logger.warning("Slow query (%.0f ms) in %s: %s", duration_ms, entry['view'], sql[:300])
+
+
+def recent():
+    """Captured slow queries, newest first"""
+    with _lock:
+        return list(_entries)
+
+
+def reset():
+    with _lock:
+        _entries.clear()
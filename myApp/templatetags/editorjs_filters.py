@@ -6,6 +6,8 @@ from django import template
 from django.utils.safestring import mark_safe
 from django.utils.html import escape
 
+from myApp.models import MediaAsset
+
 register = template.Library()
 
 
@@ -25,6 +27,13 @@ def render_editorjs(content):
         # If not JSON, assume it's HTML and return as-is
         return mark_safe(content)
     
+    # Resolve image blocks to MediaAssets in one query (for srcset variants)
+    image_assets = MediaAsset.lookup_by_urls(
+        block.get('data', {}).get('url', '')
+        for block in blocks
+        if block.get('type') in ('image', 'imageCaption')
+    )
+    
     html_parts = []
     
     for block in blocks:
@@ -82,7 +91,10 @@ def render_editorjs(content):
             if url:
                 html_parts.append('<div class="article-img">')
                 html_parts.append(f'<div class="article-img-inner {escape(style)}">')
-                html_parts.append(f'<img src="{escape(url)}" alt="{escape(caption)}" style="width:100%;height:100%;object-fit:cover;">')
+                asset = image_assets.get(url)
+                srcset = asset.responsive_attrs() if asset else ''
+                img = f'<img src="{escape(url)}"{srcset} alt="{escape(caption)}" loading="lazy" style="width:100%;height:100%;object-fit:cover;">'
+                html_parts.append(asset.picture(img) if asset else img)
                 html_parts.append('</div>')
                 html_parts.append('</div>')
                 if caption:
@@ -94,7 +106,10 @@ def render_editorjs(content):
             if url:
                 html_parts.append('<div class="article-img">')
                 html_parts.append('<div class="article-img-inner teal">')
-                html_parts.append(f'<img src="{escape(url)}" alt="{escape(caption)}" style="width:100%;height:100%;object-fit:cover;">')
+                asset = image_assets.get(url)
+                srcset = asset.responsive_attrs() if asset else ''
+                img = f'<img src="{escape(url)}"{srcset} alt="{escape(caption)}" loading="lazy" style="width:100%;height:100%;object-fit:cover;">'
+                html_parts.append(asset.picture(img) if asset else img)
                 html_parts.append('</div>')
                 html_parts.append('</div>')
                 if caption:
@@ -0,0 +1,50 @@
+"""
+Template tags for MediaAsset-backed background images (placeholders, dominant colour)
+"""
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def lazy_bg(context, url, extra_style=''):
+    """
+    Inline style/data attributes for a lazily loaded background image.
+
+    Paints the asset's dominant colour and blurred placeholder immediately
+    and defers the real image to the [data-bg] observer in base.html. URLs
+    without a known asset fall back to a plain background-image.
+    """
+    if not url:
+        return ''
+    extra_style = escape(extra_style)
+    asset = context.get('media_assets', {}).get(url)
+    if not asset or not asset.placeholder_data_uri:
+        return mark_safe(f'style="{extra_style}background-image:url(\'{escape(url)}\');background-size:cover;background-position:center;"')
+    color = f'background-color:{escape(asset.dominant_color)};' if asset.dominant_color else ''
+    return mark_safe(
+        f'data-bg="{escape(url)}" '
+        f'style="{extra_style}{color}background-image:url(\'{asset.placeholder_data_uri}\');background-size:cover;background-position:center;"'
+    )
+
+
+@register.simple_tag(takes_context=True)
+def bg_with_placeholder(context, url):
+    """
+    background-image declarations for an eagerly loaded (LCP) image, with
+    the blurred placeholder layered underneath and the dominant colour as
+    background-color so something paints before the real image arrives.
+    """
+    if not url:
+        return ''
+    layers = f"url('{escape(url)}')"
+    color = ''
+    asset = context.get('media_assets', {}).get(url)
+    if asset:
+        if asset.placeholder_data_uri:
+            layers += f", url('{asset.placeholder_data_uri}')"
+        if asset.dominant_color:
+            color = f' background-color: {escape(asset.dominant_color)};'
+    return mark_safe(f'background-image: {layers};{color}')
@@ -1,3 +1,1573 @@
-from django.test import TestCase
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import warnings
+from collections.abc import Iterable
+from datetime import timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .media_cleanup import MAX_ATTEMPTS, process_deletions, queue_deletions
+from .media_pipeline import ingest_image
+from .media_storage import CloudinaryStorage, LocalStorage, StorageBackend
+from .preload_hints import EARLY_HINT_EXTENSION, EarlyHintsMiddleware
+from . import media_reoptimize, profiling, slow_queries, warmup
+from .image_audit import audit, check_url, collect_image_urls
+from .management.commands import bench_routes
+from .management.commands.bench_async_views import use_async_views
+from .middleware import MetricsMiddleware, RequestProfilingMiddleware, server_timing_header
+from .models import (
+    ContentCounter, Hero, Insight, MediaAsset, MediaDeletion, Metadata, ProcessStep, Project, Service, UploadSession,
+)
+from .utils.benchmark import FakeCloudinaryUploader, offline_services
+from .utils.cloudinary_utils import PLACEHOLDER_WIDTH, compute_dominant_color, compute_placeholder
+from .utils.image_encoding import available_formats, can_encode, choose_encoding, select_profile
+from .utils.import_timing import LAZY_MODULES, best_of
+
+
+class StartupImportTests(SimpleTestCase):
+    """Guards process startup time (see `manage.py bench_imports`)"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startup = best_of(runs=3)
+
+    def test_heavy_modules_are_imported_lazily(self):
+        eager = [name for name in LAZY_MODULES if name in self.startup['loaded']]
+        self.assertEqual(eager, [], f"Imported at startup: {eager}")
+
+    def test_import_time_within_budget(self):
+        self.assertLessEqual(
+            self.startup['total_ms'], settings.IMPORT_TIME_BUDGET_MS,
+            f"Startup import time {self.startup['total_ms']:.1f} ms exceeds IMPORT_TIME_BUDGET_MS"
+        )
+
+
+class MediaDeletionTests(TestCase):
+    """Queued Cloudinary cleanup of deleted assets, against the offline fake (utils/benchmark.py)"""
+
+    def setUp(self):
+        services = offline_services()
+        self.cloudinary = services.__enter__()['cloudinary']
+        self.addCleanup(services.__exit__, None, None, None)
+
+    def make_assets(self, count):
+        return [
+            MediaAsset.objects.create(title=f'Asset {i}', public_id=f'uploads/asset-{i}')
+            for i in range(count)
+        ]
+
+    def make_due(self):
+        MediaDeletion.objects.update(next_attempt_at=timezone.now())
+
+    def test_deleting_an_asset_queues_its_public_id(self):
+        asset, = self.make_assets(1)
+        MediaAsset.objects.create(title='External', public_id='')
+        asset.delete()
+        MediaAsset.objects.filter(public_id='').delete()
+        self.assertEqual(list(MediaDeletion.objects.values_list('public_id', flat=True)), ['uploads/asset-0'])
+
+    def test_queue_is_destroyed_in_batches(self):
+        queue_deletions([f'uploads/asset-{i}' for i in range(250)])
+        summary = process_deletions()
+        self.assertEqual([len(call) for call in self.cloudinary.api.delete_calls], [100, 100, 50])
+        self.assertEqual(summary['deleted'], 250)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_failed_batch_is_retried_with_backoff(self):
+        queue_deletions(['uploads/a', 'uploads/b'])
+        self.cloudinary.api.failures = 1
+        self.assertEqual(process_deletions()['retried'], 2)
+        entry = MediaDeletion.objects.get(public_id='uploads/a')
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn('Rate Limit', entry.last_error)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+        # Not due yet: no API call
+        process_deletions()
+        self.assertEqual(len(self.cloudinary.api.delete_calls), 1)
+
+        self.make_due()
+        self.assertEqual(process_deletions()['deleted'], 2)
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    def test_already_missing_asset_counts_as_deleted(self):
+        self.cloudinary.api.destroyed.add('uploads/gone')
+        queue_deletions(['uploads/gone'])
+        self.assertEqual(process_deletions()['deleted'], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        queue_deletions(['uploads/stuck'])
+        self.cloudinary.api.failures = MAX_ATTEMPTS
+        for _ in range(MAX_ATTEMPTS):
+            self.make_due()
+            process_deletions()
+        entry = MediaDeletion.objects.get()
+        self.assertEqual((entry.status, entry.attempts), ('failed', MAX_ATTEMPTS))
+        self.make_due()
+        process_deletions()
+        self.assertEqual(len(self.cloudinary.api.delete_calls), MAX_ATTEMPTS)
+
+    def test_public_id_used_again_is_not_destroyed(self):
+        asset, = self.make_assets(1)
+        asset.delete()
+        MediaAsset.objects.create(title='Re-uploaded', public_id='uploads/asset-0')
+        self.assertEqual(process_deletions()['skipped'], 1)
+        self.assertEqual(self.cloudinary.api.delete_calls, [])
+        self.assertFalse(MediaDeletion.objects.exists())
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def test_gallery_multi_select_delete(self):
+        author = User.objects.create_user('author', password='pw')
+        author.profile.role = 'blog_author'
+        author.profile.save()
+        assets = self.make_assets(3)
+        self.client.force_login(author)
+
+        response = self.client.post(
+            reverse('gallery_api_bulk_delete'),
+            json.dumps({'ids': [asset.pk for asset in assets[:2]]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json(), {'success': True, 'deleted': 2})
+        self.assertEqual(list(MediaAsset.objects.values_list('pk', flat=True)), [assets[2].pk])
+
+        process_deletions()
+        self.assertEqual([sorted(call) for call in self.cloudinary.api.delete_calls], [['uploads/asset-0', 'uploads/asset-1']])
+
+
+def encoded_image(width=1000, height=600, format='WEBP'):
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), (40, 90, 160)).save(buf, format=format)
+    return buf.getvalue()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        # Clients may stop reading part way (size limits)
+        with contextlib.suppress(ConnectionError):
+            super().copyfile(source, outputfile)
+
+
+def serve_directory(test, directory):
+    """Serve `directory` over HTTP on localhost for the duration of `test`; returns the base URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test.addCleanup(server.server_close)
+    test.addCleanup(server.shutdown)
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def photo(width=640, height=400):
+    """Noisy gradient: compresses like a photograph rather than a flat graphic"""
+    from PIL import Image
+
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 30)
+    return Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+class ContentCounterTests(TestCase):
+    """Signal-maintained dashboard counters (signals.py) agree with a full recount"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+
+    def assertMatchesRecount(self):
+        live = {(c.model, c.status, c.author_id, c.month): c.count for c in ContentCounter.objects.exclude(count=0)}
+        ContentCounter.rebuild()
+        recount = {(c.model, c.status, c.author_id, c.month): c.count for c in ContentCounter.objects.exclude(count=0)}
+        self.assertEqual(live, recount)
+
+    def test_create_status_change_and_delete(self):
+        insight = Insight.objects.create(title='Shade', author=self.author)
+        Insight.objects.create(title='Water', author=self.author, status='published')
+        Service.objects.create(title='Pools')
+        self.assertEqual(ContentCounter.insight_stats(author_id=self.author.pk),
+                         {'total': 2, 'published': 1, 'draft': 1, 'this_month': 2})
+        self.assertEqual(ContentCounter.totals()['service'], 1)
+
+        insight = Insight.objects.get(pk=insight.pk)
+        insight.status = 'published'
+        with CaptureQueriesContext(connection) as queries:
+            insight.save()
+        # The previous bucket was tracked when the row was loaded: no SELECT of the insight
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and 'myApp_insight' in q['sql']])
+        self.assertEqual(ContentCounter.insight_stats()['published'], 2)
+
+        # Saved again from the same object, and through a deferred load
+        insight.status = 'draft'
+        insight.save()
+        deferred = Insight.objects.only('title').get(pk=insight.pk)
+        deferred.status = 'published'
+        deferred.save()
+        Insight.objects.filter(title='Water').get().delete()
+        self.assertEqual(ContentCounter.insight_stats(), {'total': 1, 'published': 1, 'draft': 0, 'this_month': 1})
+        self.assertMatchesRecount()
+
+    def test_deleting_an_author_moves_their_insights_to_no_author(self):
+        other = User.objects.create_user('other', password='pw')
+        Insight.objects.create(title='Shade', author=self.author)
+        Insight.objects.create(title='Water', author=self.author, status='published')
+        Insight.objects.create(title='Stone', author=other)
+
+        author_id = self.author.pk
+        self.author.delete()
+        self.assertEqual(ContentCounter.insight_stats(author_id=author_id)['total'], 0)
+        self.assertEqual(ContentCounter.insight_stats(author_id=0)['total'], 2)
+        self.assertEqual(ContentCounter.insight_stats()['total'], 3)
+        self.assertEqual(ContentCounter.insight_stats(author_id=other.pk)['total'], 1)
+        self.assertMatchesRecount()
+
+
+@patch.dict('myApp.management.commands.generate_load_data.PER_SCALE',
+            {'services': 3, 'assets': 12, 'projects': 4, 'insights': 30})
+class GenerateLoadDataTests(TestCase):
+    """Deterministic synthetic datasets (generate_load_data) and removal of only generated rows"""
+
+    def generate(self, *args):
+        call_command('generate_load_data', '--seed', '7', *args, stdout=io.StringIO())
+
+    def snapshot(self):
+        return {
+            'insights': list(Insight.objects.filter(slug__startswith='load-').order_by('slug').values_list(
+                'slug', 'title', 'content', 'status', 'published_at', 'author__username', 'featured_image_url',
+            )),
+            'galleries': [
+                (project.slug, project.gallery_images, [image.asset.public_id for image in project.images.all()])
+                for project in Project.objects.filter(slug__startswith='load-').order_by('slug')
+            ],
+            'services': list(Service.objects.filter(slug__startswith='load-').order_by('slug').values_list(
+                'slug', 'title', 'related_services', 'faq_data',
+            )),
+        }
+
+    def test_scale_sets_the_volumes_and_counters_follow(self):
+        self.generate('--scale', '2')
+        self.assertEqual(Service.objects.count(), 6)
+        self.assertEqual(Project.objects.count(), 8)
+        self.assertEqual(Insight.objects.count(), 60)
+        self.assertEqual(MediaAsset.objects.filter(public_id__startswith='load/').count(), 24)
+        for project in Project.objects.prefetch_related('images__asset'):
+            gallery = [image.asset.secure_url for image in project.images.all()]
+            self.assertEqual(project.gallery_images.split(','), gallery)
+        published = Insight.objects.filter(status='published').count()
+        self.assertEqual(ContentCounter.insight_stats()['total'], 60)
+        self.assertEqual(ContentCounter.insight_stats()['published'], published)
+
+    def test_same_seed_same_data_and_clear_keeps_other_rows(self):
+        Service.objects.create(title='Pools', slug='pools')
+        self.generate()
+        first = self.snapshot()
+
+        # Without --clear nothing is added on top of the existing dataset
+        self.generate()
+        self.assertEqual(Insight.objects.count(), 30)
+
+        self.generate('--clear')
+        self.assertEqual(self.snapshot(), first)
+        self.assertTrue(Service.objects.filter(slug='pools').exists())
+        self.assertFalse(MediaDeletion.objects.exists())
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ServiceDetailQueryTests(TestCase):
+    """service_detail resolves related services in one batched query (Service.prefetch_related_services)"""
+
+    def setUp(self):
+        for slug in ('pools', 'pergolas', 'lighting', 'irrigation'):
+            Service.objects.create(title=slug.title(), slug=slug, featured=True)
+        self.service = Service.objects.create(
+            title='Villas', slug='villas', related_services='pools,pergolas,lighting,irrigation,missing',
+        )
+        self.url = reverse('service_detail', args=['villas'])
+
+    def assertRelatedRendered(self, response):
+        related = response.context['service'].get_related_services_list()
+        self.assertEqual([service.slug for service in related], ['irrigation', 'lighting', 'pergolas'])
+        for service in related:
+            self.assertContains(response, service.get_absolute_url())
+
+    def test_related_services_cost_one_query(self):
+        # service, related services, media lookup, showcase services
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertRelatedRendered(response)
+
+    def test_async_view_runs_the_same_queries(self):
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        with self.assertNumQueries(4):
+            response = async_to_sync(self.async_client.get)(self.url)
+        self.assertRelatedRendered(response)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class AsyncPublicViewTests(TestCase):
+    """Async ORM public views (async_views.py) render what the sync views render"""
+
+    CONTEXT_KEYS = [
+        'hero', 'services', 'projects', 'categories', 'process_steps', 'service', 'showcase_services',
+        'project', 'related_projects', 'insights', 'insight', 'related_insights',
+    ]
+
+    def setUp(self):
+        Hero.objects.create(page='home', title='Gardens')
+        Hero.objects.create(page='services', title='What we do')
+        ProcessStep.objects.create(icon='fa-comments', title='Consult', description='We listen')
+        for order, title in enumerate(['Pools', 'Lawns', 'Lighting']):
+            Service.objects.create(title=title, slug=title.lower(), order=order, featured=title != 'Lighting')
+        Project.objects.create(title='Villa', slug='villa', location='Dubai', category='Pool', featured=True,
+                               gallery_images='https://example.com/villa.jpg')
+        Project.objects.create(title='Terrace', slug='terrace', location='Abu Dhabi', category='Roof')
+        for day in range(3):
+            Insight.objects.create(title=f'Shade {day}', slug=f'shade-{day}', status='published',
+                                   published_at=timezone.now() - timedelta(days=day))
+        Insight.objects.create(title='Draft', slug='draft', status='draft')
+        self.urls = warmup.public_page_urls()
+
+    def page(self, response):
+        context = {
+            key: list(response.context[key]) if isinstance(response.context[key], Iterable) else response.context[key]
+            for key in self.CONTEXT_KEYS if key in response.context
+        }
+        return response.status_code, [t.name for t in response.templates], context
+
+    def test_pages_match_the_sync_views(self):
+        sync_pages = {url: self.page(self.client.get(url)) for url in self.urls}
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+                page = self.page(async_to_sync(self.async_client.get)(url))
+                self.assertEqual(page[0], 200)
+                self.assertEqual(page, sync_pages[url])
+
+    def test_missing_and_unpublished_pages_are_404(self):
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        for url in [reverse('service_detail', args=['gone']), reverse('project_detail', args=['gone']),
+                    reverse('blog_detail', args=['draft'])]:
+            with self.subTest(url=url):
+                self.assertEqual(async_to_sync(self.async_client.get)(url).status_code, 404)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class InsightListTests(TestCase):
+    """Keyset-paginated dashboard insights list with server-side search and counter stats"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.author = User.objects.create_user('author', password='pw')
+        self.author.profile.role = 'blog_author'
+        self.author.profile.save()
+        self.url = reverse('dashboard_insights_list')
+        for i in range(30):
+            Insight.objects.create(
+                title=f'Pergola {i}' if i % 10 else f'Fountain {i}', excerpt='Shade and stone',
+                author=self.author if i % 3 else self.admin, status='published' if i % 2 else 'draft',
+            )
+
+    def titles(self, response):
+        return [insight.title for insight in response.context['insights']]
+
+    def test_cursors_page_forward_and_back(self):
+        self.client.force_login(self.admin)
+        newest = list(Insight.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+        first = self.client.get(self.url)
+        self.assertEqual(self.titles(first), newest[:25])
+        self.assertFalse(first.context['page'].has_previous)
+
+        older = self.client.get(self.url, {'after': first.context['page'].next_cursor})
+        self.assertEqual(self.titles(older), newest[25:])
+        self.assertFalse(older.context['page'].has_next)
+
+        back = self.client.get(self.url, {'before': older.context['page'].previous_cursor})
+        self.assertEqual(self.titles(back), newest[:25])
+
+    def test_search_covers_every_page_and_follows_the_cursor(self):
+        self.client.force_login(self.admin)
+        first = self.client.get(self.url, {'q': 'pergola'})
+        self.assertEqual(len(first.context['insights']), 25)
+        cursor = first.context['page'].next_cursor
+        self.assertContains(first, f'q=pergola&after={cursor}')
+
+        rest = self.client.get(self.url, {'q': 'pergola', 'after': cursor})
+        self.assertEqual(len(rest.context['insights']), 2)
+        self.assertTrue(all(title.startswith('Pergola') for title in self.titles(first) + self.titles(rest)))
+        # Matches on other pages are found too, not only among the rows shown
+        self.assertEqual(sorted(self.titles(self.client.get(self.url, {'q': 'fountain'}))),
+                         ['Fountain 0', 'Fountain 10', 'Fountain 20'])
+
+    def test_stats_come_from_the_counters(self):
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        own = Insight.objects.filter(author=self.author)
+        self.assertEqual(
+            (response.context['total_count'], response.context['published_count'], response.context['draft_count']),
+            (own.count(), own.filter(status='published').count(), own.filter(status='draft').count()),
+        )
+        self.assertEqual(len(response.context['insights']), 20)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'status': 'draft'})
+        self.assertEqual(response.context['total_count'], 15)
+        self.assertEqual(response.context['this_month_count'], 15)
+
+    def test_query_count_does_not_grow_with_authors(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as few_authors:
+            self.client.get(self.url)
+        for i in range(25):
+            Insight.objects.create(title=f'Guest {i}', author=User.objects.create_user(f'guest{i}'))
+        with CaptureQueriesContext(connection) as many_authors:
+            response = self.client.get(self.url)
+        self.assertEqual(len({insight.author_id for insight in response.context['insights']}), 25)
+        self.assertEqual(len(many_authors), len(few_authors))
+        listing, = [q['sql'] for q in many_authors if 'FROM "myApp_insight"' in q['sql']]
+        self.assertIn('JOIN "auth_user"', listing)
+        self.assertNotIn('"myApp_insight"."content"', listing)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class DashboardListTests(TestCase):
+    """Keyset-paginated dashboard lists (dashboard_lists.py): cursors, ties, filters"""
+
+    def setUp(self):
+        from . import views
+
+        per_page = patch.object(views.SERVICES_LIST, 'per_page', 4)
+        per_page.start()
+        self.addCleanup(per_page.stop)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        # Pairs of duplicate titles, all sharing one order value and one created_at
+        self.services = [
+            Service.objects.create(title=f'Service {i // 2}', slug=f'service-{i}', order=0, featured=i % 3 == 0)
+            for i in range(11)
+        ]
+        Service.objects.update(created_at=timezone.now())
+
+    def walk(self, url):
+        """Follow next links from `url`; returns the pages as lists of ids and the last response"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            pages.append([service.pk for service in response.context['page']])
+            url = response.context['listing'].next_url
+        return pages, response
+
+    def expected(self, queryset, *ordering):
+        return list(queryset.order_by(*ordering).values_list('pk', flat=True))
+
+    def test_cursors_continue_across_pages_when_sort_values_tie(self):
+        url = reverse('dashboard_services_list')
+        for params, ordering in [
+            ('', ['order', 'title', 'id']),
+            ('?sort=created', ['created_at', 'id']),
+            ('?sort=created&dir=desc', ['-created_at', '-id']),
+            ('?sort=title&dir=desc', ['-title', '-id']),
+        ]:
+            pages, last = self.walk(url + params)
+            self.assertEqual([len(page) for page in pages], [4, 4, 3], params)
+            self.assertEqual(sum(pages, []), self.expected(Service.objects, *ordering), params)
+
+            # Walking back from the last page returns the same pages
+            back = []
+            previous = last.context['listing'].previous_url
+            while previous:
+                response = self.client.get(previous)
+                back.insert(0, [service.pk for service in response.context['page']])
+                previous = response.context['listing'].previous_url
+            self.assertEqual(back, pages[:-1], params)
+
+    def test_filters_and_search_are_kept_across_pages(self):
+        Service.objects.filter(pk__in=[s.pk for s in self.services[:6]]).update(short_description='garden pools')
+        pages, _ = self.walk(reverse('dashboard_services_list') + '?featured=no&q=GARDEN&sort=created&dir=desc')
+        expected = self.expected(
+            Service.objects.filter(featured=False, short_description__icontains='garden'), '-created_at', '-id',
+        )
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(pages, [expected])
+
+        pages, response = self.walk(reverse('dashboard_services_list') + '?featured=yes')
+        self.assertEqual(sum(pages, []), self.expected(Service.objects.filter(featured=True), 'order', 'title', 'id'))
+        self.assertEqual(response.context['listing'].filters[0]['value'], 'yes')
+
+    def test_unknown_sorts_and_malformed_cursors_fall_back(self):
+        first_page, _ = self.walk(reverse('dashboard_services_list'))
+        response = self.client.get(reverse('dashboard_services_list') + '?sort=secret&after=not-a-cursor')
+        self.assertEqual([service.pk for service in response.context['page']], first_page[0])
+        self.assertEqual(response.context['listing'].sort, 'order')
+
+        fragment = self.client.get(reverse('dashboard_services_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertNotIn(b'<html', fragment.content)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class BulkActionTests(TestCase):
+    """Dashboard bulk endpoint: reorder / feature / delete in one request (bulk_actions.py)"""
+
+    def setUp(self):
+        self.services = [Service.objects.create(title=f'Service {i}', order=i) for i in range(3)]
+        self.url = reverse('dashboard_services_bulk')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def orders(self):
+        return list(Service.objects.order_by('pk').values_list('order', 'featured'))
+
+    def test_update_writes_only_changed_rows(self):
+        first, second, third = self.services
+        response = self.post({'action': 'update', 'rows': [
+            {'id': first.pk, 'order': 2}, {'id': second.pk, 'order': 1, 'featured': True},
+            {'id': third.pk, 'order': '0'}, {'id': 999, 'order': 5},
+        ]})
+        self.assertEqual(response.json(), {'success': True, 'updated': 3, 'missing': [999]})
+        self.assertEqual(self.orders(), [(2, False), (1, True), (0, False)])
+
+        response = self.post({'action': 'update', 'rows': [{'id': first.pk, 'order': 2}]})
+        self.assertEqual(response.json()['updated'], 0)
+
+    def test_invalid_values_are_rejected_with_400(self):
+        pk = self.services[0].pk
+        before = self.orders()
+        for rows, error in [
+            ([{'id': pk, 'order': None}], 'Invalid order for row'),
+            ([{'id': pk, 'order': 'first'}], 'Invalid order for row'),
+            ([{'id': pk, 'featured': None}], 'Invalid featured for row'),
+            ([{'id': pk, 'title': 'Renamed'}], "Can't bulk-edit title"),
+            ([{'id': 'x', 'order': 1}], 'Ids must be integers'),
+            ([{'id': pk}], 'Nothing to update'),
+        ]:
+            response = self.post({'action': 'update', 'rows': rows})
+            self.assertEqual(response.status_code, 400, rows)
+            self.assertIn(error, response.json()['error'])
+        self.assertEqual(self.client.post(self.url, 'not json', content_type='application/json').status_code, 400)
+        self.assertEqual(self.post({'action': 'archive'}).status_code, 400)
+        self.assertEqual(self.orders(), before)
+
+    def test_delete_removes_rows_and_updates_counters(self):
+        ContentCounter.rebuild()
+        response = self.post({'action': 'delete', 'ids': [service.pk for service in self.services[:2]]})
+        self.assertEqual(response.json(), {'success': True, 'deleted': 2})
+        self.assertEqual(list(Service.objects.values_list('pk', flat=True)), [self.services[2].pk])
+        self.assertEqual(ContentCounter.totals()['service'], 1)
+
+    def test_only_admins_may_bulk_edit(self):
+        author = User.objects.create_user('author', password='pw')
+        author.profile.role = 'blog_author'
+        author.profile.save()
+        self.client.force_login(author)
+        self.assertEqual(self.post({'action': 'delete', 'ids': [self.services[0].pk]}).status_code, 403)
+
+        self.client.logout()
+        self.assertEqual(self.post({'action': 'delete', 'ids': [self.services[0].pk]}).status_code, 302)
+        self.assertEqual(Service.objects.count(), 3)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class BenchRoutesTests(TransactionTestCase):
+    """Route benchmark (bench_routes): every route is covered and its benchmarked requests succeed"""
+
+    def setUp(self):
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        overrides = override_settings(CHUNKED_UPLOAD_DIR=upload_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        services = offline_services()
+        services.__enter__()
+        self.addCleanup(services.__exit__, None, None, None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('seed_all')
+        self.fixtures = bench_routes.Fixtures()
+
+    def test_every_route_is_benchmarked(self):
+        benchmarked = {spec['name'] for spec in self.fixtures.routes()}
+        missing = bench_routes.url_names() - benchmarked - bench_routes.SKIPPED_ROUTES
+        self.assertEqual({name for name in missing if not name.startswith('admin:')}, set())
+
+    def test_every_route_responds_without_errors(self):
+        command = bench_routes.Command()
+        # Views print diagnostics (contact form)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            for spec in self.fixtures.routes():
+                with self.subTest(route=spec['key']):
+                    stats = command.run_route(spec, self.fixtures, 2, 1)
+                    self.assertEqual((stats['count'], stats['errors']), (2, 0), stats['status'])
+
+    def test_compare_reports_deltas_against_a_baseline(self):
+        baseline = Path(tempfile.mkdtemp()) / 'baseline.json'
+        self.addCleanup(shutil.rmtree, baseline.parent)
+        baseline.write_text(json.dumps({'routes': {'GET home': {'p95_ms': 10.0, 'rps': 100.0, 'queries': 5.0}}}))
+
+        out = io.StringIO()
+        results = {'GET home': {'p95_ms': 12.0, 'rps': 80.0, 'queries': 4.0}, 'GET projects': {}}
+        bench_routes.Command(stdout=out).print_comparison(results, str(baseline))
+        self.assertRegex(out.getvalue(), r'GET home +\+20\.0 +-20\.0 +-1\.0')
+        self.assertNotIn('GET projects', out.getvalue())
+
+        with self.assertRaisesMessage(CommandError, 'Could not read baseline'):
+            bench_routes.Command().print_comparison(results, str(baseline.parent / 'missing.json'))
+
+
+class PlaceholderTests(SimpleTestCase):
+    """Blurred placeholders and dominant colours (cloudinary_utils.py) and the media_tags that paint them"""
+
+    def test_placeholder_is_a_small_webp_data_uri(self):
+        uri = compute_placeholder(photo())
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(uri.startswith(prefix))
+        data = base64.b64decode(uri.removeprefix(prefix))
+        self.assertLess(len(data), 1000)
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as im:
+            self.assertEqual((im.format, im.width), ('WEBP', PLACEHOLDER_WIDTH))
+
+    def test_dominant_color_of_a_solid_image(self):
+        from PIL import Image
+
+        self.assertEqual(compute_dominant_color(Image.new('RGB', (300, 200), (184, 146, 42))), '#b8922a')
+
+    def render(self, template, url, asset):
+        return Template('{% load media_tags %}' + template).render(Context({'url': url, 'media_assets': {url: asset}}))
+
+    def test_background_tags(self):
+        url = 'https://res.cloudinary.com/demo/hero.webp'
+        asset = MediaAsset(placeholder_data_uri='data:image/webp;base64,AAAA', dominant_color='#b8922a')
+
+        lazy = self.render('<div {% lazy_bg url "height:10px;" %}>', url, asset)
+        self.assertIn(f'data-bg="{url}"', lazy)
+        self.assertIn("style=\"height:10px;background-color:#b8922a;background-image:url('data:image/webp;base64,AAAA')",
+                      lazy)
+        self.assertNotIn(f"url('{url}')", lazy)
+
+        eager = self.render('{% bg_with_placeholder url %}', url, asset)
+        self.assertEqual(eager, f"background-image: url('{url}'), url('data:image/webp;base64,AAAA'); "
+                                "background-color: #b8922a;")
+
+        # Without a known asset the image is simply the background
+        plain = self.render('<div {% lazy_bg url %}>', url, None)
+        self.assertNotIn('data-bg', plain)
+        self.assertIn(f"background-image:url('{url}')", plain)
+
+
+class ImageEncodingTests(TestCase):
+    """Format negotiation in the compression pipeline (utils/image_encoding.py)"""
+
+    def test_smallest_candidate_above_quality_floor_wins(self):
+        encoding = choose_encoding(photo(), max_bytes=10 ** 7, formats=['avif', 'webp'], floor_db=20)
+        candidates = encoding['candidates']
+        self.assertEqual(set(candidates), {'avif', 'webp'})
+        chosen = min(candidates, key=lambda fmt: candidates[fmt]['bytes'])
+        self.assertEqual(encoding['format'], chosen)
+        self.assertEqual(len(encoding['data']), candidates[chosen]['bytes'])
+        self.assertEqual(encoding['savings_bytes'], candidates['webp']['bytes'] - candidates[chosen]['bytes'])
+
+    def test_most_faithful_candidate_wins_below_floor(self):
+        encoding = choose_encoding(photo(), max_bytes=10 ** 7, formats=['avif', 'webp'], floor_db=200)
+        candidates = encoding['candidates']
+        self.assertEqual(encoding['format'], max(candidates, key=lambda fmt: candidates[fmt]['psnr']))
+
+    @override_settings(MEDIA_ENCODE_FORMATS=['webp'])
+    def test_asset_records_format_and_savings(self):
+        with offline_services():
+            source = io.BytesIO(encoded_image(800, 500, format='PNG'))
+            asset = ingest_image(source, 'flat.png')
+        self.assertEqual((asset.format, asset.savings_bytes), ('webp', 0))
+        self.assertEqual(asset.source_bytes, len(source.getvalue()))
+
+    def test_auto_profile_fits_latency_budget(self):
+        formats = ['avif', 'webp']
+        self.assertEqual(select_profile(2_000_000, formats, name='auto', budget_ms=10_000).name, 'max')
+        # 'max' only pays off on large images; tight budgets fall back to the fastest profile
+        self.assertEqual(select_profile(500_000, formats, name='auto', budget_ms=10_000).name, 'balanced')
+        self.assertEqual(select_profile(2_000_000, formats, name='auto', budget_ms=1).name, 'fast')
+        self.assertEqual(select_profile(500_000, formats, name='fast').name, 'fast')
+        with self.assertRaises(ValueError):
+            select_profile(500_000, formats, name='slowest')
+
+    def test_choose_encoding_reports_profile(self):
+        encoding = choose_encoding(photo(), max_bytes=10 ** 7, formats=['webp'], profile='fast')
+        self.assertEqual(encoding['profile'], 'fast')
+
+    def test_format_support_is_checked_without_warnings(self):
+        from PIL import Image, features
+
+        can_encode.cache_clear()
+        self.addCleanup(can_encode.cache_clear)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertTrue(can_encode('webp'))
+            # Pillow < 11.3 knows no 'avif' feature: only a plugin-registered writer counts
+            with patch.dict(features.modules), patch.dict(Image.SAVE):
+                features.modules.pop('avif', None)
+                Image.SAVE.pop('AVIF', None)
+                self.assertFalse(can_encode('avif'))
+                self.assertEqual(available_formats(['avif', 'webp']), ['webp'])
+
+
+class ResponsiveVariantTests(TestCase):
+    """Variant ladder extraction and the srcset / <picture> markup built from it"""
+
+    def test_eager_variants_are_extracted_once_per_rendition(self):
+        from .utils.cloudinary_utils import extract_eager_variants
+
+        base = 'https://res.cloudinary.com/demo/image/upload'
+        result = {'eager': [
+            {'format': 'webp', 'width': 480, 'height': 320, 'bytes': 9000, 'secure_url': f'{base}/w_480/a.webp',
+             'transformation': 'c_limit,w_480/f_webp,q_auto'},
+            {'format': 'webp', 'width': 1200, 'height': 800, 'bytes': 40000, 'secure_url': f'{base}/w_1600/a.webp'},
+            # 2400 collapses to the same 1200px rendition as 1600
+            {'format': 'webp', 'width': 1200, 'height': 800, 'bytes': 40000, 'secure_url': f'{base}/w_2400/a.webp'},
+            {'format': 'avif', 'width': 480, 'height': 320, 'bytes': 6000, 'url': f'{base}/w_480/a.avif'},
+            {'format': 'avif', 'width': 960, 'height': 640},
+        ]}
+        variants = extract_eager_variants(result)
+        self.assertEqual([(v['format'], v['width']) for v in variants], [('webp', 480), ('webp', 1200), ('avif', 480)])
+        self.assertEqual(variants[0], {
+            'width': 480, 'height': 320, 'format': 'webp', 'bytes_size': 9000,
+            'secure_url': f'{base}/w_480/a.webp', 'transformation': 'c_limit,w_480/f_webp,q_auto',
+        })
+        self.assertEqual(variants[2]['secure_url'], f'{base}/w_480/a.avif')
+        self.assertEqual(extract_eager_variants({'eager': None}), [])
+
+    def test_each_format_gets_its_own_srcset(self):
+        from .models import MediaAssetVariant
+
+        asset = MediaAsset.objects.create(title='pool', web_url='/media/pool/web.webp')
+        MediaAssetVariant.objects.bulk_create([
+            MediaAssetVariant(asset=asset, format=fmt, width=width, height=width // 2,
+                              secure_url=f'/media/pool/w{width}.{fmt}')
+            for fmt in ('avif', 'webp') for width in (480, 960)
+        ])
+        asset = MediaAsset.objects.prefetch_related('variants').get()
+
+        self.assertEqual(asset.fallback_format(), 'webp')
+        self.assertEqual(asset.srcset(), '/media/pool/w480.webp 480w, /media/pool/w960.webp 960w')
+        self.assertNotIn('avif', asset.responsive_attrs())
+        self.assertEqual(
+            asset.picture_sources('100vw'),
+            '<source type="image/avif" srcset="/media/pool/w480.avif 480w, /media/pool/w960.avif 960w" sizes="100vw">',
+        )
+        img = f'<img src="{asset.web_url}"{asset.responsive_attrs()}>'
+        picture = asset.picture(img)
+        self.assertTrue(picture.startswith('<picture style="display:contents"><source type="image/avif"'))
+        self.assertTrue(picture.endswith(f'{img}</picture>'))
+
+        # A WebP-only ladder needs no <picture>
+        asset.variants.filter(format='avif').delete()
+        asset = MediaAsset.objects.prefetch_related('variants').get()
+        self.assertEqual(asset.picture_sources(), '')
+        self.assertEqual(asset.picture(img), img)
+
+
+class StorageContractTests:
+    """Behaviour every storage backend (media_storage.py) must share; mixed into one TestCase per backend"""
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+        self.stored = self.storage.upload(encoded_image(), 'tests', 'photo', tags=['test'])
+
+    def test_upload_describes_image_and_variant_ladder(self):
+        stored = self.stored
+        self.assertEqual(stored['public_id'], 'tests/photo')
+        self.assertEqual((stored['width'], stored['height'], stored['format']), (1000, 600, 'webp'))
+        self.assertGreater(stored['bytes'], 0)
+        for key in ('secure_url', 'web_url', 'thumb_url'):
+            self.assertIn('tests/photo', stored[key])
+        # Steps wider than the original collapse into one rendition; nothing is upscaled
+        self.assertEqual(
+            [(v['width'], v['height'], v['format']) for v in stored['variants']],
+            [(480, 288, 'webp'), (960, 576, 'webp'), (1000, 600, 'webp')],
+        )
+
+    def test_url_picks_rendition_for_width(self):
+        small = self.storage.url('tests/photo', 480)
+        large = self.storage.url('tests/photo', 960)
+        self.assertNotEqual(small, large)
+        self.assertIn('tests/photo', small)
+        self.assertIn('tests/photo', self.storage.url('tests/photo'))
+
+    def test_delete_reports_each_public_id(self):
+        result = self.storage.delete(['tests/photo'])
+        self.assertEqual(result, {'deleted': {'tests/photo': 'deleted'}, 'partial': False})
+        again = self.storage.delete(['tests/photo'])
+        self.assertEqual(again['deleted'], {'tests/photo': 'not_found'})
+
+    def test_backends_must_implement_the_whole_interface(self):
+        self.assertIsInstance(self.storage, StorageBackend)
+
+        class UploadOnly(StorageBackend):
+            upload = type(self.storage).upload
+
+        with self.assertRaises(TypeError):
+            UploadOnly()
+
+
+class CloudinaryStorageTests(StorageContractTests, SimpleTestCase):
+
+    def make_storage(self):
+        services = offline_services()
+        self.cloudinary = services.__enter__()['cloudinary']
+        self.addCleanup(services.__exit__, None, None, None)
+        self.cloudinary.uploader = FakeCloudinaryUploader(width=1000, height=600)
+        return CloudinaryStorage()
+
+
+class LocalStorageTests(StorageContractTests, TestCase):
+
+    def make_storage(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(MEDIA_STORAGE_BACKEND='local', LOCAL_MEDIA_ROOT=self.root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        return LocalStorage()
+
+    def test_files_are_served_with_sendfile_or_offloaded(self):
+        path = 'tests/photo/w480.webp'
+        with override_settings(ALLOWED_HOSTS=['testserver'], MEDIA_SENDFILE=''):
+            response = self.client.get(reverse('local_media', args=[path]))
+            self.assertEqual(response['Content-Type'], 'image/webp')
+            self.assertTrue(response.streaming)
+            self.assertEqual(b''.join(response.streaming_content), self.storage.path(path).read_bytes())
+            cached = self.client.get(reverse('local_media', args=[path]),
+                                     HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+            self.assertEqual(self.client.get(reverse('local_media', args=['tests/missing.webp'])).status_code, 404)
+
+        with override_settings(ALLOWED_HOSTS=['testserver'], MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.client.get(reverse('local_media', args=[path]))
+            self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{path}')
+            self.assertEqual(response.content, b'')
+
+    def test_memory_mapped_read(self):
+        with self.storage.open_mapped('tests/photo.webp') as data:
+            self.assertEqual(bytes(data[:4]), b'RIFF')
+            self.assertEqual(len(data), self.stored['bytes'])
+
+    def test_upload_pipeline_records_local_asset(self):
+        source = io.BytesIO(encoded_image(800, 500, format='PNG'))
+        asset = ingest_image(source, 'Red Square.png', folder='uploads')
+        self.assertEqual(asset.public_id, 'uploads/red-square')
+        self.assertEqual(asset.secure_url, f'/media/uploads/red-square.{asset.format}')
+        self.assertTrue(asset.web_url.endswith('.webp'))
+        self.assertEqual([v.width for v in asset.get_variants('webp')], [480, 800])
+
+        asset.delete()
+        self.assertEqual(process_deletions()['deleted'], 1)
+        self.assertFalse(self.storage.path('uploads/red-square.webp').exists())
+
+    def test_web_url_stays_webp_for_avif_originals(self):
+        from PIL import Image
+
+        stored = self.storage.upload(encoded_image(900, 600, format='AVIF'), 'uploads', 'terrace')
+        self.assertEqual(stored['secure_url'], '/media/uploads/terrace.avif')
+        self.assertEqual(stored['web_url'], '/media/uploads/terrace/web.webp')
+        with Image.open(self.storage.path('uploads/terrace/web.webp')) as im:
+            self.assertEqual((im.format, im.size), ('WEBP', (900, 600)))
+        self.assertIn('avif', {variant['format'] for variant in stored['variants']})
+
+        stored = self.storage.upload(encoded_image(900, 600, format='WEBP'), 'uploads', 'terrace')
+        self.assertEqual(stored['web_url'], stored['secure_url'])
+        self.assertFalse(self.storage.path('uploads/terrace/web.webp').exists())
+
+    def test_names_outside_one_image_never_remove_other_images(self):
+        garden = ingest_image(io.BytesIO(encoded_image(600, 400, format='PNG')), 'garden.png')
+        garden_files = sorted(self.storage.root.rglob('*'))
+
+        # Slugifies to '': gets a generated id instead of 'uploads/'
+        unnamed = ingest_image(io.BytesIO(encoded_image(600, 400, format='PNG')), '日本.png')
+        self.assertRegex(unnamed.public_id, r'^uploads/[0-9a-f]{12}$')
+        for public_id in ('', 'uploads/', 'uploads/../tests', '..'):
+            with self.assertRaises(SuspiciousFileOperation):
+                self.storage.upload(encoded_image(), 'uploads', public_id.removeprefix('uploads/'))
+            with self.assertRaises(SuspiciousFileOperation):
+                self.storage.remove(public_id)
+        with self.assertLogs('myApp.media_storage', 'WARNING'):
+            self.assertEqual(self.storage.delete(['uploads/'])['deleted'], {'uploads/': 'not_found'})
+
+        self.assertTrue(set(garden_files) <= set(self.storage.root.rglob('*')))
+        self.assertTrue(self.storage.path(f'{garden.public_id}.{garden.format}').exists())
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ProjectGalleryTests(TestCase):
+    """Relational project gallery synced from gallery_images (Project.sync_gallery_images)"""
+
+    def setUp(self):
+        self.asset = MediaAsset.objects.create(
+            title='pool', secure_url='https://res.cloudinary.com/demo/pool.jpg',
+            web_url='https://res.cloudinary.com/demo/pool.webp', width=800, height=600,
+        )
+        self.external = 'https://images.example.com/garden.jpg'
+        self.long = 'https://images.example.com/' + 'g' * 250 + '.jpg'
+        self.gallery = f'{self.asset.secure_url}, {self.external}, {self.long}'
+
+    def test_every_url_is_kept_and_only_assets_are_linked(self):
+        project = Project.objects.create(title='Villa', location='Dubai', category='Pool', gallery_images=self.gallery)
+        project.sync_gallery_images()
+
+        images = list(project.images.all())
+        self.assertEqual([image.asset for image in images], [self.asset, None, None])
+        self.assertEqual(project.get_gallery_list(), [self.asset.web_url, self.external, self.long])
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+        content = self.client.get(project.get_absolute_url()).content.decode()
+        for url in project.get_gallery_list():
+            self.assertIn(f'src="{url}"', content)
+
+    def test_admin_save_syncs_the_gallery(self):
+        project = Project.objects.create(title='Villa', location='Dubai', category='Pool')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.post(reverse('admin:myApp_project_change', args=[project.pk]), {
+            'title': 'Villa', 'slug': project.slug, 'location': 'Dubai', 'category': 'Pool',
+            'gallery_images': self.gallery, 'order': 0,
+            'images-TOTAL_FORMS': 0, 'images-INITIAL_FORMS': 0,
+            'images-MIN_NUM_FORMS': 0, 'images-MAX_NUM_FORMS': 1000,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(project.get_gallery_list(), [self.asset.web_url, self.external, self.long])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ChunkedUploadTests(TestCase):
+    """Resumable gallery uploads (chunked_upload.py), stored through the offline Cloudinary fake"""
+
+    def setUp(self):
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        overrides = override_settings(CHUNKED_UPLOAD_DIR=upload_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        services = offline_services()
+        self.cloudinary = services.__enter__()['cloudinary']
+        self.addCleanup(services.__exit__, None, None, None)
+
+        author = User.objects.create_user('author', password='pw')
+        author.profile.role = 'blog_author'
+        author.profile.save()
+        self.client.force_login(author)
+        self.data = encoded_image(900, 600, format='PNG')
+
+    def start(self):
+        response = self.client.post(
+            reverse('gallery_upload_start'),
+            json.dumps({'filename': 'Drone Panorama.png', 'size': len(self.data)}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['upload_id']
+
+    def put(self, upload_id, offset, chunk, checksum=None):
+        checksum = checksum or base64.b64encode(hashlib.sha256(chunk).digest()).decode()
+        return self.client.put(
+            reverse('gallery_upload_chunk', args=[upload_id]), chunk,
+            content_type='application/octet-stream',
+            headers={'Upload-Offset': str(offset), 'Upload-Checksum': f'sha256 {checksum}'},
+        )
+
+    def test_upload_in_chunks_and_finalize(self):
+        upload_id = self.start()
+        half = len(self.data) // 2
+        self.assertEqual(self.put(upload_id, 0, self.data[:half]).json()['offset'], half)
+        self.assertEqual(self.put(upload_id, half, self.data[half:]).json()['offset'], len(self.data))
+
+        response = self.client.post(reverse('gallery_upload_finalize', args=[upload_id]))
+        image, = response.json()['images']
+        self.assertEqual(MediaAsset.objects.get().pk, image['id'])
+        self.assertEqual(self.cloudinary.uploader.uploads[0]['public_id'], 'drone-panorama')
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(list(Path(settings.CHUNKED_UPLOAD_DIR).iterdir()), [])
+
+    def test_resume_after_rejected_chunks(self):
+        upload_id = self.start()
+        half = len(self.data) // 2
+        self.put(upload_id, 0, self.data[:half])
+
+        # Corrupted in transit: nothing is kept
+        corrupted = self.put(upload_id, half, self.data[half:], checksum=base64.b64encode(b'x' * 32).decode())
+        self.assertEqual((corrupted.status_code, corrupted.json()['offset']), (400, half))
+
+        # Retry of an already received chunk: the client learns where to continue
+        stale = self.put(upload_id, 0, self.data[:half])
+        self.assertEqual((stale.status_code, stale['Upload-Offset']), (409, str(half)))
+        status = self.client.get(reverse('gallery_upload_chunk', args=[upload_id]))
+        self.assertEqual(status.json()['offset'], half)
+
+        early = self.client.post(reverse('gallery_upload_finalize', args=[upload_id]))
+        self.assertEqual(early.status_code, 409)
+
+        self.put(upload_id, half, self.data[half:])
+        self.assertTrue(self.client.post(reverse('gallery_upload_finalize', args=[upload_id])).json()['success'])
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+    def test_finalize_claims_the_session_and_ingests_outside_the_transaction(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.data)
+        url = reverse('gallery_upload_finalize', args=[upload_id])
+        depth = len(connection.atomic_blocks)
+        seen = {}
+
+        def ingest(*args, **kwargs):
+            seen['atomic_blocks'] = len(connection.atomic_blocks)
+            seen['status'] = UploadSession.objects.get().status
+            # A concurrent finalize or cancel is turned away while this one runs
+            seen['retry'] = self.client.post(url).status_code
+            seen['cancel'] = self.client.delete(reverse('gallery_upload_chunk', args=[upload_id])).status_code
+            return ingest_image(*args, **kwargs)
+
+        with patch('myApp.chunked_upload.ingest_image', side_effect=ingest):
+            self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertEqual(seen, {'atomic_blocks': depth, 'status': 'finalizing', 'retry': 409, 'cancel': 409})
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+    def test_failed_finalize_can_be_retried(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.data)
+        url = reverse('gallery_upload_finalize', args=[upload_id])
+
+        with patch('myApp.chunked_upload.ingest_image', side_effect=RuntimeError('storage down')):
+            self.assertEqual(self.client.post(url).status_code, 500)
+        self.assertEqual(UploadSession.objects.get().status, 'failed')
+
+        self.assertTrue(self.client.post(url).json()['success'])
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+    def test_size_limits(self):
+        with override_settings(CHUNKED_UPLOAD_MAX_BYTES=1024):
+            response = self.client.post(
+                reverse('gallery_upload_start'), json.dumps({'filename': 'big.png', 'size': 2048}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 413)
+
+        upload_id = self.start()
+        response = self.put(upload_id, 0, self.data + b'extra')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().received, 0)
+
+
+class ReoptimizeMediaTests(TestCase):
+    """Batch re-encoding of the existing library (media_reoptimize.py), stored locally"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(MEDIA_STORAGE_BACKEND='local', LOCAL_MEDIA_ROOT=self.root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.checkpoint = Path(self.root) / 'checkpoint.json'
+
+        # Pasted, never optimized images served by a stand-in image host
+        site = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, site)
+        photo().save(Path(site) / 'legacy.png')
+        self.legacy_bytes = (Path(site) / 'legacy.png').stat().st_size
+        self.base_url = serve_directory(self, site)
+
+    def run_command(self, **options):
+        out = io.StringIO()
+        call_command('reoptimize_media', workers=0, checkpoint=str(self.checkpoint),
+                     stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue()
+
+    def test_pasted_urls_are_reencoded_and_references_rewritten(self):
+        url = f'{self.base_url}/legacy.png'
+        service = Service.objects.create(title='Pools', hero_image_url=url)
+        project = Project.objects.create(title='Villa', location='Dubai', category='Pool',
+                                         gallery_images=f'{url},/media/uploads/kept.webp')
+        project.sync_gallery_images()
+        insight = Insight.objects.create(title='Shade', content=json.dumps(
+            {'blocks': [{'type': 'image', 'data': {'url': url}}, {'type': 'paragraph', 'data': {'text': url}}]}
+        ))
+
+        output = self.run_command()
+
+        asset = MediaAsset.objects.get(title='legacy')
+        self.assertIn(asset.format, ('avif', 'webp'))
+        self.assertLess(asset.bytes_size, self.legacy_bytes)
+        self.assertEqual(asset.source_bytes, self.legacy_bytes)
+        self.assertTrue(asset.variants.exists())
+        service.refresh_from_db()
+        project.refresh_from_db()
+        insight.refresh_from_db()
+        self.assertEqual(service.hero_image_url, asset.web_url)
+        self.assertEqual(project.parse_gallery_urls(), [asset.web_url, '/media/uploads/kept.webp'])
+        self.assertEqual([image.asset for image in project.images.all()], [asset, None])
+        blocks = json.loads(insight.content)['blocks']
+        self.assertEqual([block['data'].get('url') for block in blocks], [asset.web_url, None])
+        self.assertEqual(blocks[1]['data']['text'], url)
+        self.assertIn(f"Saved {self.legacy_bytes - asset.bytes_size:,} bytes", output)
+
+        # Resumed runs skip what the checkpoint recorded
+        checkpoint = json.loads(self.checkpoint.read_text())
+        self.assertEqual(checkpoint['done'], {f'url:{url}': 'optimized'})
+        self.assertIn('Nothing to re-optimize', self.run_command())
+
+    def test_unreachable_images_are_retried_on_the_next_run(self):
+        missing = f'{self.base_url}/missing.jpg'
+        Service.objects.create(title='Lighting', hero_image_url=missing)
+        with self.assertLogs('myApp.media_reoptimize', 'WARNING'):
+            self.assertIn('failed 1', self.run_command())
+        self.assertEqual(Service.objects.get().hero_image_url, missing)
+        self.assertFalse(self.checkpoint.exists())
+        self.assertIn('1 images would be re-encoded', self.run_command(dry_run=True))
+
+    def test_sources_over_the_size_limit_fail_without_being_read(self):
+        url = f'{self.base_url}/legacy.png'
+        Service.objects.create(title='Pools', hero_image_url=url)
+        with override_settings(MEDIA_MAX_SOURCE_BYTES=self.legacy_bytes - 1), \
+                self.assertLogs('myApp.media_reoptimize', 'WARNING') as logs:
+            self.assertIn('failed 1', self.run_command())
+        self.assertIn('SourceTooLarge', logs.output[0])
+        self.assertFalse(MediaAsset.objects.exists())
+        self.assertEqual(Service.objects.get().hero_image_url, url)
+
+        # Without a Content-Length the body is cut off while streaming
+        import requests
+
+        def without_length(*args, get=requests.get, **kwargs):
+            response = get(*args, **kwargs)
+            del response.headers['Content-Length']
+            return response
+
+        with patch('requests.get', without_length), \
+                self.assertRaisesRegex(media_reoptimize.SourceTooLarge, 'more than 1,000 bytes'):
+            media_reoptimize.download(url, 1000)
+        self.assertEqual(len(media_reoptimize.download(url, self.legacy_bytes).getbuffer()), self.legacy_bytes)
+
+    def test_local_assets_served_as_avif_get_a_webp_web_url(self):
+        stored = LocalStorage().upload(encoded_image(900, 600, format='AVIF'), 'uploads', 'pergola')
+        asset = MediaAsset.objects.create(title='pergola', public_id=stored['public_id'], format='avif',
+                                          secure_url=stored['secure_url'], web_url=stored['secure_url'])
+        Service.objects.create(title='Shade', hero_image_url=asset.secure_url)
+
+        self.run_command()
+        asset.refresh_from_db()
+        self.assertTrue(asset.web_url.endswith('.webp'))
+        self.assertTrue(LocalStorage().path(asset.web_url.removeprefix(settings.LOCAL_MEDIA_URL)).exists())
+        self.assertEqual(Service.objects.get().hero_image_url, asset.web_url)
+
+    def test_oversized_asset_is_reencoded_under_its_public_id(self):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        photo(1200, 800).save(buf, format='WEBP', quality=100)
+        asset = ingest_image(io.BytesIO(buf.getvalue()), 'terrace.webp')
+        stored = LocalStorage().path(f'{asset.public_id}.{asset.format}')
+        stored.write_bytes(buf.getvalue())
+        MediaAsset.objects.filter(pk=asset.pk).update(format='webp', bytes_size=len(buf.getvalue()))
+
+        self.run_command(max_bytes=100_000)
+        asset.refresh_from_db()
+        self.assertEqual(asset.public_id, 'uploads/terrace')
+        self.assertLess(asset.bytes_size, len(buf.getvalue()))
+        with Image.open(LocalStorage().path(asset.web_url.removeprefix(settings.LOCAL_MEDIA_URL))) as im:
+            self.assertEqual(im.size, (1200, 800))
+
+
+class ImageAuditTests(TestCase):
+    """Concurrent header checks of content image URLs (image_audit.py) against a local image host"""
+
+    def setUp(self):
+        site = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, site)
+        photo().save(Path(site) / 'hero.png')
+        (Path(site) / 'notes.txt').write_text('not an image')
+        self.hero_bytes = (Path(site) / 'hero.png').stat().st_size
+        base = serve_directory(self, site)
+        self.hero, self.text, self.missing = f'{base}/hero.png', f'{base}/notes.txt', f'{base}/gone.jpg'
+
+        service = Service.objects.create(title='Pools', hero_image_url=self.hero)
+        Hero.objects.create(title='Home', background_image_url=self.hero)
+        Metadata.objects.create(title='Home', og_image_url=self.text)
+        Project.objects.create(title='Villa', location='Dubai', category='Pool',
+                               gallery_images=f'{self.missing},/media/uploads/local.webp')
+        insight = Insight.objects.create(title='Shade', content=json.dumps(
+            {'blocks': [{'type': 'image', 'data': {'url': self.hero}}]}
+        ))
+        self.service_id, self.insight_id = service.pk, insight.pk
+
+    def test_collects_references_from_every_content_field(self):
+        urls = collect_image_urls()
+        self.assertEqual(set(urls), {self.hero, self.text, self.missing, '/media/uploads/local.webp'})
+        self.assertEqual(sorted(urls[self.hero]), sorted([
+            f'Service {self.service_id} hero_image_url',
+            f'Hero {Hero.objects.get().pk} background_image_url',
+            f'Insight {self.insight_id} content',
+        ]))
+
+    def test_reports_sizes_and_problems(self):
+        report = asyncio.run(audit(collect_image_urls(), concurrency=2, max_bytes=self.hero_bytes - 1))
+        results = {r['url']: r for r in report['results']}
+        self.assertEqual(report['skipped'], ['/media/uploads/local.webp'])
+        self.assertEqual(results[self.hero]['status'], 200)
+        self.assertEqual(results[self.hero]['bytes'], self.hero_bytes)
+        self.assertEqual(results[self.hero]['content_type'], 'image/png')
+        self.assertGreaterEqual(results[self.hero]['latency_ms'], 0)
+        self.assertEqual(results[self.hero]['problems'], ['oversized'])
+        self.assertEqual(results[self.text]['problems'], ['not_image'])
+        self.assertEqual((results[self.missing]['status'], results[self.missing]['problems']), (404, ['broken']))
+
+    def test_invalid_and_failing_urls_are_reported_broken(self):
+        invalid = 'http://[::1/hero.png'
+        report = asyncio.run(audit([self.hero, invalid]))
+        results = {r['url']: r for r in report['results']}
+        self.assertEqual(results[invalid]['problems'], ['broken'])
+        self.assertTrue(results[invalid]['error'].startswith('InvalidURL: '))
+        self.assertEqual(results[self.hero]['status'], 200)
+
+        # Even an error check_url does not anticipate only fails its own URL
+        async def failing_for_text(client, url, max_bytes):
+            if url == self.text:
+                raise RuntimeError('unexpected')
+            return await check_url(client, url, max_bytes)
+
+        with patch('myApp.image_audit.check_url', failing_for_text):
+            report = asyncio.run(audit([self.text, self.hero]))
+        self.assertEqual([(r['url'], r['problems']) for r in report['results']],
+                         [(self.text, ['broken']), (self.hero, [])])
+        self.assertEqual(report['results'][0]['error'], 'RuntimeError: unexpected')
+
+    def test_check_fails_on_broken_links(self):
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 broken image references'):
+            call_command('audit_images', check=True, stdout=out)
+        self.assertIn(f'Project {Project.objects.get().pk} gallery_images', out.getvalue())
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class PreloadHintsTests(TestCase):
+    """Link preload headers and 103 Early Hints for public pages (preload_hints.py)"""
+
+    def setUp(self):
+        self.hero = 'https://res.cloudinary.com/demo/image/upload/hero.webp'
+        self.service = Service.objects.create(title='Pools', slug='pools', hero_image_url=self.hero)
+
+    def test_public_page_preloads_lcp_image_and_stylesheets(self):
+        response = self.client.get(reverse('service_detail', args=['pools']))
+        links = [link.strip() for link in response['Link'].split(', <')]
+        self.assertEqual(links[0], f'<{self.hero}>; rel=preload; as=image; fetchpriority=high')
+        self.assertIn('https://fonts.gstatic.com>; rel=preconnect; crossorigin', links)
+        self.assertTrue(any('fonts.googleapis.com/css2' in link and link.endswith('rel=preload; as=style')
+                            for link in links))
+
+        self.assertNotIn('Link', self.client.get(reverse('dashboard_login')))
+
+    def test_async_stack_sends_the_same_links(self):
+        path = reverse('service_detail', args=['pools'])
+        served = self.client.get(path)['Link']
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        response = async_to_sync(self.async_client.get)(path)
+        self.assertEqual(response['Link'], served)
+
+    def test_early_hints_repeat_the_links_last_served_for_the_path(self):
+        path = reverse('service_detail', args=['pools'])
+        served = self.client.get(path)['Link']
+        messages = []
+
+        async def app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+
+        async def send(message):
+            messages.append(message)
+
+        async def request(path, extensions):
+            scope = {'type': 'http', 'method': 'GET', 'path': path, 'extensions': extensions}
+            await EarlyHintsMiddleware(app)(scope, None, send)
+
+        asyncio.run(request(path, {EARLY_HINT_EXTENSION: {}}))
+        hint, start = messages
+        self.assertEqual(hint['type'], EARLY_HINT_EXTENSION)
+        self.assertEqual(b', '.join(hint['links']).decode(), served)
+        self.assertEqual(start['type'], 'http.response.start')
+
+        # Servers without the extension, and paths not served yet, get no 103
+        messages.clear()
+        asyncio.run(request(path, {}))
+        asyncio.run(request('/projects/unseen/', {EARLY_HINT_EXTENSION: {}}))
+        self.assertEqual([m['type'] for m in messages], ['http.response.start'] * 2)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], REQUEST_PROFILING=True)
+class RequestProfilingTests(TestCase):
+    """Per-route profiling in sync and async middleware stacks (RequestProfilingMiddleware)"""
+
+    def setUp(self):
+        profiling.reset()
+        self.addCleanup(profiling.reset)
+        Service.objects.create(title='Pools', slug='pools')
+
+    def route(self, name):
+        return next(summary for summary in profiling.snapshot() if summary['route'] == name)
+
+    def test_sync_requests_are_recorded_per_route(self):
+        self.client.get(reverse('services'))
+        self.client.get(reverse('services'))
+        stats = self.route('services')
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['bytes'], 0)
+
+    def test_async_stack_is_profiled_without_sync_adaptation(self):
+        async def view(request):
+            count = await Service.objects.acount()
+            return HttpResponse(str(count))
+
+        middleware = RequestProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get('/services/')
+        request.resolver_match = None
+        response = async_to_sync(middleware)(request)
+
+        self.assertEqual(response.content, b'1')
+        stats = self.route('<unresolved>')
+        self.assertEqual((stats['requests'], stats['queries']), (1, 1))
+
+    def test_queries_are_timed_on_connections_opened_before_the_middleware(self):
+        connection.ensure_connection()
+        if profiling.sql_execute_wrapper in connection.execute_wrappers:
+            connection.execute_wrappers.remove(profiling.sql_execute_wrapper)
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        async_to_sync(self.async_client.get)(reverse('service_detail', args=['pools']))
+        self.assertGreater(self.route('service_detail')['queries'], 0)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], SERVER_TIMING=True)
+class ServerTimingTests(TestCase):
+    """Server-Timing response header (SERVER_TIMING) in sync and async stacks"""
+
+    def setUp(self):
+        Service.objects.create(title='Pools', slug='pools')
+
+    def entries(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, duration, description = entry.split(';')
+            entries[name] = (float(duration.removeprefix('dur=')), description.removeprefix('desc='))
+        return entries
+
+    def test_header_times_each_phase_and_counts_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('service_detail', args=['pools']))
+        entries = self.entries(response)
+        self.assertEqual(list(entries), ['db', 'template', 'cache', 'compress', 'total'])
+        self.assertEqual(entries['db'][1], f'"{len(queries)} queries"')
+        self.assertGreater(entries['template'][0], 0)
+        self.assertGreaterEqual(entries['total'][0], entries['db'][0] + entries['template'][0])
+
+    def test_async_stack_sends_the_header(self):
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        response = async_to_sync(self.async_client.get)(reverse('service_detail', args=['pools']))
+        self.assertGreater(self.entries(response)['db'][0], 0)
+
+    def test_single_query_description(self):
+        profile = profiling.RequestProfile()
+        profile.add('db', 1.25)
+        self.assertTrue(server_timing_header(profile, 3).startswith('db;dur=1.2;desc="1 query", template;dur=0.0'))
+
+    @override_settings(SERVER_TIMING=False, REQUEST_PROFILING=True)
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('services')))
+
+
+# Any positive threshold below every query's duration captures them all
+@override_settings(ALLOWED_HOSTS=['testserver'], SLOW_QUERY_MS=0.0001)
+class SlowQueryTests(TestCase):
+    """Slow query capture with stack and query plan (slow_queries.py)"""
+
+    def setUp(self):
+        slow_queries.reset()
+        self.addCleanup(slow_queries.reset)
+        Service.objects.create(title='Pools', slug='pools')
+
+    def test_queries_of_a_request_are_captured_with_their_plan(self):
+        with self.assertLogs('myApp.slow_queries', 'WARNING') as logs:
+            self.client.get(reverse('service_detail', args=['pools']))
+        entries = slow_queries.recent()
+        self.assertEqual(len(logs.records), len(entries))
+        self.assertTrue(entries)
+        self.assertEqual({entry['view'] for entry in entries}, {'service_detail'})
+
+        lookup = next(entry for entry in entries if 'WHERE "myApp_service"."slug"' in entry['sql'])
+        self.assertIn('SEARCH myApp_service USING INDEX', lookup['plan'])
+        self.assertTrue(any(frame.startswith('myApp/views.py:') and frame.endswith(' in service_detail')
+                            for frame in lookup['stack']))
+        # EXPLAIN runs on the raw cursor: it is never captured itself
+        self.assertFalse([entry for entry in entries if entry['sql'].startswith('EXPLAIN')])
+
+        # Newest first
+        with self.assertLogs('myApp.slow_queries', 'WARNING'):
+            self.client.get(reverse('services'))
+        self.assertEqual(slow_queries.recent()[0]['view'], 'services')
+
+    def test_failed_queries_are_not_captured(self):
+        profiling.install_query_timer()
+        profile = profiling.RequestProfile()
+        token = profiling.activate(profile)
+        self.addCleanup(profiling.deactivate, token)
+        with patch.object(slow_queries, 'explain') as explain, self.assertRaises(Exception), \
+                connection.cursor() as cursor:
+            cursor.execute('SELECT * FROM missing_table')
+        explain.assert_not_called()
+        self.assertEqual(slow_queries.recent(), [])
+        self.assertEqual(profile.counts['db'], 1)
+
+    @patch.object(connection, 'vendor', 'postgresql')
+    def test_plans_never_run_the_query_again(self):
+        with patch.object(connection, 'cursor') as cursor:
+            raw = cursor.return_value.__enter__.return_value.cursor
+            raw.fetchall.return_value = [('Seq Scan on "myApp_service"',)]
+            plan = slow_queries.explain(connection, 'SELECT * FROM "myApp_service"', ())
+        raw.execute.assert_called_once_with('EXPLAIN SELECT * FROM "myApp_service"', ())
+        self.assertEqual(plan, 'Seq Scan on "myApp_service"')
+
+    def test_only_selects_are_explained(self):
+        self.assertEqual(slow_queries.explain(connection, 'DELETE FROM "myApp_service"', ()), '')
+        self.assertTrue(slow_queries.explain(connection, 'SELECT * FROM missing_table', ()).startswith('EXPLAIN failed'))
+        self.assertEqual(Service.objects.count(), 1)
+
+    def test_queries_outside_requests_are_not_captured(self):
+        Service.objects.get(slug='pools')
+        self.assertEqual(slow_queries.recent(), [])
+
+    def test_performance_page_lists_and_resets_them(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        with self.assertLogs('myApp.slow_queries', 'WARNING'):
+            self.client.get(reverse('service_detail', args=['pools']))
+            response = self.client.get(reverse('dashboard_performance'))
+            self.assertContains(response, 'SEARCH myApp_service USING INDEX')
+
+            self.client.post(reverse('dashboard_performance'), {'action': 'reset'})
+        self.assertNotIn('service_detail', {entry['view'] for entry in slow_queries.recent()})
+
+
+class WarmupTests(TestCase):
+    """Startup warm-up requests and the per-worker hooks that run them (warmup.py)"""
+
+    def setUp(self):
+        Service.objects.create(title='Pools', slug='pools')
+
+    def test_requests_use_warmup_host_whatever_allowed_hosts_holds(self):
+        for allowed_hosts in (['*'], ['.example.com']):
+            with self.subTest(allowed_hosts=allowed_hosts), \
+                    override_settings(ALLOWED_HOSTS=allowed_hosts, WARMUP_HOST='www.example.com'):
+                results = warmup.first_requests()
+                self.assertIn(reverse('service_detail', args=['pools']), results)
+                self.assertEqual({status for status, ms in results.values()}, {200})
+
+    def test_lifespan_startup_warms_the_process_once(self):
+        self.addCleanup(setattr, warmup, '_warmed_pid', None)
+        warmup._warmed_pid = None
+        sent = []
+
+        async def app(scope, receive, send):
+            raise AssertionError('lifespan reached the Django application')
+
+        async def lifespan():
+            messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+
+            async def receive():
+                return next(messages)
+
+            async def send(message):
+                sent.append(message['type'])
+
+            await warmup.WarmupLifespanMiddleware(app)({'type': 'lifespan'}, receive, send)
+
+        with patch.object(warmup, 'warm_up') as warm_up:
+            asyncio.run(lifespan())
+            # e.g. gunicorn's post_worker_init hook then a uvicorn worker's lifespan
+            warmup.warm_up_worker()
+        warm_up.assert_called_once_with()
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+    def test_worker_keeps_serving_when_warm_up_fails(self):
+        self.addCleanup(setattr, warmup, '_warmed_pid', None)
+        warmup._warmed_pid = None
+        with patch.object(warmup, 'warm_up', side_effect=RuntimeError('no database')), \
+                self.assertLogs('myApp.warmup', 'ERROR'):
+            warmup.warm_up_worker()
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], METRICS_ENABLED=True, METRICS_TOKEN='s3cret')
+class MetricsTests(TestCase):
+    """Prometheus endpoint access and request metrics in sync and async stacks (metrics.py)"""
+
+    def test_endpoint_requires_the_bearer_token(self):
+        url = reverse('metrics')
+        # A same-host proxy makes every request local; the token is still required
+        response = self.client.get(url, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="metrics"')
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret', REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.content)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_without_a_token_only_allowed_ips_read_the_endpoint(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.7').status_code, 403)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 200)
+
+    def test_async_stack_is_observed_without_adapting(self):
+        from prometheus_client import REGISTRY
+
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(get_response)))
+
+        Service.objects.create(title='Pools', slug='pools')
+        labels = {'route': 'service_detail', 'method': 'GET', 'status': '200'}
+        before = REGISTRY.get_sample_value('http_requests_total', labels) or 0
+        use_async_views(True)
+        self.addCleanup(use_async_views, False)
+        response = async_to_sync(self.async_client.get)(reverse('service_detail', args=['pools']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(REGISTRY.get_sample_value('http_requests_total', labels), before + 1)
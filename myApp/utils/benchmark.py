@@ -0,0 +1,190 @@
+"""
+Helpers shared by the benchmark management commands.
+Benchmarks run against a throwaway test database, so they never touch real content.
+"""
+import contextlib
+import io
+import math
+import statistics
+
+from django.core.management import call_command
+from django.db import connection
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (pct in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies, elapsed):
+    """
+    Summarize request latencies (seconds) measured over `elapsed` wall seconds.
+
+    Returns:
+        dict: count, rps and mean/p50/p95/p99/max latency in milliseconds
+    """
+    count = len(latencies)
+    return {
+        'count': count,
+        'rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+@contextlib.contextmanager
+def benchmark_database(seed=True, verbosity=0):
+    """
+    Create a fresh, migrated test database for the duration of the block.
+
+    Args:
+        seed: Run `seed_all` so every public page has content to render
+        verbosity: Verbosity passed to test DB creation
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        if seed:
+            with contextlib.redirect_stdout(io.StringIO()):
+                call_command('seed_all')
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def synthetic_landscape(width=2400, height=1600, seed=0):
+    """
+    Photo-like test image: sky gradient, layered hills and sensor-style noise.
+    Deterministic per seed; used when no real corpus is given to bench_encoders.
+    """
+    import random
+
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rnd = random.Random(seed)
+    top = (rnd.randint(60, 120), rnd.randint(120, 170), rnd.randint(200, 250))
+    horizon = (rnd.randint(200, 250), rnd.randint(180, 220), rnd.randint(150, 200))
+    mask = Image.linear_gradient('L').resize((width, height))
+    im = Image.composite(Image.new('RGB', (width, height), horizon), Image.new('RGB', (width, height), top), mask)
+
+    draw = ImageDraw.Draw(im)
+    for layer in range(4):
+        base = height * (0.45 + 0.12 * layer)
+        amplitude = height * 0.08
+        frequency = rnd.uniform(1, 4)
+        phase = rnd.uniform(0, 2 * math.pi)
+        ridge = [
+            (x, base + amplitude * math.sin(frequency * x / width * 2 * math.pi + phase)
+             + amplitude * 0.3 * math.sin(7 * frequency * x / width * 2 * math.pi))
+            for x in range(0, width + 1, 8)
+        ]
+        colour = (rnd.randint(20, 90), rnd.randint(60, 130), rnd.randint(20, 70))
+        draw.polygon(ridge + [(width, height), (0, height)], fill=colour)
+
+    noise = Image.effect_noise((width, height), 40).filter(ImageFilter.GaussianBlur(0.6))
+    return Image.blend(im, Image.merge('RGB', (noise, noise, noise)), 0.18)
+
+
+class FakeCloudinaryUploader:
+    """Offline stand-in for cloudinary.uploader: returns a realistic upload response"""
+
+    def __init__(self, width=1600, height=1067):
+        self.width = width
+        self.height = height
+        self.uploads = []
+
+    def upload(self, file=None, folder='uploads', public_id='', eager=None, **kwargs):
+        self.uploads.append({'folder': folder, 'public_id': public_id, **kwargs})
+        full_id = f'{folder}/{public_id}' if folder else public_id
+        base = 'https://res.cloudinary.com/offline/image/upload'
+        data = file.read() if hasattr(file, 'read') else b''
+        # AVIF files start with an ISO BMFF 'ftyp' box, WebP with a RIFF header
+        source_format = 'avif' if data[4:12] == b'ftypavif' else 'webp'
+        variants = []
+        for step in eager or []:
+            width = min(step.get('width', self.width), self.width)
+            transformation = f"c_limit,w_{step.get('width')}/f_{step.get('format')},q_auto"
+            variants.append({
+                'transformation': transformation,
+                'width': width,
+                'height': round(self.height * width / self.width),
+                'format': step.get('format', 'webp'),
+                'bytes': len(data) * width // self.width,
+                'secure_url': f"{base}/{transformation}/v1/{full_id}.{step.get('format', 'webp')}",
+            })
+        return {
+            'public_id': full_id,
+            'secure_url': f'{base}/v1/{full_id}.{source_format}',
+            'width': self.width,
+            'height': self.height,
+            'bytes': len(data),
+            'format': source_format,
+            'eager': variants,
+        }
+
+
+class FakeCloudinaryApi:
+    """
+    Offline stand-in for cloudinary.api (Admin API): remembers destroyed public_ids
+    (a second delete reports 'not_found') and can fail the next `failures` calls.
+    """
+
+    def __init__(self):
+        self.delete_calls = []
+        self.destroyed = set()
+        self.failures = 0
+
+    def delete_resources(self, public_ids, **kwargs):
+        self.delete_calls.append(list(public_ids))
+        if self.failures:
+            self.failures -= 1
+            raise Exception('420 Rate Limit Exceeded')
+        statuses = {}
+        for public_id in public_ids:
+            statuses[public_id] = 'not_found' if public_id in self.destroyed else 'deleted'
+            self.destroyed.add(public_id)
+        return {'deleted': statuses, 'partial': False}
+
+
+class FakeCloudinary:
+    """Offline stand-in for the configured `cloudinary` package (see get_cloudinary)"""
+
+    def __init__(self):
+        self.uploader = FakeCloudinaryUploader()
+        self.api = FakeCloudinaryApi()
+
+
+@contextlib.contextmanager
+def offline_services():
+    """
+    Replace Cloudinary and Resend with in-process fakes for the duration of the block.
+
+    Yields:
+        dict: 'cloudinary' (FakeCloudinary) and 'emails' (list of params sent via Resend)
+    """
+    from unittest import mock
+
+    from django.test import override_settings
+
+    fake_cloudinary = FakeCloudinary()
+    emails = []
+
+    def send(params):
+        emails.append(params)
+        return {'id': f'offline-{len(emails)}'}
+
+    with mock.patch('myApp.utils.cloudinary_utils.get_cloudinary', return_value=fake_cloudinary), \
+            mock.patch('resend.Emails.send', side_effect=send), \
+            override_settings(
+                RESEND_API_KEY='re_offline',
+                RESEND_FROM_EMAIL='bench@example.com',
+                RESEND_TO_EMAIL='bench@example.com',
+            ):
+        yield {'cloudinary': fake_cloudinary, 'emails': emails}
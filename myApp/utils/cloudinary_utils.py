@@ -1,40 +1,164 @@
 """
 Cloudinary utility functions for image upload and compression.
-All images are converted to WebP format before upload for optimal performance.
-Handles WebP conversion, compression, and Cloudinary upload with multiple URL variants.
+Images are re-encoded as AVIF or WebP (whichever is smaller at acceptable
+quality, see image_encoding.py) before upload.
+Handles conversion, compression, and Cloudinary upload with multiple URL variants.
+
+Pillow and the Cloudinary SDK are imported lazily (inside the functions that
+use them) so importing this module - and therefore views.py - stays cheap.
 """
+import base64
 import io
 from pathlib import Path
-from typing import Tuple, Dict, Optional
-from PIL import Image, ImageOps
-import cloudinary
-import cloudinary.uploader
-from cloudinary.exceptions import Error as CloudinaryError
+from typing import TYPE_CHECKING, Tuple, Dict, List, Optional
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+_cloudinary_configured = False
+
+
+def get_cloudinary():
+    """
+    Import and configure the Cloudinary SDK on first use.
+    
+    Returns:
+        module: The configured `cloudinary` package (with uploader and api loaded)
+    """
+    global _cloudinary_configured
+    import cloudinary
+    import cloudinary.api
+    import cloudinary.uploader
+    
+    if not _cloudinary_configured:
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET,
+            secure=True  # Always use HTTPS
+        )
+        _cloudinary_configured = True
+    return cloudinary
 
 # Cloudinary upload limits
 MAX_BYTES = 10 * 1024 * 1024  # 10MB Cloudinary limit
 TARGET_BYTES = int(MAX_BYTES * 0.93)  # 9.3MB target (safety margin)
 
+# Admin API limit for public_ids per delete_resources call
+DELETE_BATCH_SIZE = 100
+
+# Default responsive ladder (overridable via settings.MEDIA_VARIANT_WIDTHS / MEDIA_VARIANT_FORMATS)
+DEFAULT_VARIANT_WIDTHS = [480, 960, 1600, 2400]
+DEFAULT_VARIANT_FORMATS = ['webp']
+
+# Low-quality image placeholder (LQIP) settings
+PLACEHOLDER_WIDTH = 24  # px, upscaled and blurred by the browser
+PLACEHOLDER_QUALITY = 30
+
+
+def compute_placeholder(im: "Image.Image", width: int = PLACEHOLDER_WIDTH) -> str:
+    """
+    Build a tiny blurred WebP placeholder as a base64 data URI (a few hundred bytes).
+    
+    Args:
+        im: Decoded (already EXIF-rotated) Pillow image
+        width: Placeholder width in px
+    
+    Returns:
+        str: data:image/webp;base64,... URI
+    """
+    from PIL import Image, ImageFilter
+    
+    height = max(1, round(im.height * (width / im.width)))
+    small = im.convert('RGBA' if 'A' in im.getbands() else 'RGB')
+    small = small.resize((width, height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    small.save(buf, format="WEBP", quality=PLACEHOLDER_QUALITY, method=4)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def compute_dominant_color(im: "Image.Image") -> str:
+    """
+    Return the most common colour of the image as a #rrggbb hex string.
+    
+    The image is downsampled and quantized to a small palette first, so
+    this stays cheap even for very large uploads.
+    """
+    small = im.convert('RGB')
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=5)
+    palette = quantized.getpalette()
+    count, index = max(quantized.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def prepare_image(im: "Image.Image") -> "Image.Image":
+    """
+    Steps 1-3 of smart_compress_to_bytes: EXIF rotation, mode normalisation and
+    the 5000px width cap (also used by `manage.py bench_encoders`).
+    """
+    from PIL import Image, ImageOps
+    
+    # Step 1: Auto-rotate based on EXIF orientation
+    im = ImageOps.exif_transpose(im)
+    
+    # Step 2: Convert to RGBA if image has transparency, otherwise RGB
+    # AVIF and WebP support both, but RGB is smaller for images without transparency
+    if im.mode in ('RGBA', 'LA', 'P'):
+        # Keep transparency if present
+        if im.mode == 'P':
+            im = im.convert('RGBA')
+        # Already RGBA or LA, keep as is
+    elif im.mode not in ('RGB', 'L'):
+        # Convert other modes to RGB
+        im = im.convert('RGB')
+    
+    # Step 3: Cap extreme dimensions (resize if too large)
+    max_w = 5000
+    if im.width > max_w:
+        im = im.resize(
+            (max_w, int(im.height * (max_w / im.width))), 
+            Image.LANCZOS  # High-quality resampling
+        )
+    
+    return im
+
 
-def smart_compress_to_bytes(src_file) -> bytes:
+def smart_compress_to_bytes(
+    src_file,
+    meta: Optional[Dict] = None,
+    formats: Optional[List[str]] = None,
+    profile: Optional[str] = None
+) -> bytes:
     """
-    Accepts a file-like object or path; returns compressed WebP bytes <= TARGET_BYTES.
+    Accepts a file-like object or path; returns compressed AVIF or WebP bytes <= TARGET_BYTES.
     
     Process:
     1. Load image with PIL/Pillow
     2. Auto-rotate based on EXIF data
-    3. Convert to RGB if needed (WebP supports RGBA, but convert non-alpha images to RGB for better compression)
+    3. Convert to RGB if needed (both formats support RGBA, but convert non-alpha images to RGB for better compression)
     4. Resize if width > 5000px
-    5. Convert to WebP format
-    6. Iteratively reduce quality until under TARGET_BYTES
-    7. Return compressed WebP bytes
+    5. Encode each candidate format with the selected encoder profile, reducing quality until under TARGET_BYTES
+    6. Keep the smallest candidate that meets the quality floor (image_encoding.choose_encoding)
+    
+    While the decoded image is in memory, a blurred placeholder and the
+    dominant colour are computed too when a `meta` dict is passed in.
     
     Args:
         src_file: File-like object (request.FILES['file']) or file path (str/Path)
+        meta: Optional dict filled with 'placeholder', 'dominant_color', 'format',
+              'savings_bytes', 'candidates' and 'profile'
+        formats: Candidate formats (defaults to settings.MEDIA_ENCODE_FORMATS)
+        profile: Encoder profile name or 'auto' (defaults to settings.MEDIA_ENCODE_PROFILE)
     
     Returns:
-        bytes: Compressed WebP image data ready for upload
+        bytes: Compressed image data ready for upload
     """
+    from PIL import Image
+    from .image_encoding import choose_encoding
+    
     # Load into Pillow
     if isinstance(src_file, (str, Path)):
         im = Image.open(src_file)
@@ -42,53 +166,84 @@ def smart_compress_to_bytes(src_file) -> bytes:
         im = Image.open(src_file)
 
     with im:
-        # Step 1: Auto-rotate based on EXIF orientation
-        im = ImageOps.exif_transpose(im)
-        
-        # Step 2: Convert to RGBA if image has transparency, otherwise RGB
-        # WebP supports both, but RGB is smaller for images without transparency
-        if im.mode in ('RGBA', 'LA', 'P'):
-            # Keep transparency if present
-            if im.mode == 'P':
-                im = im.convert('RGBA')
-            # Already RGBA or LA, keep as is
-        elif im.mode not in ('RGB', 'L'):
-            # Convert other modes to RGB
-            im = im.convert('RGB')
-        
-        # Step 3: Cap extreme dimensions (resize if too large)
-        max_w = 5000
-        if im.width > max_w:
-            im = im.resize(
-                (max_w, int(im.height * (max_w / im.width))), 
-                Image.LANCZOS  # High-quality resampling
-            )
+        im = prepare_image(im)
         
-        # Step 4: Iterative quality reduction (always WebP)
-        q = 85  # Start with high quality for WebP
-        min_q = 40  # Minimum quality for WebP
-        step = 5  # Quality reduction step
+        if meta is not None:
+            meta['placeholder'] = compute_placeholder(im)
+            meta['dominant_color'] = compute_dominant_color(im)
         
-        while True:
-            buf = io.BytesIO()
-            
-            # Always save as WebP with best compression method
-            im.save(
-                buf, 
-                format="WEBP", 
-                quality=q, 
-                method=6,  # Best compression (slower but smaller files)
-                lossless=False  # Use lossy compression for smaller files
-            )
-            
-            data = buf.getvalue()
-            
-            # Success condition: under target size OR at minimum quality
-            if len(data) <= TARGET_BYTES or q <= min_q:
-                return data
-            
-            # Reduce quality and try again
-            q = max(min_q, q - step)
+        # Step 4: Encode the candidate formats and keep the best one
+        encoding = choose_encoding(im, TARGET_BYTES, formats=formats, profile=profile)
+        if meta is not None:
+            meta['format'] = encoding['format']
+            meta['savings_bytes'] = encoding['savings_bytes']
+            meta['candidates'] = encoding['candidates']
+            meta['profile'] = encoding['profile']
+        return encoding['data']
+
+
+def build_variant_ladder(
+    widths: Optional[List[int]] = None,
+    formats: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Build the list of eager transformations for the responsive variant ladder.
+    
+    Every width is generated once per format with crop=limit, so images
+    narrower than a step are never upscaled.
+    
+    Args:
+        widths: Target widths in px (defaults to settings.MEDIA_VARIANT_WIDTHS)
+        formats: Output formats (defaults to settings.MEDIA_VARIANT_FORMATS)
+    
+    Returns:
+        list: Cloudinary eager transformation dicts
+    """
+    widths = widths or getattr(settings, 'MEDIA_VARIANT_WIDTHS', DEFAULT_VARIANT_WIDTHS)
+    formats = formats or getattr(settings, 'MEDIA_VARIANT_FORMATS', DEFAULT_VARIANT_FORMATS)
+    
+    return [
+        {
+            "format": fmt,
+            "quality": "auto",
+            "crop": "limit",
+            "width": width,
+        }
+        for fmt in formats
+        for width in sorted(set(widths))
+    ]
+
+
+def extract_eager_variants(result: Dict) -> List[Dict]:
+    """
+    Pull the generated variants out of a Cloudinary upload response.
+    
+    Steps that collapse to the same rendition (e.g. 1600 and 2400 on a
+    1200px original) are reported once.
+    
+    Returns:
+        list: Dicts with width, height, format, bytes_size, secure_url, transformation
+    """
+    variants = []
+    seen = set()
+    for eager in result.get("eager") or []:
+        secure_url = eager.get("secure_url") or eager.get("url", "")
+        if not secure_url:
+            continue
+        fmt = eager.get("format", "")
+        width = eager.get("width", 0)
+        if (fmt, width) in seen:
+            continue
+        seen.add((fmt, width))
+        variants.append({
+            "width": width,
+            "height": eager.get("height", 0),
+            "format": fmt,
+            "bytes_size": eager.get("bytes", 0),
+            "secure_url": secure_url,
+            "transformation": eager.get("transformation", ""),
+        })
+    return variants
 
 
 def upload_to_cloudinary(
@@ -108,10 +263,11 @@ def upload_to_cloudinary(
     
     Returns:
         tuple: (result_dict, web_url, thumb_url)
-        - result_dict: Full Cloudinary API response
+        - result_dict: Full Cloudinary API response (variants under "eager")
         - web_url: Optimized URL for web use (f_auto,q_auto)
         - thumb_url: Thumbnail URL (c_fill,g_face,w_480,h_320)
     """
+    cloudinary = get_cloudinary()
     result = cloudinary.uploader.upload(
         file=io.BytesIO(file_bytes),  # Convert bytes to file-like object
         resource_type="image",
@@ -120,13 +276,7 @@ def upload_to_cloudinary(
         overwrite=True,  # Replace if exists (useful for updates)
         unique_filename=False,  # Use provided public_id exactly
         use_filename=False,  # Don't use original filename
-        eager=[{
-            "format": "webp",
-            "quality": "auto",
-            "fetch_format": "auto",
-            "crop": "limit",
-            "width": 2400
-        }],  # Pre-generate WebP variant (eager transformation)
+        eager=build_variant_ladder(),  # Pre-generate the responsive variant ladder
         tags=(tags or []),  # Organization tags
         timeout=120,  # 2 minute timeout for large files
     )
@@ -152,3 +302,27 @@ def upload_to_cloudinary(
     
     return result, web_url, thumb_url
 
+
+
+def delete_from_cloudinary(public_ids: List[str]) -> Dict:
+    """
+    Destroy uploaded images (with all their derived variants) in one Admin API call.
+    
+    Args:
+        public_ids: Up to DELETE_BATCH_SIZE public_ids
+    
+    Returns:
+        dict: 'deleted' (public_id -> 'deleted', 'not_found', ...) and 'partial'
+              (True when Cloudinary stopped early and the call must be repeated)
+    """
+    cloudinary = get_cloudinary()
+    result = cloudinary.api.delete_resources(
+        list(public_ids),
+        resource_type="image",
+        type="upload",
+        invalidate=True,  # Purge CDN copies too
+    )
+    return {
+        "deleted": dict(result.get("deleted") or {}),
+        "partial": bool(result.get("partial")),
+    }
@@ -0,0 +1,245 @@
+"""
+Output format negotiation for uploaded images.
+
+Every upload is encoded once per candidate format (settings.MEDIA_ENCODE_FORMATS,
+AVIF and WebP by default), each compressed under the upload size target. The
+decoded candidates are compared with the source (PSNR), and the smallest one at
+or above the quality floor (settings.MEDIA_QUALITY_FLOOR_DB) is kept. When none
+reaches the floor the most faithful one wins. AVIF is usually much smaller for
+photos; flat graphics often stay WebP.
+
+Encoder effort (WebP method, AVIF speed) comes from a named EncoderProfile.
+settings.MEDIA_ENCODE_PROFILE = 'auto' picks per upload the most thorough
+profile whose estimated encode time for the image's pixel count fits
+settings.MEDIA_ENCODE_BUDGET_MS; 'max' is reserved for images large enough
+for its extra savings to matter.
+
+`python manage.py bench_encoders` runs the same encoders over a photo corpus
+(`--grid` measures every effort/quality combination, to recalibrate the
+profiles' ms_per_megapixel).
+
+Pillow is imported lazily, like in cloudinary_utils.py. AVIF needs Pillow 11.3+
+(or pillow-avif-plugin); without it uploads are encoded as WebP only.
+"""
+import functools
+import io
+import math
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+DEFAULT_ENCODE_FORMATS = ['avif', 'webp']
+DEFAULT_QUALITY_FLOOR_DB = 35.0
+
+# Starting and lowest quality per format; AVIF reaches WebP's fidelity at lower settings
+START_QUALITY = {'webp': 85, 'avif': 60}
+MIN_QUALITY = {'webp': 40, 'avif': 30}
+QUALITY_STEP = 5
+
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+DEFAULT_ENCODE_BUDGET_MS = 2000
+# Decoding a candidate and comparing it with the source (psnr), per candidate
+SCORE_MS_PER_MEGAPIXEL = 40
+
+
+class EncoderProfile:
+    """
+    Encoder effort settings.
+
+    Args:
+        name: Profile name
+        webp_method: WebP method, 0 (fastest) - 6 (smallest)
+        avif_speed: AVIF speed, 10 (fastest) - 0 (smallest)
+        ms_per_megapixel: Measured encode time per format at the starting quality
+        min_pixels: Smallest image the automatic selector uses this profile for
+    """
+
+    def __init__(self, name, webp_method, avif_speed, ms_per_megapixel, min_pixels=0):
+        self.name = name
+        self.webp_method = webp_method
+        self.avif_speed = avif_speed
+        self.ms_per_megapixel = ms_per_megapixel
+        self.min_pixels = min_pixels
+
+    def options(self, fmt):
+        """Pillow save() options for `fmt`"""
+        if fmt == 'webp':
+            return {'method': self.webp_method, 'lossless': False}
+        return {'speed': self.avif_speed}
+
+    def estimate_ms(self, pixels, formats):
+        """Expected time to encode and score one attempt per format"""
+        per_megapixel = sum(self.ms_per_megapixel[fmt] + SCORE_MS_PER_MEGAPIXEL for fmt in formats)
+        return per_megapixel * pixels / 1_000_000
+
+
+# Most thorough first. Timings from `bench_encoders --grid` on 2400x1600 landscapes
+# (one core): method 6 saves ~4% over method 5 at 2.4x the time, and AVIF below
+# speed 6 costs seconds per megapixel.
+PROFILES = {
+    'max': EncoderProfile('max', webp_method=6, avif_speed=6,
+                          ms_per_megapixel={'webp': 250, 'avif': 280}, min_pixels=1_000_000),
+    'balanced': EncoderProfile('balanced', webp_method=5, avif_speed=8,
+                               ms_per_megapixel={'webp': 105, 'avif': 75}),
+    'fast': EncoderProfile('fast', webp_method=2, avif_speed=9,
+                           ms_per_megapixel={'webp': 40, 'avif': 45}),
+}
+
+
+def select_profile(pixels, formats, name=None, budget_ms=None):
+    """
+    Encoder profile for an image of `pixels` pixels.
+
+    Args:
+        pixels: Width x height of the prepared image
+        formats: Candidate formats that will be encoded
+        name: Profile name or 'auto' (defaults to settings.MEDIA_ENCODE_PROFILE)
+        budget_ms: Encode time budget for 'auto' (defaults to settings.MEDIA_ENCODE_BUDGET_MS)
+
+    Returns:
+        EncoderProfile
+    """
+    name = name or getattr(settings, 'MEDIA_ENCODE_PROFILE', 'auto')
+    if name != 'auto':
+        try:
+            return PROFILES[name]
+        except KeyError:
+            raise ValueError(f'Unknown encoder profile: {name!r}')
+    if budget_ms is None:
+        budget_ms = getattr(settings, 'MEDIA_ENCODE_BUDGET_MS', DEFAULT_ENCODE_BUDGET_MS)
+    for profile in PROFILES.values():
+        if pixels >= profile.min_pixels and profile.estimate_ms(pixels, formats) <= budget_ms:
+            return profile
+    return PROFILES['fast']
+
+
+def available_formats(formats: Optional[List[str]] = None) -> List[str]:
+    """Candidate formats this Pillow build can encode (WebP is always kept as fallback)"""
+    formats = formats or getattr(settings, 'MEDIA_ENCODE_FORMATS', DEFAULT_ENCODE_FORMATS)
+    usable = [fmt for fmt in formats if fmt in START_QUALITY and can_encode(fmt)]
+    return usable or ['webp']
+
+
+@functools.lru_cache(maxsize=None)
+def can_encode(fmt: str) -> bool:
+    """
+    Whether this Pillow build can write `fmt`. Checked once per process, and
+    without features.check(), which warns on names older Pillows don't know.
+    """
+    from PIL import Image, features
+
+    if fmt in features.modules:
+        return bool(features.check_module(fmt))
+    # Formats registered by plugins (e.g. pillow-avif-plugin)
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+
+def encode(im: "Image.Image", fmt: str, quality: int, profile: Optional[EncoderProfile] = None) -> bytes:
+    """Encode `im` as `fmt` ('webp' or 'avif') at `quality` with the profile's effort"""
+    profile = profile or PROFILES['max']
+    buf = io.BytesIO()
+    im.save(buf, format=fmt.upper(), quality=quality, **profile.options(fmt))
+    return buf.getvalue()
+
+
+def encode_to_target(
+    im: "Image.Image",
+    fmt: str,
+    max_bytes: int,
+    profile: Optional[EncoderProfile] = None
+) -> Dict:
+    """
+    Encode at decreasing quality until the output fits `max_bytes` (or the
+    format's minimum quality is reached).
+
+    Returns:
+        dict: data, quality, encode_ms (total over all attempts)
+    """
+    quality = START_QUALITY[fmt]
+    started = time.perf_counter()
+    while True:
+        data = encode(im, fmt, quality, profile)
+        if len(data) <= max_bytes or quality <= MIN_QUALITY[fmt]:
+            return {
+                'data': data,
+                'quality': quality,
+                'encode_ms': round((time.perf_counter() - started) * 1000, 1),
+            }
+        quality = max(MIN_QUALITY[fmt], quality - QUALITY_STEP)
+
+
+def psnr(reference: "Image.Image", data: bytes) -> float:
+    """Peak signal-to-noise ratio (dB) of encoded `data` against `reference` (RGB)"""
+    from PIL import Image, ImageChops
+
+    with Image.open(io.BytesIO(data)) as decoded:
+        diff = ImageChops.difference(reference.convert('RGB'), decoded.convert('RGB'))
+    histogram = diff.histogram()
+    squared = sum(count * (i % 256) ** 2 for i, count in enumerate(histogram))
+    mse = squared / (diff.width * diff.height * 3)
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 ** 2 / mse)
+
+
+def choose_encoding(
+    im: "Image.Image",
+    max_bytes: int,
+    formats: Optional[List[str]] = None,
+    floor_db: Optional[float] = None,
+    profile: Optional[str] = None,
+) -> Dict:
+    """
+    Encode `im` in every candidate format and pick one.
+
+    Args:
+        im: Prepared (EXIF-rotated, size-capped) image
+        max_bytes: Upload size target
+        formats: Candidate formats (defaults to settings.MEDIA_ENCODE_FORMATS)
+        floor_db: Minimum PSNR (defaults to settings.MEDIA_QUALITY_FLOOR_DB)
+        profile: Encoder profile name or 'auto' (defaults to settings.MEDIA_ENCODE_PROFILE)
+
+    Returns:
+        dict: format, data (chosen bytes), savings_bytes (vs the WebP candidate),
+              profile (name used) and candidates (format -> bytes, quality, psnr, encode_ms)
+    """
+    if floor_db is None:
+        floor_db = getattr(settings, 'MEDIA_QUALITY_FLOOR_DB', DEFAULT_QUALITY_FLOOR_DB)
+    formats = available_formats(formats)
+    encoder = select_profile(im.width * im.height, formats, name=profile)
+
+    encoded = {}
+    for fmt in formats:
+        result = encode_to_target(im, fmt, max_bytes, encoder)
+        result['psnr'] = psnr(im, result['data'])
+        encoded[fmt] = result
+
+    passing = [fmt for fmt, result in encoded.items() if result['psnr'] >= floor_db]
+    if passing:
+        chosen = min(passing, key=lambda fmt: len(encoded[fmt]['data']))
+    else:
+        chosen = max(encoded, key=lambda fmt: encoded[fmt]['psnr'])
+
+    data = encoded[chosen]['data']
+    webp = encoded.get('webp')
+    return {
+        'format': chosen,
+        'data': data,
+        'savings_bytes': max(0, len(webp['data']) - len(data)) if webp else 0,
+        'profile': encoder.name,
+        'candidates': {
+            fmt: {
+                'bytes': len(result['data']),
+                'quality': result['quality'],
+                'psnr': round(result['psnr'], 2),
+                'encode_ms': result['encode_ms'],
+            }
+            for fmt, result in encoded.items()
+        },
+    }
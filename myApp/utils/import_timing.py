@@ -0,0 +1,57 @@
+"""
+Import-time measurement for process startup (based on `python -X importtime`).
+
+Startup is measured in a fresh interpreter that does what a worker does on
+boot: load the WSGI application and the URLconf (which imports every view).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+
+# Third-party modules that must only be imported on first use (upload / email paths)
+LAZY_MODULES = ['PIL', 'cloudinary', 'resend']
+
+STARTUP_SCRIPT = (
+    "import sys; "
+    "from myProject.wsgi import application; "
+    "import myProject.urls; "
+    "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+)
+
+
+def measure_startup():
+    """
+    Run one cold startup with -X importtime.
+
+    Returns:
+        dict: total_ms (sum of self times), modules (name -> {'self_ms', 'cumulative_ms'}),
+              loaded (set of top-level package names imported at startup)
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'myProject.settings'))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=Path(settings.BASE_DIR), env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        total_us += int(self_us)
+        modules[name.strip()] = {
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        }
+
+    loaded = set(proc.stdout.strip().splitlines()[-1].split(',')) if proc.stdout.strip() else set()
+    return {'total_ms': total_us / 1000, 'modules': modules, 'loaded': loaded}
+
+
+def best_of(runs=3):
+    """Fastest of several cold startups (filters out scheduler noise)"""
+    return min((measure_startup() for _ in range(runs)), key=lambda result: result['total_ms'])
@@ -0,0 +1,130 @@
+"""
+Keyset (seek) pagination.
+
+Instead of OFFSET, each page continues from the sort values of the last row of
+the previous one (`WHERE (created_at, id) < (...)`), so page 500 costs the same
+as page 1 when an index covers the ordering. Pages are addressed by opaque
+cursors (`?after=...` / `?before=...`) rather than page numbers, and there is
+no total page count.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(obj, fields):
+    """Opaque cursor holding `obj`'s sort values (full precision, via the model fields)"""
+    values = [None if field.value_from_object(obj) is None else field.value_to_string(obj) for field in fields]
+    data = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """
+    Sort values from a cursor, converted back to Python by the model fields.
+
+    Returns:
+        list: One value per field, or None for a missing or malformed cursor
+    """
+    if not cursor:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def seek_filter(names, descending, values):
+    """
+    Rows strictly after `values` in the given ordering, e.g. for (-created_at, -id):
+    created_at < v0 OR (created_at = v0 AND id < v1).
+    """
+    condition = Q()
+    for i, name in enumerate(names):
+        step = Q(**{f'{name}__{"lt" if descending[i] else "gt"}': values[i]})
+        for previous in range(i):
+            step &= Q(**{names[previous]: values[previous]})
+        condition |= step
+    return condition
+
+
+class KeysetPage:
+    """One page of rows plus the cursors of its neighbours (iterates like a Page)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, per_page=25):
+    """
+    Fetch one page of `queryset` in `ordering`.
+
+    Args:
+        queryset: Filtered queryset (its own ordering is replaced)
+        ordering: Local non-null field names, '-' for descending; must end with a unique
+            field (normally 'id' / '-id') so every row has a distinct position
+        after: Cursor of the page's predecessor row (next page)
+        before: Cursor of the page's successor row (previous page)
+        per_page: Rows per page
+
+    Returns:
+        KeysetPage
+    """
+    names = [name.lstrip('-') for name in ordering]
+    descending = [name.startswith('-') for name in ordering]
+    fields = [queryset.model._meta.get_field(name) for name in names]
+
+    backwards = False
+    values = decode_cursor(after, fields)
+    if values is None:
+        values = decode_cursor(before, fields)
+        backwards = values is not None
+
+    if backwards:
+        # Walk the ordering in reverse from the cursor, then flip the rows back
+        seek_descending = [not d for d in descending]
+        order_by = [name if d else f'-{name}' for name, d in zip(names, descending)]
+    else:
+        seek_descending = descending
+        order_by = list(ordering)
+
+    if values is not None:
+        queryset = queryset.filter(seek_filter(names, seek_descending, values))
+    rows = list(queryset.order_by(*order_by)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    has_next = (has_more and not backwards) or backwards
+    has_previous = (has_more and backwards) or (values is not None and not backwards)
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], fields) if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], fields) if rows and has_previous else None,
+    )
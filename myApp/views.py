@@ -3,26 +3,38 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse, Http404
 from django.views.decorators.http import require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.text import slugify
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from urllib.parse import quote
 import json
+import mimetypes
 import os
 import re
-import resend
+import stat as stat_module
 
 from .models import (
     UserProfile, Service, Insight, Hero, Metadata, 
-    MediaAsset, MediaAlbum, ProcessStep, Project, IntroSettings
+    MediaAsset, MediaAlbum, ProcessStep, Project, ProjectImage, IntroSettings,
+    ContentCounter, UploadSession,
 )
 from .decorators import admin_required, blog_author_required
-from .utils.cloudinary_utils import (
-    smart_compress_to_bytes, upload_to_cloudinary, TARGET_BYTES
-)
+from .dashboard_lists import DashboardList, ListFilter
+from .bulk_actions import BULK_TARGETS, GALLERY_TARGET, BulkActionError
+from . import bulk_actions, chunked_upload
+from .media_pipeline import ingest_image
+from .media_storage import get_storage
+from .utils.pagination import keyset_paginate
+from . import metrics, profiling, slow_queries
+from .preload_hints import preload_image
 
 
 # ==================== PUBLIC VIEWS ====================
@@ -74,14 +86,20 @@ def service_detail(request, slug):
     service = get_object_or_404(Service, slug=slug)
     # Use other services (with hero images) to power the showcase tiles
     showcase_services = Service.objects.filter(featured=True).exclude(id=service.id).order_by('order', 'title')[:4]
+    # Resolved here in one query; the template asks for the list twice
+    Service.prefetch_related_services([service])
+    preload_image(request, service.hero_image_url)
     return render(request, 'service_detail.html', {
         'service': service,
         'showcase_services': showcase_services,
+        'media_assets': MediaAsset.lookup_by_urls([service.hero_image_url]),
     })
 
 def projects(request):
     """Projects catalog page"""
-    projects_list = Project.objects.all().order_by('-featured', 'order', '-created_at')
+    projects_list = Project.objects.all().order_by('-featured', 'order', '-created_at').prefetch_related(
+        Prefetch('images', queryset=ProjectImage.objects.select_related('asset'))
+    )
     
     # Get unique categories for filtering
     categories = Project.objects.exclude(category='').values_list('category', flat=True).distinct()
@@ -89,10 +107,16 @@ def projects(request):
     return render(request, 'projects.html', {
         'projects': projects_list,
         'categories': categories,
+        'media_assets': MediaAsset.lookup_by_urls(p.hero_image_url for p in projects_list),
     })
 
 def project_detail(request, slug):
-    project = get_object_or_404(Project, slug=slug)
+    project = get_object_or_404(
+        Project.objects.prefetch_related(
+            Prefetch('images', queryset=ProjectImage.objects.select_related('asset').prefetch_related('asset__variants'))
+        ),
+        slug=slug
+    )
     
     # Get related projects (same category or featured)
     related_projects = Project.objects.exclude(id=project.id).filter(featured=True).order_by('?')[:3]
@@ -101,9 +125,13 @@ def project_detail(request, slug):
         additional = Project.objects.exclude(id=project.id).exclude(id__in=[p.id for p in related_projects]).order_by('?')[:3-related_projects.count()]
         related_projects = list(related_projects) + list(additional)
     
+    preload_image(request, project.hero_image_url)
     return render(request, 'project_detail.html', {
         'project': project,
         'related_projects': related_projects,
+        'media_assets': MediaAsset.lookup_by_urls(
+            [project.hero_image_url] + [p.hero_image_url for p in related_projects]
+        ),
     })
 
 def blog_overview(request):
@@ -129,9 +157,11 @@ def blog_detail(request, slug):
         status='published'
     ).order_by('-published_at', '-created_at')[:3]
     
+    preload_image(request, insight.featured_image_url)
     return render(request, 'blog_page/blog_detail.html', {
         'insight': insight,
         'related_insights': related_insights,
+        'media_assets': MediaAsset.lookup_by_urls([insight.featured_image_url]),
     })
 
 
@@ -170,25 +200,78 @@ def dashboard_home(request):
     if hasattr(request.user, 'profile') and request.user.profile.is_blog_author and not request.user.profile.is_admin:
         return redirect('dashboard_insights_list')
     
+    totals = ContentCounter.totals()
     context = {
-        'services_count': Service.objects.count(),
-        'insights_count': Insight.objects.count(),
-        'heroes_count': Hero.objects.count(),
-        'media_count': MediaAsset.objects.count(),
+        'services_count': totals.get('service', 0),
+        'insights_count': totals.get('insight', 0),
+        'heroes_count': totals.get('hero', 0),
+        'media_count': totals.get('mediaasset', 0),
         'recent_insights': Insight.objects.filter(status='published')[:5],
         'recent_services': Service.objects.all()[:5],
     }
     return render(request, 'dashboard/home.html', context)
 
 
+@login_required
+@admin_required
+def dashboard_performance(request):
+    """Per-route request timings collected by RequestProfilingMiddleware (this worker only)"""
+    if request.method == 'POST' and request.POST.get('action') == 'reset':
+        profiling.reset()
+        slow_queries.reset()
+        return redirect('dashboard_performance')
+    
+    context = {
+        'routes': profiling.snapshot(),
+        'slow_queries': slow_queries.recent(),
+        'slow_query_ms': settings.SLOW_QUERY_MS,
+        'buckets': profiling.LATENCY_BUCKETS_MS,
+        'profiling_enabled': settings.REQUEST_PROFILING,
+        'window': settings.PROFILING_WINDOW,
+    }
+    return render(request, 'dashboard/performance/index.html', context)
+
+
+def metrics_endpoint(request):
+    """Prometheus scrape endpoint, served to scrapers with METRICS_TOKEN (or local ones without a token)"""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() != 'bearer' or not constant_time_compare(token.strip(), settings.METRICS_TOKEN):
+            response = HttpResponse(status=401)
+            response['WWW-Authenticate'] = 'Bearer realm="metrics"'
+            return response
+    elif request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=403)
+    body, content_type = metrics.exposition()
+    return HttpResponse(body, content_type=content_type)
+
+
 # ==================== SERVICES MANAGEMENT ====================
 
+SERVICES_LIST = DashboardList(
+    Service, 'dashboard/services/list.html', 'dashboard/services/table.html', 'services',
+    sorts={
+        'order': ['order', 'title', 'id'],
+        'title': ['title', 'id'],
+        'created': ['created_at', 'id'],
+    },
+    default_sort='order',
+    fields=['title', 'short_description', 'featured', 'order', 'created_at'],
+    search=['title', 'short_description'],
+    filters=[ListFilter('featured', 'Featured', [
+        ('yes', 'Featured', Q(featured=True)),
+        ('no', 'Not featured', Q(featured=False)),
+    ])],
+)
+
+
 @login_required
 @admin_required
 def dashboard_services_list(request):
-    """List all services"""
-    services = Service.objects.all()
-    return render(request, 'dashboard/services/list.html', {'services': services})
+    """List services (sortable, searchable, keyset-paginated)"""
+    return SERVICES_LIST.render(request)
 
 
 @login_required
@@ -245,13 +328,45 @@ def dashboard_service_delete(request, pk):
     return redirect('dashboard_services_list')
 
 
+# ==================== BULK OPERATIONS ====================
+
+@login_required
+@admin_required
+@require_POST
+def dashboard_bulk_action(request, kind):
+    """
+    JSON endpoint for list pages: reorder / feature many rows or delete a selection
+    in one request (see bulk_actions.py for the payload).
+    """
+    target = BULK_TARGETS.get(kind)
+    if target is None:
+        raise Http404
+    try:
+        payload = json.loads(request.body or b'null')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    try:
+        result = bulk_actions.apply(target, payload)
+    except BulkActionError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **result})
+
+
 # ==================== INSIGHTS MANAGEMENT ====================
 
+DASHBOARD_PAGE_SIZE = 25
+
+# Columns the insights table shows (content, the large Editor.js body, is never loaded)
+INSIGHT_LIST_FIELDS = [
+    'title', 'slug', 'excerpt', 'featured_image_url', 'status', 'published_at', 'created_at',
+    'author__username', 'author__first_name', 'author__last_name',
+]
+
 @login_required
 @blog_author_required
 def dashboard_insights_list(request):
-    """List all insights"""
-    insights = Insight.objects.all()
+    """List insights, newest first, a keyset-paginated page at a time"""
+    insights = Insight.objects.select_related('author').only(*INSIGHT_LIST_FIELDS)
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
@@ -259,26 +374,33 @@ def dashboard_insights_list(request):
         insights = insights.filter(status=status_filter)
     
     # Filter by author if not admin
+    author_id = None
     if hasattr(request.user, 'profile') and not request.user.profile.is_admin:
         insights = insights.filter(author=request.user)
+        author_id = request.user.id
+    
+    # Search across every page; the page links carry ?q= along with the cursor
+    query = request.GET.get('q', '').strip()
+    if query:
+        insights = insights.filter(Q(title__icontains=query) | Q(excerpt__icontains=query))
     
-    # Calculate stats
-    from django.utils import timezone
-    from datetime import datetime
-    total_count = insights.count()
-    published_count = insights.filter(status='published').count()
-    draft_count = insights.filter(status='draft').count()
+    # Stats come from the signal-maintained counters (one query)
+    stats = ContentCounter.insight_stats(author_id=author_id, status=status_filter)
     
-    # Count posts from current month
-    now = timezone.now()
-    this_month_count = insights.filter(created_at__year=now.year, created_at__month=now.month).count()
+    page = keyset_paginate(
+        insights, ['-created_at', '-id'],
+        after=request.GET.get('after'), before=request.GET.get('before'),
+        per_page=DASHBOARD_PAGE_SIZE,
+    )
     
     context = {
-        'insights': insights,
-        'total_count': total_count,
-        'published_count': published_count,
-        'draft_count': draft_count,
-        'this_month_count': this_month_count,
+        'insights': page,
+        'page': page,
+        'query': query,
+        'total_count': stats['total'],
+        'published_count': stats['published'],
+        'draft_count': stats['draft'],
+        'this_month_count': stats['this_month'],
     }
     
     return render(request, 'dashboard/insights/list.html', context)
@@ -388,12 +510,30 @@ def dashboard_insight_delete(request, pk):
 
 # ==================== HEROES MANAGEMENT ====================
 
+HEROES_LIST = DashboardList(
+    Hero, 'dashboard/heroes/list.html', 'dashboard/heroes/table.html', 'heroes',
+    sorts={
+        'page': ['page', 'order', 'id'],
+        'title': ['title', 'id'],
+    },
+    default_sort='page',
+    fields=['page', 'title', 'subtitle', 'active', 'order'],
+    search=['title', 'subtitle', 'custom_slug'],
+    filters=[
+        ListFilter('page', 'Page', [(value, label, Q(page=value)) for value, label in Hero.PAGE_CHOICES]),
+        ListFilter('active', 'Status', [
+            ('yes', 'Active', Q(active=True)),
+            ('no', 'Inactive', Q(active=False)),
+        ]),
+    ],
+)
+
+
 @login_required
 @admin_required
 def dashboard_heroes_list(request):
-    """List all heroes"""
-    heroes = Hero.objects.all()
-    return render(request, 'dashboard/heroes/list.html', {'heroes': heroes})
+    """List heroes (sortable, searchable, keyset-paginated)"""
+    return HEROES_LIST.render(request)
 
 
 @login_required
@@ -473,12 +613,28 @@ def dashboard_hero_delete(request, pk):
 
 # ==================== PROJECTS MANAGEMENT ====================
 
+PROJECTS_LIST = DashboardList(
+    Project, 'dashboard/projects/list.html', 'dashboard/projects/table.html', 'projects',
+    sorts={
+        'featured': ['-featured', 'order', '-created_at', '-id'],
+        'title': ['title', 'id'],
+        'created': ['created_at', 'id'],
+    },
+    default_sort='featured',
+    fields=['title', 'slug', 'location', 'category', 'hero_image_url', 'featured', 'order', 'created_at'],
+    search=['title', 'location', 'category'],
+    filters=[ListFilter('featured', 'Featured', [
+        ('yes', 'Featured', Q(featured=True)),
+        ('no', 'Not featured', Q(featured=False)),
+    ])],
+)
+
+
 @login_required
 @admin_required
 def dashboard_projects_list(request):
-    """List all projects"""
-    projects = Project.objects.all().order_by('-featured', 'order', '-created_at')
-    return render(request, 'dashboard/projects/list.html', {'projects': projects})
+    """List projects (sortable, searchable, keyset-paginated)"""
+    return PROJECTS_LIST.render(request)
 
 
 @login_required
@@ -511,6 +667,7 @@ def dashboard_project_create(request):
             featured=featured,
             order=order
         )
+        project.sync_gallery_images()
         return redirect('dashboard_projects_list')
     
     services = Service.objects.all().order_by('title')
@@ -537,6 +694,7 @@ def dashboard_project_edit(request, pk):
         project.featured = request.POST.get('featured') == 'on'
         project.order = int(request.POST.get('order', 0))
         project.save()
+        project.sync_gallery_images()
         return redirect('dashboard_projects_list')
     
     services = Service.objects.all().order_by('title')
@@ -555,12 +713,27 @@ def dashboard_project_delete(request, pk):
 
 # ==================== METADATA MANAGEMENT ====================
 
+METADATA_LIST = DashboardList(
+    Metadata, 'dashboard/metadata/list.html', 'dashboard/metadata/table.html', 'metadata_list',
+    sorts={
+        # (page, custom_slug) is unique, and indexed by its unique constraint
+        'page': ['page', 'custom_slug'],
+        'title': ['title', 'id'],
+    },
+    default_sort='page',
+    fields=['page', 'custom_slug', 'title', 'description'],
+    search=['title', 'description', 'custom_slug'],
+    filters=[
+        ListFilter('page', 'Page', [(value, label, Q(page=value)) for value, label in Metadata.PAGE_CHOICES]),
+    ],
+)
+
+
 @login_required
 @admin_required
 def dashboard_metadata_list(request):
-    """List all metadata"""
-    metadata_list = Metadata.objects.all()
-    return render(request, 'dashboard/metadata/list.html', {'metadata_list': metadata_list})
+    """List metadata (sortable, searchable, keyset-paginated)"""
+    return METADATA_LIST.render(request)
 
 
 @login_required
@@ -636,15 +809,31 @@ def dashboard_intro_settings(request):
 
 # ==================== GALLERY MANAGEMENT ====================
 
-@login_required
-@blog_author_required
-def dashboard_gallery(request):
-    """Gallery page with upload interface"""
-    # Get or create default album
+def get_default_album():
+    """Album new uploads go to (created on first use)"""
     default_album, created = MediaAlbum.objects.get_or_create(
         title='Default',
         defaults={'description': 'Default album for uploads', 'cld_folder': 'uploads'}
     )
+    return default_album
+
+
+def uploaded_image_data(asset):
+    return {
+        'id': asset.id,
+        'title': asset.title,
+        'secure_url': asset.secure_url,
+        'web_url': asset.web_url,
+        'thumb_url': asset.thumb_url,
+        'srcset': asset.srcset(),
+    }
+
+
+@login_required
+@blog_author_required
+def dashboard_gallery(request):
+    """Gallery page with upload interface"""
+    default_album = get_default_album()
     
     assets = MediaAsset.objects.all()
     
@@ -668,54 +857,16 @@ def gallery_api_upload(request):
         if not files:
             return JsonResponse({'success': False, 'error': 'No files provided'})
         
-        # Get or create default album
-        default_album, created = MediaAlbum.objects.get_or_create(
-            title='Default',
-            defaults={'description': 'Default album for uploads', 'cld_folder': 'uploads'}
-        )
+        default_album = get_default_album()
         
         uploaded_images = []
         
         for file in files:
             try:
-                # Always convert to WebP format before upload
-                # This ensures optimal performance and consistent format
-                file.seek(0)
-                file_bytes = smart_compress_to_bytes(file)
-                
-                # Generate clean public_id from filename (remove extension since it will be WebP)
-                base_name = file.name.rsplit('.', 1)[0] if '.' in file.name else file.name
-                public_id = slugify(base_name)[:120]
-                
-                # Upload to Cloudinary (already in WebP format)
-                result, web_url, thumb_url = upload_to_cloudinary(
-                    file_bytes=file_bytes,
-                    folder="uploads",
-                    public_id=public_id,
-                    tags=None
-                )
-                
-                # Create MediaAsset record
-                asset = MediaAsset.objects.create(
-                    album=default_album,
-                    title=file.name.split('.')[0],
-                    public_id=result.get('public_id', ''),
-                    secure_url=result.get('secure_url', ''),
-                    web_url=web_url,
-                    thumb_url=thumb_url,
-                    bytes_size=result.get('bytes', 0),
-                    width=result.get('width', 0),
-                    height=result.get('height', 0),
-                    format=result.get('format', ''),
-                )
+                # Convert to AVIF or WebP, upload and record the variant ladder
+                asset = ingest_image(file, file.name, album=default_album)
                 
-                uploaded_images.append({
-                    'id': asset.id,
-                    'title': asset.title,
-                    'secure_url': asset.secure_url,
-                    'web_url': asset.web_url,
-                    'thumb_url': asset.thumb_url,
-                })
+                uploaded_images.append(uploaded_image_data(asset))
                 
             except Exception as e:
                 return JsonResponse({
@@ -735,12 +886,96 @@ def gallery_api_upload(request):
         })
 
 
+def upload_error_response(error):
+    """JSON error for a rejected chunked upload request, with the offset to resume from"""
+    data = {'success': False, 'error': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    response = JsonResponse(data, status=error.status)
+    if error.offset is not None:
+        response['Upload-Offset'] = error.offset
+    return response
+
+
+@login_required
+@blog_author_required
+@require_POST
+def gallery_upload_start(request):
+    """Open a chunked upload: {"filename": ..., "size": ...} (protocol in chunked_upload.py)"""
+    try:
+        payload = json.loads(request.body or b'null')
+        if not isinstance(payload, dict):
+            raise chunked_upload.UploadError('Expected a JSON object')
+        session = chunked_upload.start(request.user, payload.get('filename'), payload.get('size'))
+    except chunked_upload.UploadError as e:
+        return upload_error_response(e)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'upload_id': str(session.pk),
+        'offset': 0,
+        'chunk_size': chunked_upload.CHUNK_SIZE,
+    }, status=201)
+
+
+@login_required
+@blog_author_required
+@require_http_methods(['GET', 'HEAD', 'PUT', 'DELETE'])
+def gallery_upload_chunk(request, upload_id):
+    """Resume offset (GET), append a chunk (PUT) or cancel (DELETE) a chunked upload"""
+    try:
+        if request.method == 'PUT':
+            session = chunked_upload.append(
+                upload_id, request.user,
+                offset=request.headers.get('Upload-Offset'),
+                length=request.META.get('CONTENT_LENGTH'),
+                stream=request,
+                checksum=request.headers.get('Upload-Checksum'),
+            )
+        elif request.method == 'DELETE':
+            chunked_upload.cancel(upload_id, request.user)
+            return JsonResponse({'success': True})
+        else:
+            session = UploadSession.objects.get(pk=upload_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Unknown upload'}, status=404)
+    except chunked_upload.UploadError as e:
+        return upload_error_response(e)
+
+    response = JsonResponse({
+        'success': True,
+        'offset': session.received,
+        'size': session.size,
+        'chunk_size': chunked_upload.CHUNK_SIZE,
+    })
+    response['Upload-Offset'] = session.received
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@login_required
+@blog_author_required
+@require_POST
+def gallery_upload_finalize(request, upload_id):
+    """Compress and store a completely received chunked upload"""
+    try:
+        asset = chunked_upload.finalize(upload_id, request.user, album=get_default_album())
+    except UploadSession.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Unknown upload'}, status=404)
+    except chunked_upload.UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Failed to process upload: {e}'}, status=500)
+    return JsonResponse({'success': True, 'images': [uploaded_image_data(asset)]})
+
+
 @login_required
 @blog_author_required
 def gallery_api_list(request):
     """API endpoint to get all gallery images as JSON"""
     try:
-        assets = MediaAsset.objects.all().order_by('-created_at')
+        assets = MediaAsset.objects.all().order_by('-created_at').prefetch_related('variants')
         
         images = []
         for asset in assets:
@@ -753,6 +988,11 @@ def gallery_api_list(request):
                 'width': asset.width,
                 'height': asset.height,
                 'format': asset.format,
+                'variants': [
+                    {'width': v.width, 'height': v.height, 'format': v.format,
+                     'bytes_size': v.bytes_size, 'url': v.secure_url}
+                    for v in asset.get_variants()
+                ],
             })
         
         return JsonResponse({
@@ -778,14 +1018,85 @@ def gallery_api_delete(request, pk):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+@login_required
+@blog_author_required
+@require_POST
+def gallery_api_bulk_delete(request):
+    """API endpoint to delete several images: {"ids": [...]}"""
+    try:
+        payload = json.loads(request.body or b'null')
+        result = bulk_actions.delete_rows(GALLERY_TARGET, payload.get('ids') if isinstance(payload, dict) else None)
+    except (ValueError, BulkActionError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **result})
+
+
+# Stored files are replaced in place on re-upload, so cache for a day rather than forever
+LOCAL_MEDIA_MAX_AGE = 24 * 60 * 60
+
+
+@require_http_methods(['GET', 'HEAD'])
+def local_media(request, path):
+    """
+    Serve an image stored by the local storage backend (MEDIA_STORAGE_BACKEND='local').
+
+    With MEDIA_SENDFILE set, only headers are produced and the front server sends
+    the file (X-Accel-Redirect / X-Sendfile); otherwise FileResponse hands the open
+    file to the WSGI server's file_wrapper, which uses sendfile() where available.
+    """
+    storage = get_storage()
+    if storage.name != 'local':
+        raise Http404
+    try:
+        file_path = storage.path(path)
+        stat = file_path.stat()
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat_module.S_ISREG(stat.st_mode):
+        raise Http404
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+    elif settings.MEDIA_SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(file_path)
+    else:
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = f'public, max-age={LOCAL_MEDIA_MAX_AGE}'
+    return response
+
+
 # ==================== USER MANAGEMENT ====================
 
+USERS_LIST = DashboardList(
+    User, 'dashboard/users/list.html', 'dashboard/users/table.html', 'users',
+    sorts={
+        'username': ['username'],
+        # auth_user.date_joined is indexed by migration 0013
+        'joined': ['date_joined', 'id'],
+    },
+    default_sort='username',
+    fields=['username', 'email', 'is_superuser', 'last_login', 'date_joined', 'profile__role'],
+    select_related=['profile'],
+    search=['username', 'email', 'first_name', 'last_name'],
+    filters=[
+        ListFilter('role', 'Role', [
+            (value, label, Q(profile__role=value)) for value, label in UserProfile.ROLE_CHOICES
+        ]),
+    ],
+)
+
+
 @login_required
 @admin_required
 def dashboard_users_list(request):
-    """List all users"""
-    users = User.objects.all().select_related('profile')
-    return render(request, 'dashboard/users/list.html', {'users': users})
+    """List users (sortable, searchable, keyset-paginated)"""
+    return USERS_LIST.render(request)
 
 
 @login_required
@@ -813,6 +1124,7 @@ def contact_form_submit(request):
     """Handle contact form submission with Resend email"""
     import traceback
     import sys
+    import resend  # Imported lazily: only the contact form sends email
     
     # Force print to console immediately (flush ensures it shows up)
     print("=" * 80, file=sys.stderr, flush=True)
@@ -933,7 +1245,11 @@ def contact_form_submit(request):
         
         try:
             # Send email to business
-            email_response = resend.Emails.send(params)
+            try:
+                email_response = resend.Emails.send(params)
+            except Exception:
+                metrics.count_email('business', False)
+                raise
             
             # Check if email was sent successfully
             # Resend returns a dict with 'id' key, not an object with 'id' attribute
@@ -943,6 +1259,7 @@ def contact_form_submit(request):
             elif hasattr(email_response, 'id'):
                 email_id = email_response.id
             
+            metrics.count_email('business', bool(email_id))
             if not email_id:
                 if settings.DEBUG:
                     print(f"Resend API returned unexpected response: {email_response}")
@@ -1010,7 +1327,11 @@ def contact_form_submit(request):
                 if not client_params["reply_to"]:
                     del client_params["reply_to"]
                 
-                client_email_response = resend.Emails.send(client_params)
+                try:
+                    client_email_response = resend.Emails.send(client_params)
+                except Exception:
+                    metrics.count_email('confirmation', False)
+                    raise
                 
                 # Check client email response (dict with 'id' key or object with 'id' attribute)
                 client_email_id = None
@@ -1018,6 +1339,7 @@ def contact_form_submit(request):
                     client_email_id = client_email_response.get('id')
                 elif hasattr(client_email_response, 'id'):
                     client_email_id = client_email_response.id
+                metrics.count_email('confirmation', bool(client_email_id))
                 
                 if settings.DEBUG:
                     if client_email_id:
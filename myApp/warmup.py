@@ -0,0 +1,165 @@
+"""
+Startup warm-up: compile templates, prime content caches, open DB connections
+and issue one request per public page before the worker accepts traffic.
+
+When settings.WARMUP_ON_STARTUP is enabled, warm_up_worker() runs in every
+serving process after it has been forked: from gunicorn's post_worker_init hook
+(gunicorn.conf.py), and on the ASGI lifespan startup event
+(WarmupLifespanMiddleware, wrapped around the application in myProject/asgi.py).
+Running it at import time instead would warm the gunicorn master under
+--preload and hand the forked workers its DB connections. It also runs on
+demand with `python manage.py warmup`.
+
+The page requests are sent with Host: settings.WARMUP_HOST, which must be
+accepted by ALLOWED_HOSTS.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import content_cache
+from .models import Insight, Project, Service
+
+logger = logging.getLogger(__name__)
+
+# Process that last ran warm_up_worker(), so a worker warmed by two hooks only warms once
+_warmed_pid = None
+
+
+def public_page_urls():
+    """One URL per public route, using the first object for detail pages"""
+    urls = [reverse('home'), reverse('home_ar'), reverse('services'), reverse('projects'), reverse('blog_overview')]
+    service = Service.objects.only('slug').first()
+    project = Project.objects.only('slug').first()
+    insight = Insight.objects.filter(status='published').only('slug').first()
+    if service:
+        urls.append(reverse('service_detail', kwargs={'slug': service.slug}))
+    if project:
+        urls.append(reverse('project_detail', kwargs={'slug': project.slug}))
+    if insight:
+        urls.append(reverse('blog_detail', kwargs={'slug': insight.slug}))
+    return urls
+
+
+def compile_templates():
+    """
+    Load every template in the project template dirs (templates/, myApp/new_templates/)
+    so they are parsed once and kept by the cached template loader.
+
+    Returns:
+        tuple: (number compiled, list of (name, error) for templates that failed)
+    """
+    compiled, failed = 0, []
+    for engine in engines.all():
+        for directory in engine.engine.dirs:
+            directory = Path(directory)
+            for path in sorted(directory.rglob('*.html')):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                    compiled += 1
+                except Exception as e:
+                    failed.append((name, str(e)))
+    return compiled, failed
+
+
+def open_connections():
+    """Open (and health-check) a connection for every configured database"""
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def first_requests(urls=None):
+    """
+    Issue one GET per public page through the full middleware stack.
+
+    Returns:
+        dict: url -> (status_code, latency in ms)
+    """
+    factory = RequestFactory(HTTP_HOST=settings.WARMUP_HOST)
+    handler = WSGIHandler()
+    results = {}
+    for url in urls if urls is not None else public_page_urls():
+        start = time.perf_counter()
+        response = handler.get_response(factory.get(url))
+        results[url] = (response.status_code, (time.perf_counter() - start) * 1000)
+    return results
+
+
+def warm_up(requests=True):
+    """
+    Run every warm-up phase and log/return a report with phase timings.
+
+    Returns:
+        dict: phase -> milliseconds, plus 'templates', 'failed_templates'
+              and 'first_requests' (url -> (status, ms))
+    """
+    report = {}
+
+    start = time.perf_counter()
+    open_connections()
+    report['connections_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    report['templates'], report['failed_templates'] = compile_templates()
+    report['templates_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    content_cache.prime()
+    report['caches_ms'] = (time.perf_counter() - start) * 1000
+
+    report['first_requests'] = first_requests() if requests else {}
+
+    logger.info(
+        "Warm-up: %d templates in %.0f ms, caches %.0f ms, connections %.0f ms",
+        report['templates'], report['templates_ms'], report['caches_ms'], report['connections_ms']
+    )
+    for url, (status, ms) in report['first_requests'].items():
+        logger.info("Warm-up request %s -> %s in %.1f ms", url, status, ms)
+    for name, error in report['failed_templates']:
+        logger.warning("Warm-up could not compile %s: %s", name, error)
+    return report
+
+
+def warm_up_worker():
+    """
+    warm_up() once per process. Failures are logged rather than raised:
+    a worker that could not warm up still serves traffic.
+    """
+    global _warmed_pid
+    if _warmed_pid == os.getpid():
+        return
+    _warmed_pid = os.getpid()
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Warm-up failed")
+
+
+class WarmupLifespanMiddleware:
+    """ASGI middleware running warm_up_worker() on the lifespan startup event"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'lifespan':
+            await self.app(scope, receive, send)
+            return
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await sync_to_async(warm_up_worker)()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
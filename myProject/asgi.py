@@ -3,6 +3,13 @@ ASGI config for myProject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run with e.g. ``ASYNC_PUBLIC_VIEWS=True daphne myProject.asgi:application`` so
+public pages are served by the async ORM views in myApp/async_views.py.
+103 Early Hints are only sent by servers implementing the ASGI
+``http.response.early_hint`` extension, e.g. ``hypercorn myProject.asgi:application``.
+Startup warm-up (WARMUP_ON_STARTUP) needs a server sending ASGI lifespan events
+(Hypercorn, Uvicorn); Daphne does not.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -14,3 +21,16 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myProject.settings')
 
 application = get_asgi_application()
+
+# 103 Early Hints with each public page's preload links (see myApp/preload_hints.py)
+from django.conf import settings  # noqa: E402
+
+if settings.PRELOAD_HINTS and settings.EARLY_HINTS:
+    from myApp.preload_hints import EarlyHintsMiddleware
+    application = EarlyHintsMiddleware(application)
+
+# Optional per-worker warm-up (templates, caches, DB connections) on the lifespan startup event,
+# which servers send from each worker process before it accepts connections
+if settings.WARMUP_ON_STARTUP:
+    from myApp.warmup import WarmupLifespanMiddleware
+    application = WarmupLifespanMiddleware(application)
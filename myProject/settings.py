@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myApp.middleware.RequestProfilingMiddleware',
+    'myApp.middleware.MetricsMiddleware',
+    'myApp.middleware.PreloadHintsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,7 +65,8 @@ ROOT_URLCONF = 'myProject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render timing for the request profiler
+        'BACKEND': 'myApp.profiling.ProfilingDjangoTemplates',
         'DIRS': [
             BASE_DIR / 'templates',
             BASE_DIR / 'myApp',
@@ -81,6 +85,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'myProject.wsgi.application'
+ASGI_APPLICATION = 'myProject.asgi.application'
+
+# Serve public pages with the async ORM views (myApp/async_views.py).
+# Enable for ASGI deployments, e.g. `daphne myProject.asgi:application`.
+ASYNC_PUBLIC_VIEWS = os.environ.get('ASYNC_PUBLIC_VIEWS', 'False') == 'True'
 
 
 # Database
@@ -150,16 +159,86 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Cloudinary Configuration
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME', ''),
-    api_key=os.environ.get('CLOUDINARY_API_KEY', ''),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET', ''),
-    secure=True  # Always use HTTPS
-)
+# Applied lazily by myApp.utils.cloudinary_utils.get_cloudinary() on first use,
+# so process startup (workers, manage.py commands) doesn't import the SDK.
+CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME', '')
+CLOUDINARY_API_KEY = os.environ.get('CLOUDINARY_API_KEY', '')
+CLOUDINARY_API_SECRET = os.environ.get('CLOUDINARY_API_SECRET', '')
+
+# Where uploaded images are stored: 'cloudinary' or 'local' (see myApp/media_storage.py).
+# The local backend keeps files under LOCAL_MEDIA_ROOT, served at LOCAL_MEDIA_URL.
+MEDIA_STORAGE_BACKEND = os.environ.get('MEDIA_STORAGE_BACKEND', 'cloudinary')
+LOCAL_MEDIA_ROOT = os.environ.get('LOCAL_MEDIA_ROOT', str(BASE_DIR / 'media'))
+LOCAL_MEDIA_URL = '/media/'
+
+# Hand local media responses to the front server instead of streaming them from Python:
+# 'x-accel-redirect' (nginx, internal location at MEDIA_ACCEL_REDIRECT_PREFIX) or
+# 'x-sendfile' (Apache mod_xsendfile, lighttpd). Empty: the WSGI server's sendfile().
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Chunked gallery uploads (myApp/chunked_upload.py): partial files are assembled in
+# CHUNKED_UPLOAD_DIR (empty: the system temp dir), up to CHUNKED_UPLOAD_MAX_BYTES per file
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', '')
+CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_BYTES', str(200 * 1024 * 1024)))
+
+# Largest remote image `reoptimize_media` downloads; bigger sources fail that item
+MEDIA_MAX_SOURCE_BYTES = int(os.environ.get('MEDIA_MAX_SOURCE_BYTES', str(50 * 1024 * 1024)))
+
+# Uploads are encoded in each of MEDIA_ENCODE_FORMATS; the smallest candidate whose PSNR
+# against the source is at least MEDIA_QUALITY_FLOOR_DB is stored (myApp/utils/image_encoding.py)
+MEDIA_ENCODE_FORMATS = ['avif', 'webp']
+MEDIA_QUALITY_FLOOR_DB = float(os.environ.get('MEDIA_QUALITY_FLOOR_DB', '35'))
+
+# Encoder effort: 'fast', 'balanced', 'max' or 'auto' (the most thorough profile expected
+# to encode the upload within MEDIA_ENCODE_BUDGET_MS, see myApp/utils/image_encoding.py)
+MEDIA_ENCODE_PROFILE = os.environ.get('MEDIA_ENCODE_PROFILE', 'auto')
+MEDIA_ENCODE_BUDGET_MS = int(os.environ.get('MEDIA_ENCODE_BUDGET_MS', '2000'))
+
+# Responsive variant ladder generated eagerly for every upload
+MEDIA_VARIANT_WIDTHS = [480, 960, 1600, 2400]
+MEDIA_VARIANT_FORMATS = ['webp']
+
+# Cached content (footer services, ...) expiry in seconds; signals also invalidate on change
+CONTENT_CACHE_TIMEOUT = 300
+
+# Warm templates, caches and DB connections in each worker before it serves traffic
+WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', 'False') == 'True'
+# Host header of the warm-up page requests; must be accepted by ALLOWED_HOSTS
+WARMUP_HOST = os.environ.get('WARMUP_HOST', 'localhost')
+
+# Per-route request profiling (dashboard > Performance); PROFILING_WINDOW = requests kept per route.
+# Times every query, so it defaults to DEBUG; enable explicitly to profile production traffic.
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', str(DEBUG)) == 'True'
+PROFILING_WINDOW = 500
+
+# Attach Server-Timing headers (db, template, cache, compress, total) to every response.
+# Opt-in: the header exposes server internals to any client.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'False') == 'True'
+
+# Queries slower than SLOW_QUERY_MS during a request are kept (with their EXPLAIN plan)
+# in a ring buffer of SLOW_QUERY_BUFFER entries on the Performance page. 0 disables
+# (the default without DEBUG, as it also wraps every query).
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', '100' if DEBUG else '0'))
+SLOW_QUERY_BUFFER = 100
+
+# Prometheus metrics at /metrics/. With METRICS_TOKEN set, scrapers must send
+# "Authorization: Bearer <token>"; otherwise only METRICS_ALLOWED_IPS may read it, which
+# is no protection behind a reverse proxy on the same host (every request then comes
+# from 127.0.0.1): set a token, or block /metrics/ at the proxy.
+# Multiple workers: also set PROMETHEUS_MULTIPROC_DIR (see myApp/metrics.py)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Link preload/preconnect headers on public pages (LCP image, stylesheets, font hosts).
+# EARLY_HINTS also sends them as 103 Early Hints under ASGI servers that support it
+# (see myApp/preload_hints.py)
+PRELOAD_HINTS = os.environ.get('PRELOAD_HINTS', 'True') == 'True'
+EARLY_HINTS = os.environ.get('EARLY_HINTS', 'True') == 'True'
+
+# Startup import-time budget enforced by `manage.py bench_imports --check` and the test suite
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '750'))
 
 # Login URL for dashboard
 LOGIN_URL = '/dashboard/login/'
@@ -1,19 +1,23 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from myApp import views
+from myApp import views, async_views
+
+# Public pages use the async ORM views under ASGI deployments
+public_views = async_views if settings.ASYNC_PUBLIC_VIEWS else views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # Public routes
-    path('', views.home, name='home'),
-    path('ar/', views.home_ar, name='home_ar'),
-    path('services/', views.services, name='services'),
-    path('services/<slug:slug>/', views.service_detail, name='service_detail'),
-    path('projects/', views.projects, name='projects'),
-    path('projects/<slug:slug>/', views.project_detail, name='project_detail'),
-    path('blog/', views.blog_overview, name='blog_overview'),
-    path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
+    path('', public_views.home, name='home'),
+    path('ar/', public_views.home_ar, name='home_ar'),
+    path('services/', public_views.services, name='services'),
+    path('services/<slug:slug>/', public_views.service_detail, name='service_detail'),
+    path('projects/', public_views.projects, name='projects'),
+    path('projects/<slug:slug>/', public_views.project_detail, name='project_detail'),
+    path('blog/', public_views.blog_overview, name='blog_overview'),
+    path('blog/<slug:slug>/', public_views.blog_detail, name='blog_detail'),
     
     # Dashboard authentication
     path('dashboard/login/', views.dashboard_login, name='dashboard_login'),
@@ -21,12 +25,14 @@ urlpatterns = [
     
     # Dashboard home
     path('dashboard/', views.dashboard_home, name='dashboard_home'),
+    path('dashboard/performance/', views.dashboard_performance, name='dashboard_performance'),
     
     # Services management
     path('dashboard/services/', views.dashboard_services_list, name='dashboard_services_list'),
     path('dashboard/services/create/', views.dashboard_service_create, name='dashboard_service_create'),
     path('dashboard/services/<int:pk>/edit/', views.dashboard_service_edit, name='dashboard_service_edit'),
     path('dashboard/services/<int:pk>/delete/', views.dashboard_service_delete, name='dashboard_service_delete'),
+    path('dashboard/services/bulk/', views.dashboard_bulk_action, {'kind': 'services'}, name='dashboard_services_bulk'),
     
     # Insights management
     path('dashboard/insights/', views.dashboard_insights_list, name='dashboard_insights_list'),
@@ -39,6 +45,7 @@ urlpatterns = [
     path('dashboard/projects/create/', views.dashboard_project_create, name='dashboard_project_create'),
     path('dashboard/projects/<int:pk>/edit/', views.dashboard_project_edit, name='dashboard_project_edit'),
     path('dashboard/projects/<int:pk>/delete/', views.dashboard_project_delete, name='dashboard_project_delete'),
+    path('dashboard/projects/bulk/', views.dashboard_bulk_action, {'kind': 'projects'}, name='dashboard_projects_bulk'),
     
     # Heroes management
     path('dashboard/heroes/', views.dashboard_heroes_list, name='dashboard_heroes_list'),
@@ -59,7 +66,14 @@ urlpatterns = [
     path('dashboard/gallery/', views.dashboard_gallery, name='dashboard_gallery'),
     path('dashboard/gallery/api/list/', views.gallery_api_list, name='gallery_api_list'),
     path('dashboard/gallery/upload/', views.gallery_api_upload, name='gallery_api_upload'),
+    path('dashboard/gallery/uploads/', views.gallery_upload_start, name='gallery_upload_start'),
+    path('dashboard/gallery/uploads/<uuid:upload_id>/', views.gallery_upload_chunk, name='gallery_upload_chunk'),
+    path('dashboard/gallery/uploads/<uuid:upload_id>/finalize/', views.gallery_upload_finalize, name='gallery_upload_finalize'),
     path('dashboard/gallery/<int:pk>/delete/', views.gallery_api_delete, name='gallery_api_delete'),
+    path('dashboard/gallery/bulk-delete/', views.gallery_api_bulk_delete, name='gallery_api_bulk_delete'),
+    
+    # Images of the local storage backend (MEDIA_STORAGE_BACKEND='local')
+    path('media/<path:path>', views.local_media, name='local_media'),
     
     # User management
     path('dashboard/users/', views.dashboard_users_list, name='dashboard_users_list'),
@@ -67,5 +81,8 @@ urlpatterns = [
     
     # Contact form
     path('contact/submit/', views.contact_form_submit, name='contact_form_submit'),
+    
+    # Prometheus scrape endpoint (METRICS_ENABLED; METRICS_TOKEN bearer token or local addresses)
+    path('metrics/', views.metrics_endpoint, name='metrics'),
 ]
 
@@ -3,6 +3,9 @@ WSGI config for myProject project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Startup warm-up (WARMUP_ON_STARTUP) runs per worker from the post_worker_init
+hook in gunicorn.conf.py, not at import time, so it also holds under --preload.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 """